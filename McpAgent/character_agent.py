@@ -6,9 +6,11 @@ from dotenv import load_dotenv
 import sys
 from pathlib import Path
 
-# Add parent directory to path to import shared_client
+# Add parent directory to path to import shared modules
 sys.path.append(str(Path(__file__).parent.parent))
-from shared_client import get_async_client
+from prompt_assembly import assemble_messages, parse_completion
+from agent_memo import memoize_agent
+from micro_batcher import micro_batched
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -23,30 +25,11 @@ class resume_data(BaseModel):
     steps: list[Step]
 
 
-async def character_agent(character_database, resume_character_assessment):
-    """
-    Analyzes resume character assessment against database character traits
-    Returns matching IDs or [0] if no matches found
-    
-    Args:
-        character_database: Dict with character traits (e.g., {"1": "Accountability", "2": "Self-Motivation", ...})
-        resume_character_assessment: String with character assessment from resume analysis
-    """
-
-    # Format the character database for the prompt
-    character_options = "\n".join([f'"{id}": "{trait}"' for id, trait in character_database.items()])
-
-    prompt_template = f"""You are an expert at analyzing character traits and matching them to predefined categories.
+prompt_template = """You are an expert at analyzing character traits and matching them to predefined categories.
 
 **Your Task:**
 Analyze the resume character assessment and determine which character traits from the database best match the evidence presented.
 
-**Character Database Options:**
-{character_options}
-
-**Resume Character Assessment:**
-{resume_character_assessment}
-
 **Instructions:**
 1. Carefully read the resume character assessment
 2. Compare it against each character trait in the database
@@ -72,16 +55,32 @@ Examples:
 - If no traits are clearly evidenced: [0]
 """
 
-    # Get the async client
-    client = await get_async_client()
+
+@memoize_agent("character_agent", resume_data)
+@micro_batched("character_agent", resume_data, "Character Database Options")
+async def character_agent(character_database, resume_character_assessment):
+    """
+    Analyzes resume character assessment against database character traits
+    Returns matching IDs or [0] if no matches found
     
-    completion = await client.beta.chat.completions.parse(
-    model="gpt-4o",
-    messages=[
-        {"role": "system", "content": prompt_template},
-        {"role": "user", "content": f"Please analyze this character assessment and return matching trait IDs: {resume_character_assessment}"}
-    ],
-    response_format=resume_data,
+    Args:
+        character_database: Dict with character traits (e.g., {"1": "Accountability", "2": "Self-Motivation", ...})
+        resume_character_assessment: String with character assessment from resume analysis
+    """
+
+    # Format the character database for the prompt
+    character_options = "\n".join([f'"{id}": "{trait}"' for id, trait in character_database.items()])
+
+    completion = await parse_completion(
+        "character_agent",
+        assemble_messages(
+            prompt_template,
+            [
+                f"**Character Database Options:**\n{character_options}"
+            ],
+            f"Please analyze this character assessment and return matching trait IDs: {resume_character_assessment}"
+        ),
+        resume_data
     )
 
     analysis_response = completion.choices[0].message
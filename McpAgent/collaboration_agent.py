@@ -6,9 +6,11 @@ from dotenv import load_dotenv
 import sys
 from pathlib import Path
 
-# Add parent directory to path to import shared_client
+# Add parent directory to path to import shared modules
 sys.path.append(str(Path(__file__).parent.parent))
-from shared_client import get_async_client
+from prompt_assembly import assemble_messages, parse_completion
+from agent_memo import memoize_agent
+from micro_batcher import micro_batched
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -23,30 +25,11 @@ class resume_data(BaseModel):
     steps: list[Step]
 
 
-async def collaboration_agent(collaboration_database, resume_collaboration_assessment):
-    """
-    Analyzes resume collaboration assessment against database collaboration traits
-    Returns matching IDs or [0] if no matches found
-    
-    Args:
-        collaboration_database: Dict with collaboration traits (e.g., {"1": "Interpersonal Relationships", "2": "Coordinating", ...})
-        resume_collaboration_assessment: String with collaboration assessment from resume analysis
-    """
-
-    # Format the collaboration database for the prompt
-    collaboration_options = "\n".join([f'"{id}": "{trait}"' for id, trait in collaboration_database.items()])
-
-    prompt_template = f"""You are an expert at analyzing collaboration skills and matching them to predefined categories.
+prompt_template = """You are an expert at analyzing collaboration skills and matching them to predefined categories.
 
 **Your Task:**
 Analyze the resume collaboration assessment and determine which collaboration traits from the database best match the evidence presented.
 
-**Collaboration Database Options:**
-{collaboration_options}
-
-**Resume Collaboration Assessment:**
-{resume_collaboration_assessment}
-
 **Instructions:**
 1. Carefully read the resume collaboration assessment
 2. Compare it against each collaboration trait in the database
@@ -77,16 +60,32 @@ Examples:
 - If no collaboration traits are clearly evidenced: [0]
 """
 
-    # Get the async client
-    client = await get_async_client()
+
+@memoize_agent("collaboration_agent", resume_data)
+@micro_batched("collaboration_agent", resume_data, "Collaboration Database Options")
+async def collaboration_agent(collaboration_database, resume_collaboration_assessment):
+    """
+    Analyzes resume collaboration assessment against database collaboration traits
+    Returns matching IDs or [0] if no matches found
     
-    completion = await client.beta.chat.completions.parse(
-    model="gpt-4o",
-    messages=[
-        {"role": "system", "content": prompt_template},
-        {"role": "user", "content": f"Please analyze this collaboration assessment and return matching trait IDs: {resume_collaboration_assessment}"}
-    ],
-    response_format=resume_data,
+    Args:
+        collaboration_database: Dict with collaboration traits (e.g., {"1": "Interpersonal Relationships", "2": "Coordinating", ...})
+        resume_collaboration_assessment: String with collaboration assessment from resume analysis
+    """
+
+    # Format the collaboration database for the prompt
+    collaboration_options = "\n".join([f'"{id}": "{trait}"' for id, trait in collaboration_database.items()])
+
+    completion = await parse_completion(
+        "collaboration_agent",
+        assemble_messages(
+            prompt_template,
+            [
+                f"**Collaboration Database Options:**\n{collaboration_options}"
+            ],
+            f"Please analyze this collaboration assessment and return matching trait IDs: {resume_collaboration_assessment}"
+        ),
+        resume_data
     )
 
     analysis_response = completion.choices[0].message
@@ -6,9 +6,11 @@ from dotenv import load_dotenv
 import sys
 from pathlib import Path
 
-# Add parent directory to path to import shared_client
+# Add parent directory to path to import shared modules
 sys.path.append(str(Path(__file__).parent.parent))
-from shared_client import get_async_client
+from prompt_assembly import assemble_messages, parse_completion
+from agent_memo import memoize_agent
+from micro_batcher import micro_batched
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -23,30 +25,11 @@ class resume_data(BaseModel):
     steps: list[Step]
 
 
-async def communication_agent(communication_database, resume_communication_assessment):
-    """
-    Analyzes resume communication assessment against database communication traits
-    Returns matching IDs or [0] if no matches found
-    
-    Args:
-        communication_database: Dict with communication traits (e.g., {"1": "Verbal Communication", "2": "Written Communication", ...})
-        resume_communication_assessment: String with communication assessment from resume analysis
-    """
-
-    # Format the communication database for the prompt
-    communication_options = "\n".join([f'"{id}": "{trait}"' for id, trait in communication_database.items()])
-
-    prompt_template = f"""You are an expert at analyzing communication skills and matching them to predefined categories.
+prompt_template = """You are an expert at analyzing communication skills and matching them to predefined categories.
 
 **Your Task:**
 Analyze the resume communication assessment and determine which communication traits from the database best match the evidence presented.
 
-**Communication Database Options:**
-{communication_options}
-
-**Resume Communication Assessment:**
-{resume_communication_assessment}
-
 **Instructions:**
 1. Carefully read the resume communication assessment
 2. Compare it against each communication trait in the database
@@ -80,16 +63,32 @@ Examples:
 - If no communication traits are clearly evidenced: [0]
 """
 
-    # Get the async client
-    client = await get_async_client()
+
+@memoize_agent("communication_agent", resume_data)
+@micro_batched("communication_agent", resume_data, "Communication Database Options")
+async def communication_agent(communication_database, resume_communication_assessment):
+    """
+    Analyzes resume communication assessment against database communication traits
+    Returns matching IDs or [0] if no matches found
     
-    completion = await client.beta.chat.completions.parse(
-    model="gpt-4o",
-    messages=[
-        {"role": "system", "content": prompt_template},
-        {"role": "user", "content": f"Please analyze this communication assessment and return matching trait IDs: {resume_communication_assessment}"}
-    ],
-    response_format=resume_data,
+    Args:
+        communication_database: Dict with communication traits (e.g., {"1": "Verbal Communication", "2": "Written Communication", ...})
+        resume_communication_assessment: String with communication assessment from resume analysis
+    """
+
+    # Format the communication database for the prompt
+    communication_options = "\n".join([f'"{id}": "{trait}"' for id, trait in communication_database.items()])
+
+    completion = await parse_completion(
+        "communication_agent",
+        assemble_messages(
+            prompt_template,
+            [
+                f"**Communication Database Options:**\n{communication_options}"
+            ],
+            f"Please analyze this communication assessment and return matching trait IDs: {resume_communication_assessment}"
+        ),
+        resume_data
     )
 
     analysis_response = completion.choices[0].message
@@ -6,9 +6,11 @@ from dotenv import load_dotenv
 import sys
 from pathlib import Path
 
-# Add parent directory to path to import shared_client
+# Add parent directory to path to import shared modules
 sys.path.append(str(Path(__file__).parent.parent))
-from shared_client import get_async_client
+from prompt_assembly import assemble_messages, parse_completion
+from agent_memo import memoize_agent
+from micro_batcher import micro_batched
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -23,30 +25,11 @@ class resume_data(BaseModel):
     steps: list[Step]
 
 
-async def creativity_agent(creativity_database, resume_creativity_assessment):
-    """
-    Analyzes resume creativity assessment against database creativity traits
-    Returns matching IDs or [0] if no matches found
-    
-    Args:
-        creativity_database: Dict with creativity traits (e.g., {"1": "Innovation", "2": "Creative Thinking", ...})
-        resume_creativity_assessment: String with creativity assessment from resume analysis
-    """
-
-    # Format the creativity database for the prompt
-    creativity_options = "\n".join([f'"{id}": "{trait}"' for id, trait in creativity_database.items()])
-
-    prompt_template = f"""You are an expert at analyzing creativity skills and matching them to predefined categories.
+prompt_template = """You are an expert at analyzing creativity skills and matching them to predefined categories.
 
 **Your Task:**
 Analyze the resume creativity assessment and determine which creativity traits from the database best match the evidence presented.
 
-**Creativity Database Options:**
-{creativity_options}
-
-**Resume Creativity Assessment:**
-{resume_creativity_assessment}
-
 **Instructions:**
 1. Carefully read the resume creativity assessment
 2. Compare it against each creativity trait in the database
@@ -81,16 +64,32 @@ Examples:
 - If no creativity traits are clearly evidenced: [0]
 """
 
-    # Get the async client
-    client = await get_async_client()
+
+@memoize_agent("creativity_agent", resume_data)
+@micro_batched("creativity_agent", resume_data, "Creativity Database Options")
+async def creativity_agent(creativity_database, resume_creativity_assessment):
+    """
+    Analyzes resume creativity assessment against database creativity traits
+    Returns matching IDs or [0] if no matches found
     
-    completion = await client.beta.chat.completions.parse(
-    model="gpt-4o",
-    messages=[
-        {"role": "system", "content": prompt_template},
-        {"role": "user", "content": f"Please analyze this creativity assessment and return matching trait IDs: {resume_creativity_assessment}"}
-    ],
-    response_format=resume_data,
+    Args:
+        creativity_database: Dict with creativity traits (e.g., {"1": "Innovation", "2": "Creative Thinking", ...})
+        resume_creativity_assessment: String with creativity assessment from resume analysis
+    """
+
+    # Format the creativity database for the prompt
+    creativity_options = "\n".join([f'"{id}": "{trait}"' for id, trait in creativity_database.items()])
+
+    completion = await parse_completion(
+        "creativity_agent",
+        assemble_messages(
+            prompt_template,
+            [
+                f"**Creativity Database Options:**\n{creativity_options}"
+            ],
+            f"Please analyze this creativity assessment and return matching trait IDs: {resume_creativity_assessment}"
+        ),
+        resume_data
     )
 
     analysis_response = completion.choices[0].message
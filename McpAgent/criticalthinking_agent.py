@@ -6,9 +6,11 @@ from dotenv import load_dotenv
 import sys
 from pathlib import Path
 
-# Add parent directory to path to import shared_client
+# Add parent directory to path to import shared modules
 sys.path.append(str(Path(__file__).parent.parent))
-from shared_client import get_async_client
+from prompt_assembly import assemble_messages, parse_completion
+from agent_memo import memoize_agent
+from micro_batcher import micro_batched
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -23,30 +25,11 @@ class resume_data(BaseModel):
     steps: list[Step]
 
 
-async def criticalthinking_agent(criticalthinking_database, resume_criticalthinking_assessment):
-    """
-    Analyzes resume critical thinking assessment against database critical thinking traits
-    Returns matching IDs or [0] if no matches found
-    
-    Args:
-        criticalthinking_database: Dict with critical thinking traits (e.g., {"1": "Problem Solving", "2": "Research", ...})
-        resume_criticalthinking_assessment: String with critical thinking assessment from resume analysis
-    """
-
-    # Format the critical thinking database for the prompt
-    criticalthinking_options = "\n".join([f'"{id}": "{trait}"' for id, trait in criticalthinking_database.items()])
-
-    prompt_template = f"""You are an expert at analyzing critical thinking skills and matching them to predefined categories.
+prompt_template = """You are an expert at analyzing critical thinking skills and matching them to predefined categories.
 
 **Your Task:**
 Analyze the resume critical thinking assessment and determine which critical thinking traits from the database best match the evidence presented.
 
-**Critical Thinking Database Options:**
-{criticalthinking_options}
-
-**Resume Critical Thinking Assessment:**
-{resume_criticalthinking_assessment}
-
 **Instructions:**
 1. Carefully read the resume critical thinking assessment
 2. Compare it against each critical thinking trait in the database
@@ -81,16 +64,32 @@ Examples:
 - If no critical thinking traits are clearly evidenced: [0]
 """
 
-    # Get the async client
-    client = await get_async_client()
+
+@memoize_agent("criticalthinking_agent", resume_data)
+@micro_batched("criticalthinking_agent", resume_data, "Critical Thinking Database Options")
+async def criticalthinking_agent(criticalthinking_database, resume_criticalthinking_assessment):
+    """
+    Analyzes resume critical thinking assessment against database critical thinking traits
+    Returns matching IDs or [0] if no matches found
     
-    completion = await client.beta.chat.completions.parse(
-    model="gpt-4o",
-    messages=[
-        {"role": "system", "content": prompt_template},
-        {"role": "user", "content": f"Please analyze this critical thinking assessment and return matching trait IDs: {resume_criticalthinking_assessment}"}
-    ],
-    response_format=resume_data,
+    Args:
+        criticalthinking_database: Dict with critical thinking traits (e.g., {"1": "Problem Solving", "2": "Research", ...})
+        resume_criticalthinking_assessment: String with critical thinking assessment from resume analysis
+    """
+
+    # Format the critical thinking database for the prompt
+    criticalthinking_options = "\n".join([f'"{id}": "{trait}"' for id, trait in criticalthinking_database.items()])
+
+    completion = await parse_completion(
+        "criticalthinking_agent",
+        assemble_messages(
+            prompt_template,
+            [
+                f"**Critical Thinking Database Options:**\n{criticalthinking_options}"
+            ],
+            f"Please analyze this critical thinking assessment and return matching trait IDs: {resume_criticalthinking_assessment}"
+        ),
+        resume_data
     )
 
     analysis_response = completion.choices[0].message
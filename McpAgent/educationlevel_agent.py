@@ -6,9 +6,10 @@ from dotenv import load_dotenv
 import sys
 from pathlib import Path
 
-# Add parent directory to path to import shared_client
+# Add parent directory to path to import shared modules
 sys.path.append(str(Path(__file__).parent.parent))
-from shared_client import get_async_client
+from prompt_assembly import assemble_messages, parse_completion
+from agent_memo import memoize_agent
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -33,27 +34,11 @@ class resume_data(BaseModel):
     steps: list[Step]
 
 
-async def educationlevel_agent(educationlevel_database, education_history):
-    """
-    Analyzes the full education history and appends memberEducationLevelId to each entry
-    while preserving all other fields exactly as-is. If no clear level, use 0.
-    
-    Args:
-        educationlevel_database: Dict with education level categories (e.g., {"1": "High School degree", "2": "2 year degree", ...})
-        education_history: List of education entries with fields CollegeUniversity, degree, fieldStudy, description, date
-    """
-
-    # Format the education level database for the prompt
-    educationlevel_options = "\n".join([f'"{id}": "{level}"' for id, level in educationlevel_database.items()])
-
-    prompt_template = f"""You are an expert at analyzing education histories and matching each entry to predefined education level categories.
+prompt_template = """You are an expert at analyzing education histories and matching each entry to predefined education level categories.
 
 **Your Task:**
 For each education entry, determine the most appropriate education level from the database and add memberEducationLevelId to that entry. Do not change any other fields.
 
-**Education Level Database Options:**
-{educationlevel_options}
-
 **Instructions:**
 1. Carefully read each education entry (degree, field of study, description, institution, dates)
 2. Match that single entry to the most appropriate category from the database
@@ -74,25 +59,39 @@ For each education entry, determine the most appropriate education level from th
 
 **Output Format:**
 Return the exact same structure as the input list of education entries, but with memberEducationLevelId populated for each entry.
-
 """
 
-    # Get the async client
-    client = await get_async_client()
+
+@memoize_agent("educationlevel_agent", resume_data)
+async def educationlevel_agent(educationlevel_database, education_history):
+    """
+    Analyzes the full education history and appends memberEducationLevelId to each entry
+    while preserving all other fields exactly as-is. If no clear level, use 0.
     
+    Args:
+        educationlevel_database: Dict with education level categories (e.g., {"1": "High School degree", "2": "2 year degree", ...})
+        education_history: List of education entries with fields CollegeUniversity, degree, fieldStudy, description, date
+    """
+
+    # Format the education level database for the prompt
+    educationlevel_options = "\n".join([f'"{id}": "{level}"' for id, level in educationlevel_database.items()])
+
     # Convert education_history to text for the prompt while relying on structured parsing for output
     if isinstance(education_history, dict) or isinstance(education_history, list):
         education_text = str(education_history)
     else:
         education_text = str(education_history)
 
-    completion = await client.beta.chat.completions.parse(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": prompt_template},
-            {"role": "user", "content": f"Please analyze this education history and add memberEducationLevelId to each entry, preserving everything else:\n\n{education_text}"}
-        ],
-        response_format=resume_data,
+    completion = await parse_completion(
+        "educationlevel_agent",
+        assemble_messages(
+            prompt_template,
+            [
+                f"**Education Level Database Options:**\n{educationlevel_options}"
+            ],
+            f"Please analyze this education history and add memberEducationLevelId to each entry, preserving everything else:\n\n{education_text}"
+        ),
+        resume_data
     )
 
     analysis_response = completion.choices[0].message
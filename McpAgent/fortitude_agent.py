@@ -6,9 +6,11 @@ from dotenv import load_dotenv
 import sys
 from pathlib import Path
 
-# Add parent directory to path to import shared_client
+# Add parent directory to path to import shared modules
 sys.path.append(str(Path(__file__).parent.parent))
-from shared_client import get_async_client
+from prompt_assembly import assemble_messages, parse_completion
+from agent_memo import memoize_agent
+from micro_batcher import micro_batched
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -23,30 +25,11 @@ class resume_data(BaseModel):
     steps: list[Step]
 
 
-async def fortitude_agent(fortitude_database, resume_fortitude_assessment):
-    """
-    Analyzes resume fortitude assessment against database fortitude traits
-    Returns matching IDs or [0] if no matches found
-    
-    Args:
-        fortitude_database: Dict with fortitude traits (e.g., {"1": "Resilience", "2": "Motivational Skills", ...})
-        resume_fortitude_assessment: String with fortitude assessment from resume analysis
-    """
-
-    # Format the fortitude database for the prompt
-    fortitude_options = "\n".join([f'"{id}": "{trait}"' for id, trait in fortitude_database.items()])
-
-    prompt_template = f"""You are an expert at analyzing fortitude and resilience skills and matching them to predefined categories.
+prompt_template = """You are an expert at analyzing fortitude and resilience skills and matching them to predefined categories.
 
 **Your Task:**
 Analyze the resume fortitude assessment and determine which fortitude traits from the database best match the evidence presented.
 
-**Fortitude Database Options:**
-{fortitude_options}
-
-**Resume Fortitude Assessment:**
-{resume_fortitude_assessment}
-
 **Instructions:**
 1. Carefully read the resume fortitude assessment
 2. Compare it against each fortitude trait in the database
@@ -83,16 +66,32 @@ Examples:
 - If no fortitude traits are clearly evidenced: [0]
 """
 
-    # Get the async client
-    client = await get_async_client()
+
+@memoize_agent("fortitude_agent", resume_data)
+@micro_batched("fortitude_agent", resume_data, "Fortitude Database Options")
+async def fortitude_agent(fortitude_database, resume_fortitude_assessment):
+    """
+    Analyzes resume fortitude assessment against database fortitude traits
+    Returns matching IDs or [0] if no matches found
     
-    completion = await client.beta.chat.completions.parse(
-    model="gpt-4o",
-    messages=[
-        {"role": "system", "content": prompt_template},
-        {"role": "user", "content": f"Please analyze this fortitude assessment and return matching trait IDs: {resume_fortitude_assessment}"}
-    ],
-    response_format=resume_data,
+    Args:
+        fortitude_database: Dict with fortitude traits (e.g., {"1": "Resilience", "2": "Motivational Skills", ...})
+        resume_fortitude_assessment: String with fortitude assessment from resume analysis
+    """
+
+    # Format the fortitude database for the prompt
+    fortitude_options = "\n".join([f'"{id}": "{trait}"' for id, trait in fortitude_database.items()])
+
+    completion = await parse_completion(
+        "fortitude_agent",
+        assemble_messages(
+            prompt_template,
+            [
+                f"**Fortitude Database Options:**\n{fortitude_options}"
+            ],
+            f"Please analyze this fortitude assessment and return matching trait IDs: {resume_fortitude_assessment}"
+        ),
+        resume_data
     )
 
     analysis_response = completion.choices[0].message
@@ -6,9 +6,11 @@ from dotenv import load_dotenv
 import sys
 from pathlib import Path
 
-# Add parent directory to path to import shared_client
+# Add parent directory to path to import shared modules
 sys.path.append(str(Path(__file__).parent.parent))
-from shared_client import get_async_client
+from prompt_assembly import assemble_messages, parse_completion
+from agent_memo import memoize_agent
+from micro_batcher import micro_batched
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -23,30 +25,11 @@ class resume_data(BaseModel):
     steps: list[Step]
 
 
-async def growthmindset_agent(growthmindset_database, resume_growthmindset_assessment):
-    """
-    Analyzes resume growth mindset assessment against database growth mindset traits
-    Returns matching IDs or [0] if no matches found
-    
-    Args:
-        growthmindset_database: Dict with growth mindset traits (e.g., {"1": "Self-starter", "2": "Proactivity", ...})
-        resume_growthmindset_assessment: String with growth mindset assessment from resume analysis
-    """
-
-    # Format the growth mindset database for the prompt
-    growthmindset_options = "\n".join([f'"{id}": "{trait}"' for id, trait in growthmindset_database.items()])
-
-    prompt_template = f"""You are an expert at analyzing growth mindset and learning orientation skills and matching them to predefined categories.
+prompt_template = """You are an expert at analyzing growth mindset and learning orientation skills and matching them to predefined categories.
 
 **Your Task:**
 Analyze the resume growth mindset assessment and determine which growth mindset traits from the database best match the evidence presented.
 
-**Growth Mindset Database Options:**
-{growthmindset_options}
-
-**Resume Growth Mindset Assessment:**
-{resume_growthmindset_assessment}
-
 **Instructions:**
 1. Carefully read the resume growth mindset assessment
 2. Compare it against each growth mindset trait in the database
@@ -85,16 +68,32 @@ Examples:
 - If no growth mindset traits are clearly evidenced: [0]
 """
 
-    # Get the async client
-    client = await get_async_client()
+
+@memoize_agent("growthmindset_agent", resume_data)
+@micro_batched("growthmindset_agent", resume_data, "Growth Mindset Database Options")
+async def growthmindset_agent(growthmindset_database, resume_growthmindset_assessment):
+    """
+    Analyzes resume growth mindset assessment against database growth mindset traits
+    Returns matching IDs or [0] if no matches found
     
-    completion = await client.beta.chat.completions.parse(
-    model="gpt-4o",
-    messages=[
-        {"role": "system", "content": prompt_template},
-        {"role": "user", "content": f"Please analyze this growth mindset assessment and return matching trait IDs: {resume_growthmindset_assessment}"}
-    ],
-    response_format=resume_data,
+    Args:
+        growthmindset_database: Dict with growth mindset traits (e.g., {"1": "Self-starter", "2": "Proactivity", ...})
+        resume_growthmindset_assessment: String with growth mindset assessment from resume analysis
+    """
+
+    # Format the growth mindset database for the prompt
+    growthmindset_options = "\n".join([f'"{id}": "{trait}"' for id, trait in growthmindset_database.items()])
+
+    completion = await parse_completion(
+        "growthmindset_agent",
+        assemble_messages(
+            prompt_template,
+            [
+                f"**Growth Mindset Database Options:**\n{growthmindset_options}"
+            ],
+            f"Please analyze this growth mindset assessment and return matching trait IDs: {resume_growthmindset_assessment}"
+        ),
+        resume_data
     )
 
     analysis_response = completion.choices[0].message
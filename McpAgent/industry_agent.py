@@ -6,9 +6,10 @@ from dotenv import load_dotenv
 import sys
 from pathlib import Path
 
-# Add parent directory to path to import shared_client
+# Add parent directory to path to import shared modules
 sys.path.append(str(Path(__file__).parent.parent))
-from shared_client import get_async_client
+from prompt_assembly import assemble_messages, parse_completion
+from agent_memo import memoize_agent
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -34,36 +35,11 @@ class resume_data(BaseModel):
     steps: list[Step]
 
 
-async def industry_agent(industry_database, JobLevel_database, experience_data):
-    """
-    Analyzes experience data and assigns appropriate industryId and JobLevelId to each experience
-    
-    Args:
-        industry_database: Dict with industry categories (e.g., {"1": "Technology", "2": "Healthcare", ...})
-        JobLevel_database: Dict with job level categories (e.g., {"1": "Entry-level", "2": "First-level", ...})
-        experience_data: List of experience objects or resume_data object with experiences
-    
-    Returns:
-        resume_data: Same structure as input but with industryId and JobLevelId populated for each experience
-        total_tokens: Token usage count
-    """
-
-    # Format the industry database for the prompt
-    industry_options = "\n".join([f'"{id}": "{industry}"' for id, industry in industry_database.items()])
-    # Format the job level database for the prompt
-    job_level_options = "\n".join([f'"{id}": "{level}"' for id, level in JobLevel_database.items()])
-
-    prompt_template = f"""You are an expert at analyzing work experiences and matching them to industry and job level categories.
+prompt_template = """You are an expert at analyzing work experiences and matching them to industry and job level categories.
 
 **Your Task:**
 Analyze each work experience (job title, company, description) and assign the most appropriate industryId and JobLevelId from the databases to each experience.
 
-**Industry Database Options:**
-{industry_options}
-
-**Job Level Database Options:**
-{job_level_options}
-
 **Instructions:**
 1. For each experience entry, analyze the job title, company name, and job description
 2. Determine which industry category best matches that specific work experience
@@ -103,7 +79,29 @@ Return the exact same structure as input but with both industryId and JobLevelId
 **Important:**
 - Preserve all existing data exactly as provided
 - Only add/update the industryId and JobLevelId fields for each experience
-- Maintain the exact same structure and format"""
+- Maintain the exact same structure and format
+"""
+
+
+@memoize_agent("industry_agent", resume_data)
+async def industry_agent(industry_database, JobLevel_database, experience_data):
+    """
+    Analyzes experience data and assigns appropriate industryId and JobLevelId to each experience
+    
+    Args:
+        industry_database: Dict with industry categories (e.g., {"1": "Technology", "2": "Healthcare", ...})
+        JobLevel_database: Dict with job level categories (e.g., {"1": "Entry-level", "2": "First-level", ...})
+        experience_data: List of experience objects or resume_data object with experiences
+    
+    Returns:
+        resume_data: Same structure as input but with industryId and JobLevelId populated for each experience
+        total_tokens: Token usage count
+    """
+
+    # Format the industry database for the prompt
+    industry_options = "\n".join([f'"{id}": "{industry}"' for id, industry in industry_database.items()])
+    # Format the job level database for the prompt
+    job_level_options = "\n".join([f'"{id}": "{level}"' for id, level in JobLevel_database.items()])
 
     # Convert experience_data to proper format for analysis
     if isinstance(experience_data, dict):
@@ -116,16 +114,17 @@ Return the exact same structure as input but with both industryId and JobLevelId
         # If it's a list or other format
         experiences_text = str(experience_data)
 
-    # Get the async client
-    client = await get_async_client()
-    
-    completion = await client.beta.chat.completions.parse(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": prompt_template},
-            {"role": "user", "content": f"Please analyze these work experiences and assign appropriate industryId to each experience:\n\n{experiences_text}"}
-        ],
-        response_format=resume_data,
+    completion = await parse_completion(
+        "industry_agent",
+        assemble_messages(
+            prompt_template,
+            [
+                f"**Industry Database Options:**\n{industry_options}",
+                f"**Job Level Database Options:**\n{job_level_options}"
+            ],
+            f"Please analyze these work experiences and assign appropriate industryId to each experience:\n\n{experiences_text}"
+        ),
+        resume_data
     )
 
     analysis_response = completion.choices[0].message
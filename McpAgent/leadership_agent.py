@@ -6,9 +6,11 @@ from dotenv import load_dotenv
 import sys
 from pathlib import Path
 
-# Add parent directory to path to import shared_client
+# Add parent directory to path to import shared modules
 sys.path.append(str(Path(__file__).parent.parent))
-from shared_client import get_async_client
+from prompt_assembly import assemble_messages, parse_completion
+from agent_memo import memoize_agent
+from micro_batcher import micro_batched
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -23,30 +25,11 @@ class resume_data(BaseModel):
     steps: list[Step]
 
 
-async def leadership_agent(leadership_database, resume_leadership_assessment):
-    """
-    Analyzes resume leadership assessment against database leadership traits
-    Returns matching IDs or [0] if no matches found
-    
-    Args:
-        leadership_database: Dict with leadership traits (e.g., {"1": "Management", "2": "Leadership", ...})
-        resume_leadership_assessment: String with leadership assessment from resume analysis
-    """
-
-    # Format the leadership database for the prompt
-    leadership_options = "\n".join([f'"{id}": "{trait}"' for id, trait in leadership_database.items()])
-
-    prompt_template = f"""You are an expert at analyzing leadership skills and matching them to predefined categories.
+prompt_template = """You are an expert at analyzing leadership skills and matching them to predefined categories.
 
 **Your Task:**
 Analyze the resume leadership assessment and determine which leadership traits from the database best match the evidence presented.
 
-**Leadership Database Options:**
-{leadership_options}
-
-**Resume Leadership Assessment:**
-{resume_leadership_assessment}
-
 **Instructions:**
 1. Carefully read the resume leadership assessment
 2. Compare it against each leadership trait in the database
@@ -86,16 +69,32 @@ Examples:
 - If no leadership traits are clearly evidenced: [0]
 """
 
-    # Get the async client
-    client = await get_async_client()
+
+@memoize_agent("leadership_agent", resume_data)
+@micro_batched("leadership_agent", resume_data, "Leadership Database Options")
+async def leadership_agent(leadership_database, resume_leadership_assessment):
+    """
+    Analyzes resume leadership assessment against database leadership traits
+    Returns matching IDs or [0] if no matches found
     
-    completion = await client.beta.chat.completions.parse(
-    model="gpt-4o",
-    messages=[
-        {"role": "system", "content": prompt_template},
-        {"role": "user", "content": f"Please analyze this leadership assessment and return matching trait IDs: {resume_leadership_assessment}"}
-    ],
-    response_format=resume_data,
+    Args:
+        leadership_database: Dict with leadership traits (e.g., {"1": "Management", "2": "Leadership", ...})
+        resume_leadership_assessment: String with leadership assessment from resume analysis
+    """
+
+    # Format the leadership database for the prompt
+    leadership_options = "\n".join([f'"{id}": "{trait}"' for id, trait in leadership_database.items()])
+
+    completion = await parse_completion(
+        "leadership_agent",
+        assemble_messages(
+            prompt_template,
+            [
+                f"**Leadership Database Options:**\n{leadership_options}"
+            ],
+            f"Please analyze this leadership assessment and return matching trait IDs: {resume_leadership_assessment}"
+        ),
+        resume_data
     )
 
     analysis_response = completion.choices[0].message
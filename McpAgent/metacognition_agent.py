@@ -6,9 +6,11 @@ from dotenv import load_dotenv
 import sys
 from pathlib import Path
 
-# Add parent directory to path to import shared_client
+# Add parent directory to path to import shared modules
 sys.path.append(str(Path(__file__).parent.parent))
-from shared_client import get_async_client
+from prompt_assembly import assemble_messages, parse_completion
+from agent_memo import memoize_agent
+from micro_batcher import micro_batched
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -23,30 +25,11 @@ class resume_data(BaseModel):
     steps: list[Step]
 
 
-async def metacognition_agent(metacognition_database, resume_metacognition_assessment):
-    """
-    Analyzes resume metacognition assessment against database metacognition traits
-    Returns matching IDs or [0] if no matches found
-    
-    Args:
-        metacognition_database: Dict with metacognition traits (e.g., {"1": "Detail Oriented", "2": "Planning", ...})
-        resume_metacognition_assessment: String with metacognition assessment from resume analysis
-    """
-
-    # Format the metacognition database for the prompt
-    metacognition_options = "\n".join([f'"{id}": "{trait}"' for id, trait in metacognition_database.items()])
-
-    prompt_template = f"""You are an expert at analyzing metacognition and self-awareness skills and matching them to predefined categories.
+prompt_template = """You are an expert at analyzing metacognition and self-awareness skills and matching them to predefined categories.
 
 **Your Task:**
 Analyze the resume metacognition assessment and determine which metacognition traits from the database best match the evidence presented.
 
-**Metacognition Database Options:**
-{metacognition_options}
-
-**Resume Metacognition Assessment:**
-{resume_metacognition_assessment}
-
 **Instructions:**
 1. Carefully read the resume metacognition assessment
 2. Compare it against each metacognition trait in the database
@@ -86,16 +69,32 @@ Examples:
 - If no metacognition traits are clearly evidenced: [0]
 """
 
-    # Get the async client
-    client = await get_async_client()
+
+@memoize_agent("metacognition_agent", resume_data)
+@micro_batched("metacognition_agent", resume_data, "Metacognition Database Options")
+async def metacognition_agent(metacognition_database, resume_metacognition_assessment):
+    """
+    Analyzes resume metacognition assessment against database metacognition traits
+    Returns matching IDs or [0] if no matches found
     
-    completion = await client.beta.chat.completions.parse(
-    model="gpt-4o",
-    messages=[
-        {"role": "system", "content": prompt_template},
-        {"role": "user", "content": f"Please analyze this metacognition assessment and return matching trait IDs: {resume_metacognition_assessment}"}
-    ],
-    response_format=resume_data,
+    Args:
+        metacognition_database: Dict with metacognition traits (e.g., {"1": "Detail Oriented", "2": "Planning", ...})
+        resume_metacognition_assessment: String with metacognition assessment from resume analysis
+    """
+
+    # Format the metacognition database for the prompt
+    metacognition_options = "\n".join([f'"{id}": "{trait}"' for id, trait in metacognition_database.items()])
+
+    completion = await parse_completion(
+        "metacognition_agent",
+        assemble_messages(
+            prompt_template,
+            [
+                f"**Metacognition Database Options:**\n{metacognition_options}"
+            ],
+            f"Please analyze this metacognition assessment and return matching trait IDs: {resume_metacognition_assessment}"
+        ),
+        resume_data
     )
 
     analysis_response = completion.choices[0].message
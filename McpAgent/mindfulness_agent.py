@@ -6,9 +6,11 @@ from dotenv import load_dotenv
 import sys
 from pathlib import Path
 
-# Add parent directory to path to import shared_client
+# Add parent directory to path to import shared modules
 sys.path.append(str(Path(__file__).parent.parent))
-from shared_client import get_async_client
+from prompt_assembly import assemble_messages, parse_completion
+from agent_memo import memoize_agent
+from micro_batcher import micro_batched
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -23,30 +25,11 @@ class resume_data(BaseModel):
     steps: list[Step]
 
 
-async def mindfulness_agent(mindfulness_database, resume_mindfulness_assessment):
-    """
-    Analyzes resume mindfulness assessment against database mindfulness traits
-    Returns matching IDs or [0] if no matches found
-    
-    Args:
-        mindfulness_database: Dict with mindfulness traits (e.g., {"1": "Hospitality", "2": "Compassion", ...})
-        resume_mindfulness_assessment: String with mindfulness assessment from resume analysis
-    """
-
-    # Format the mindfulness database for the prompt
-    mindfulness_options = "\n".join([f'"{id}": "{trait}"' for id, trait in mindfulness_database.items()])
-
-    prompt_template = f"""You are an expert at analyzing mindfulness and emotional intelligence skills and matching them to predefined categories.
+prompt_template = """You are an expert at analyzing mindfulness and emotional intelligence skills and matching them to predefined categories.
 
 **Your Task:**
 Analyze the resume mindfulness assessment and determine which mindfulness traits from the database best match the evidence presented.
 
-**Mindfulness Database Options:**
-{mindfulness_options}
-
-**Resume Mindfulness Assessment:**
-{resume_mindfulness_assessment}
-
 **Instructions:**
 1. Carefully read the resume mindfulness assessment
 2. Compare it against each mindfulness trait in the database
@@ -86,16 +69,32 @@ Examples:
 - If no mindfulness traits are clearly evidenced: [0]
 """
 
-    # Get the async client
-    client = await get_async_client()
+
+@memoize_agent("mindfulness_agent", resume_data)
+@micro_batched("mindfulness_agent", resume_data, "Mindfulness Database Options")
+async def mindfulness_agent(mindfulness_database, resume_mindfulness_assessment):
+    """
+    Analyzes resume mindfulness assessment against database mindfulness traits
+    Returns matching IDs or [0] if no matches found
     
-    completion = await client.beta.chat.completions.parse(
-    model="gpt-4o",
-    messages=[
-        {"role": "system", "content": prompt_template},
-        {"role": "user", "content": f"Please analyze this mindfulness assessment and return matching trait IDs: {resume_mindfulness_assessment}"}
-    ],
-    response_format=resume_data,
+    Args:
+        mindfulness_database: Dict with mindfulness traits (e.g., {"1": "Hospitality", "2": "Compassion", ...})
+        resume_mindfulness_assessment: String with mindfulness assessment from resume analysis
+    """
+
+    # Format the mindfulness database for the prompt
+    mindfulness_options = "\n".join([f'"{id}": "{trait}"' for id, trait in mindfulness_database.items()])
+
+    completion = await parse_completion(
+        "mindfulness_agent",
+        assemble_messages(
+            prompt_template,
+            [
+                f"**Mindfulness Database Options:**\n{mindfulness_options}"
+            ],
+            f"Please analyze this mindfulness assessment and return matching trait IDs: {resume_mindfulness_assessment}"
+        ),
+        resume_data
     )
 
     analysis_response = completion.choices[0].message
@@ -6,9 +6,12 @@ from dotenv import load_dotenv
 import sys
 from pathlib import Path
 
-# Add parent directory to path to import shared_client
+# Add parent directory to path to import shared modules
 sys.path.append(str(Path(__file__).parent.parent))
-from shared_client import get_async_client
+from prompt_assembly import assemble_messages, parse_completion
+from agent_memo import memoize_agent
+from McpAgent.technicalskills_matcher import match_skills
+from lookup_index import lookup_index
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -23,33 +26,11 @@ class resume_data(BaseModel):
     steps: list[Step]
 
 
-async def technicalskills_agent(technicalskills_database, resume_technicalskills_list):
-    """
-    Analyzes resume technical skills list against database technical skill categories
-    Returns matching IDs or [0] if no matches found
-    
-    Args:
-        technicalskills_database: Dict with technical skill categories (e.g., {"1": "Artificial Intelligence", "2": "Blockchain Development", ...})
-        resume_technicalskills_list: List of technical skills extracted from resume
-    """
-
-    # Format the technical skills database for the prompt
-    technicalskills_options = "\n".join([f'"{id}": "{skill}"' for id, skill in technicalskills_database.items()])
-    
-    # Format the resume technical skills list
-    resume_skills_formatted = ", ".join(resume_technicalskills_list)
-
-    prompt_template = f"""You are an expert at analyzing technical skills and matching them to predefined categories.
+prompt_template = """You are an expert at analyzing technical skills and matching them to predefined categories.
 
 **Your Task:**
 Analyze the resume technical skills list and determine which technical skill categories from the database best match the skills presented.
 
-**Technical Skills Database Categories:**
-{technicalskills_options}
-
-**Resume Technical Skills:**
-{resume_skills_formatted}
-
 **Instructions:**
 1. Carefully review each technical skill from the resume
 2. Match each skill to the most appropriate category from the database
@@ -94,23 +75,56 @@ Examples:
 - If no recognizable technical skills: [0]
 """
 
-    # Get the async client
-    client = await get_async_client()
+
+@memoize_agent("technicalskills_agent", resume_data, depends_on=("McpAgent.technicalskills_matcher", "lookup_index"))
+async def technicalskills_agent(technicalskills_database, resume_technicalskills_list):
+    """
+    Analyzes resume technical skills list against database technical skill categories
+    Returns matching IDs or [0] if no matches found
+
+    Skills resolved by the local matcher are not sent to GPT-4o; when every
+    skill resolves locally no LLM call is made and zero tokens are reported.
+    
+    Args:
+        technicalskills_database: Dict with technical skill categories (e.g., {"1": "Artificial Intelligence", "2": "Blockchain Development", ...})
+        resume_technicalskills_list: List of technical skills extracted from resume
+    """
+
+    # Resolve the obvious skills locally and only send the rest to the LLM
+    matched_ids, resume_technicalskills_list = match_skills(resume_technicalskills_list, technicalskills_database)
+    if not resume_technicalskills_list:
+        return resume_data(steps=[Step(id=sorted(matched_ids) or [0])]), 0
+    technicalskills_database = lookup_index.shortlist(
+        "technicalskills_agent", "technicalskills", technicalskills_database, resume_technicalskills_list
+    )
+
+    # Format the technical skills database for the prompt
+    technicalskills_options = "\n".join([f'"{id}": "{skill}"' for id, skill in technicalskills_database.items()])
     
-    completion = await client.beta.chat.completions.parse(
-    model="gpt-4o",
-    messages=[
-        {"role": "system", "content": prompt_template},
-        {"role": "user", "content": f"Please analyze these technical skills and return matching category IDs: {resume_skills_formatted}"}
-    ],
-    response_format=resume_data,
+    # Format the resume technical skills list
+    resume_skills_formatted = ", ".join(resume_technicalskills_list)
+
+    completion = await parse_completion(
+        "technicalskills_agent",
+        assemble_messages(
+            prompt_template,
+            [
+                f"**Technical Skills Database Categories:**\n{technicalskills_options}"
+            ],
+            f"Please analyze these technical skills and return matching category IDs: {resume_skills_formatted}"
+        ),
+        resume_data
     )
 
     analysis_response = completion.choices[0].message
     total_tokens = completion.usage.total_tokens
     if hasattr(analysis_response, 'refusal') and analysis_response.refusal:
         print(f"Model refused to respond: {analysis_response.refusal}")
+        if matched_ids:
+            return resume_data(steps=[Step(id=sorted(matched_ids))]), total_tokens
         return None, total_tokens
     else:
-        parsed_data = resume_data(steps=analysis_response.parsed.steps)
+        # Merge the LLM matches for the remaining skills with the local matches
+        llm_ids = {id for step in analysis_response.parsed.steps for id in step.id if id != 0}
+        parsed_data = resume_data(steps=[Step(id=sorted(matched_ids | llm_ids) or [0])])
         return parsed_data, total_tokens 
\ No newline at end of file
@@ -0,0 +1,214 @@
+"""
+Local Technical Skill Matcher
+
+This module resolves extracted resume skills against the TechnicalSkills
+lookup table without an LLM call. Skills are matched by normalized name,
+through a small alias dictionary, by token containment and finally by fuzzy
+string similarity to catch typos. Only the skills left unresolved are sent
+to technicalskills_agent's GPT-4o prompt.
+"""
+import difflib
+import os
+import re
+
+# Resolve obvious skills locally before asking the LLM
+LOCAL_SKILL_MATCH = os.getenv("LOCAL_SKILL_MATCH", "true").lower() == "true"
+# Minimum difflib similarity for a fuzzy (typo) match
+SKILL_FUZZY_CUTOFF = float(os.getenv("SKILL_FUZZY_CUTOFF", "0.88"))
+
+# Category words that may be dropped when matching a bare skill ("Python" -> "Python Programming")
+GENERIC_CATEGORY_WORDS = {"programming", "development", "language", "languages", "design", "management"}
+
+# Normalized skill -> normalized TechnicalSkillsName values it belongs to
+SKILL_ALIASES = {
+    "ai": ("artificial intelligence",),
+    "ml": ("machine learning",),
+    "deep learning": ("machine learning",),
+    "tensorflow": ("machine learning",),
+    "pytorch": ("machine learning",),
+    "keras": ("machine learning",),
+    "scikit-learn": ("machine learning",),
+    "sklearn": ("machine learning",),
+    "nlp": ("artificial intelligence",),
+    "computer vision": ("artificial intelligence",),
+    "js": ("javascript",),
+    "typescript": ("javascript",),
+    "node.js": ("javascript",),
+    "nodejs": ("javascript",),
+    "react": ("javascript", "web development"),
+    "react.js": ("javascript", "web development"),
+    "angular": ("javascript", "web development"),
+    "vue.js": ("javascript", "web development"),
+    "jquery": ("javascript",),
+    "html": ("html/css",),
+    "html5": ("html/css",),
+    "css": ("html/css",),
+    "css3": ("html/css",),
+    "django": ("python programming", "web development"),
+    "flask": ("python programming", "web development"),
+    "fastapi": ("python programming", "restful api"),
+    "pandas": ("python programming", "data analysis"),
+    "numpy": ("python programming", "data analysis"),
+    "c++": ("c++ programming",),
+    "cpp": ("c++ programming",),
+    "spring boot": ("java programming",),
+    "laravel": ("php programming",),
+    "aws": ("aws", "cloud computing"),
+    "amazon web services": ("aws", "cloud computing"),
+    "ec2": ("aws", "cloud computing"),
+    "s3": ("aws", "cloud computing"),
+    "azure": ("cloud computing",),
+    "gcp": ("cloud computing",),
+    "google cloud": ("cloud computing",),
+    "mysql": ("sql", "database management"),
+    "postgresql": ("sql", "database management"),
+    "postgres": ("sql", "database management"),
+    "sql server": ("sql", "database management"),
+    "mssql": ("sql", "database management"),
+    "oracle": ("database management",),
+    "mongodb": ("database management",),
+    "redis": ("database management",),
+    "rest": ("restful api",),
+    "rest api": ("restful api",),
+    "rest apis": ("restful api",),
+    "api": ("restful api",),
+    "apis": ("restful api",),
+    "github": ("git github",),
+    "gitlab": ("git github",),
+    "docker": ("devops",),
+    "kubernetes": ("devops",),
+    "jenkins": ("ci/cd",),
+    "github actions": ("ci/cd",),
+    "selenium": ("automation testing",),
+    "cypress": ("automation testing",),
+    "unit testing": ("testing and validation",),
+    "excel": ("microsoft excel",),
+    "ms excel": ("microsoft excel",),
+    "salesforce": ("crm",),
+    "power bi": ("data visualization",),
+    "tableau": ("data visualization",),
+    "figma": ("ui/ux design",),
+    "seo": ("seo/sem",),
+    "sem": ("seo/sem",),
+    "android": ("mobile app development",),
+    "ios": ("mobile app development",),
+    "flutter": ("mobile app development",),
+    "react native": ("mobile app development",),
+    "asp.net core": ("asp.net",),
+    ".net core": (".net",),
+    "c#": (".net",),
+}
+
+
+def normalize_skill(text):
+    """
+    Casefold a skill name, keeping characters that carry meaning in tech names (c++, c#, .net).
+    """
+    text = re.sub(r"[^\w+#./ -]", " ", str(text).casefold())
+    return re.sub(r"\s+", " ", text).strip(" -")
+
+
+def _tokens(text):
+    return set(re.split(r"[\s/,-]+", text)) - {"", "and", "&"}
+
+
+class SkillIndex:
+    """
+    Matching index over one TechnicalSkills table ({id: name}).
+    """
+
+    def __init__(self, table):
+        self.names = {}  # normalized name or name variant -> set of ids
+        full_names = {normalize_skill(name) for name in table.values()}
+        for row_id, name in table.items():
+            # "Git, GitHub" and "HTML/CSS" also match their parts
+            variants = {normalize_skill(name)} | {normalize_skill(part) for part in re.split(r"[,/]", str(name))}
+            for variant in variants - {""}:
+                self.names.setdefault(variant, set()).add(int(row_id))
+        # One-token parts ("ui" of "UI/UX", "ci" of "CI/CD") only match exactly;
+        # contained in longer skills they are too common to mean the row
+        self.tokens = {
+            name: _tokens(name) for name in self.names
+            if name in full_names or len(_tokens(name)) > 1
+        }
+
+    def _by_name(self, names):
+        ids = set()
+        for name in names:
+            ids |= self.names.get(name, set())
+        return ids
+
+    def match(self, skill):
+        """
+        IDs matching one skill, or an empty set if it needs the LLM.
+        """
+        normalized = normalize_skill(skill)
+        if not normalized:
+            return set()
+        if normalized in self.names:
+            return set(self.names[normalized])
+        if normalized in SKILL_ALIASES:
+            ids = self._by_name(SKILL_ALIASES[normalized])
+            if ids:
+                return ids
+
+        skill_tokens = _tokens(normalized)
+        ids = set()
+        for name, name_tokens in self.tokens.items():
+            # "AWS Lambda" contains the category "AWS"
+            if name_tokens and name_tokens <= skill_tokens:
+                ids |= self.names[name]
+            # "Python" is "Python Programming" without a generic word
+            elif skill_tokens < name_tokens and name_tokens - skill_tokens <= GENERIC_CATEGORY_WORDS:
+                ids |= self.names[name]
+        if ids:
+            return ids
+        for alias, names in SKILL_ALIASES.items():
+            if len(_tokens(alias)) > 1 and _tokens(alias) <= skill_tokens:
+                ids |= self._by_name(names)
+        if ids:
+            return ids
+
+        close = difflib.get_close_matches(normalized, list(self.names) + list(SKILL_ALIASES), n=1, cutoff=SKILL_FUZZY_CUTOFF)
+        if close:
+            return set(self.names.get(close[0], set())) or self._by_name(SKILL_ALIASES[close[0]])
+        return set()
+
+
+_index_cache = {}
+
+
+def get_skill_index(table):
+    """
+    Matching index for a table, rebuilt only when the table contents change.
+    """
+    key = tuple(sorted((str(row_id), str(name)) for row_id, name in table.items()))
+    index = _index_cache.get(key)
+    if index is None:
+        _index_cache.clear()
+        index = _index_cache[key] = SkillIndex(table)
+    return index
+
+
+def match_skills(skills, table):
+    """
+    Resolve resume skills locally.
+
+    Args:
+        skills: List of technical skills extracted from the resume
+        table: TechnicalSkills lookup table ({id: name})
+
+    Returns:
+        tuple: (set of matched IDs, list of skills left for the LLM)
+    """
+    if not LOCAL_SKILL_MATCH:
+        return set(), list(skills)
+    index = get_skill_index(table)
+    matched, unresolved = set(), []
+    for skill in skills:
+        ids = index.match(skill)
+        if ids:
+            matched |= ids
+        else:
+            unresolved.append(skill)
+    return matched, unresolved
@@ -0,0 +1,168 @@
+"""
+Agent Memoization
+
+This module memoizes the McpAgent calls. Results are keyed on the agent, its
+prompt source, a hash of the lookup options passed in and the normalized
+resume input, so repetitive inputs (identical skill lists, "Not specified"
+assessments, ...) are answered without another GPT-4o call. Entries live in a
+bounded in-memory LRU with an optional on-disk tier shared by all workers.
+"""
+import hashlib
+import importlib
+import json
+import os
+import re
+from collections import OrderedDict
+from functools import wraps
+
+from pydantic_core import to_jsonable_python
+
+from result_cache import ResultCache
+
+# Maximum number of agent results kept in memory per worker
+AGENT_MEMO_SIZE = int(os.getenv("AGENT_MEMO_SIZE", "4096"))
+# Optional SQLite file used as a second tier behind the in-memory LRU (empty to disable)
+AGENT_MEMO_PATH = os.getenv("AGENT_MEMO_PATH", "")
+# Size budget of the on-disk tier
+AGENT_MEMO_MAX_BYTES = int(os.getenv("AGENT_MEMO_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Shared modules that build every agent's prompt
+PROMPT_MODULES = ("prompt_assembly", "micro_batcher")
+
+
+def normalize_input(value):
+    """
+    Normalize an agent input for keying.
+
+    Free text and skill lists only feed ID matching, so whitespace, case and
+    list order are ignored. Structured inputs (experience, education) are
+    echoed back by their agents and are therefore keyed exactly.
+    """
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip().casefold()
+    if isinstance(value, (list, tuple)) and all(isinstance(item, str) for item in value):
+        return sorted({normalize_input(item) for item in value})
+    return to_jsonable_python(value)
+
+
+def module_version(module_name):
+    """
+    Hash of a module's source and of its scalar settings (read from the environment at import).
+    """
+    module = importlib.import_module(module_name)
+    with open(module.__file__, "rb") as f:
+        digest = hashlib.sha256(f.read())
+    settings = {
+        name: value for name, value in vars(module).items()
+        if name.isupper() and isinstance(value, (bool, int, float, str))
+    }
+    digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def options_hash(databases):
+    """
+    Hash of the lookup options ({id: name} dicts) passed to an agent.
+    """
+    payload = json.dumps([sorted((str(k), str(v)) for k, v in db.items()) for db in databases])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class AgentMemo:
+    """
+    Bounded LRU of agent results with an optional on-disk tier.
+    """
+
+    def __init__(self, max_entries=AGENT_MEMO_SIZE, disk=None):
+        self.max_entries = max_entries
+        self.disk = disk
+        self._entries = OrderedDict()
+        self.counters = {}
+
+    def _count(self, agent_name, outcome):
+        counters = self.counters.setdefault(agent_name, {"hits": 0, "disk_hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, agent_name, key):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self._count(agent_name, "hits")
+            return self._entries[key]
+        if self.disk is not None:
+            value = await self.disk.get(key)
+            if value is not None:
+                self._remember(key, value)
+                self._count(agent_name, "disk_hits")
+                return value
+        self._count(agent_name, "misses")
+        return None
+
+    async def put(self, key, value):
+        self._remember(key, value)
+        if self.disk is not None:
+            await self.disk.put(key, value)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        agents = {}
+        for agent_name, counters in sorted(self.counters.items()):
+            lookups = sum(counters.values())
+            hits = counters["hits"] + counters["disk_hits"]
+            agents[agent_name] = {**counters, "hit_rate": round(hits / lookups, 3) if lookups else None}
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "disk_tier": self.disk is not None,
+            "agents": agents
+        }
+
+
+# Shared memo used by every agent
+agent_memo = AgentMemo(
+    disk=ResultCache(AGENT_MEMO_PATH, max_bytes=AGENT_MEMO_MAX_BYTES) if AGENT_MEMO_PATH else None
+)
+
+
+def memoize_agent(agent_name, response_model, depends_on=()):
+    """
+    Decorator memoizing an agent ``fn(*lookup_databases, resume_input)``
+    returning ``(response_model | None, total_tokens)``.
+
+    Hits return the stored result with zero tokens. Refusals are not stored.
+    ``depends_on`` names further modules whose code or settings shape the
+    agent's result inside ``fn`` (e.g. a local matcher).
+    """
+    def decorator(fn):
+        # Prompt edits in the agent module, the shared prompt modules or its
+        # dependencies change every key of that agent
+        prompt_version = "".join(
+            module_version(module_name) for module_name in (fn.__module__, *PROMPT_MODULES, *depends_on)
+        )
+
+        @wraps(fn)
+        async def wrapper(*args):
+            *databases, resume_input = args
+            payload = json.dumps(
+                [agent_name, prompt_version, options_hash(databases), normalize_input(resume_input)],
+                sort_keys=True
+            )
+            key = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+            cached = await agent_memo.get(agent_name, key)
+            if cached is not None:
+                return response_model.model_validate(cached), 0
+
+            result, total_tokens = await fn(*args)
+            if result is not None:
+                await agent_memo.put(key, result.model_dump())
+            return result, total_tokens
+        return wrapper
+    return decorator
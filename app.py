@@ -1,16 +1,44 @@
-from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form
+# Time the imports below for the startup report
+from startup_profile import startup_profile
+startup_profile.start_import_timing()
+
+from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel, field_validator, Field, HttpUrl
 from typing import Optional, List, Dict, Any
 import uvicorn
 from datetime import datetime
 import os
-import aiofiles
+import json
+import asyncio
 from pathlib import Path
 from process import main
+from lookup_cache import lookup_cache
+from db_pool import close_pool
+from result_cache import result_cache
+from agent_memo import agent_memo
+from near_duplicate import near_duplicate_index
+from lookup_index import lookup_index
+from prompt_assembly import prompt_cache_stats
+from scraper.resume_compactor import compaction_stats, get_encoding
+from scraper.conversion_pool import conversion_pool
+from scraper.conversion_cache import conversion_cache
+from scraper import ocr_fallback
+from rate_limiter import rate_limiter
+from shared_client import async_openai_client
+from openai import APIStatusError
+from single_flight import analysis_flight, job_match_flight, payload_key
+from micro_batcher import micro_batchers
+from job_queue import job_queue, QueueFull
+from upload_buffer import read_upload, ResumeUpload, UploadTooLarge, UploadSizeLimitMiddleware, ALLOWED_EXTENSIONS
+from process import AGENT_STAGES
 # from job_maching_explation.json_data_fech import fetch_data_async
 from job_maching_explation.job_percentage_explain import matching_explanation
 
+startup_profile.imports_done()
+
 
 
 # Initialize FastAPI app
@@ -20,6 +48,9 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Reject uploads over MAX_UPLOAD_BYTES before their body is read
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # CORS middleware for cross-origin requests
 app.add_middleware(
     CORSMiddleware,
@@ -36,9 +67,90 @@ class JobMatchRequest(BaseModel):
     status: str
     data: Dict[str, Any]
 
-# Create uploads directory if it doesn't exist
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
+# Optional token required by the /admin endpoints (disabled when unset)
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN")
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Reject admin requests without the configured admin token"""
+    if ADMIN_API_TOKEN and x_admin_token != ADMIN_API_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+async def warm_lookup_tables():
+    """Load the lookup tables into memory"""
+    if lookup_cache.load_snapshot():
+        # Serve the snapshot right away and revalidate it against the database
+        lookup_cache.schedule_revalidation()
+    elif await lookup_cache.refresh():
+        print(f"Lookup tables loaded (fingerprint {lookup_cache.fingerprint()})")
+    else:
+        raise RuntimeError("Lookup tables could not be loaded")
+
+
+async def warm_openai_connection():
+    """Open a pooled HTTPS connection to the OpenAI API"""
+    try:
+        await async_openai_client.models.list()
+    except APIStatusError:
+        # Any HTTP answer means the connection is established
+        pass
+
+
+async def warm_tokenizer():
+    """Load the tiktoken encoding used for token budgets"""
+    if await asyncio.to_thread(get_encoding, retry=True) is None:
+        raise RuntimeError("tiktoken encoding could not be loaded, token budgets are estimated")
+
+
+# Steps that must complete before /ready reports the worker as ready
+WARM_UP_STEPS = {
+    "lookups": warm_lookup_tables,
+    "openai_http": warm_openai_connection,
+    "converters": conversion_pool.warm,
+    "tokenizer": warm_tokenizer
+}
+warm_up_tasks = []
+
+
+@app.on_event("startup")
+async def start_warm_up():
+    """Warm up in the background so the worker starts serving (and answering /ready) at once"""
+    startup_profile.expect(*WARM_UP_STEPS)
+    for name, warm in WARM_UP_STEPS.items():
+        warm_up_tasks.append(asyncio.create_task(startup_profile.warm(name, warm)))
+
+
+@app.on_event("startup")
+async def start_job_workers():
+    """Start the background job workers"""
+    job_queue.start()
+
+
+@app.on_event("shutdown")
+async def stop_warm_up():
+    """Cancel warm-up steps that are still retrying"""
+    for task in warm_up_tasks:
+        task.cancel()
+
+
+@app.on_event("shutdown")
+async def close_database_pool():
+    """Close pooled database connections"""
+    close_pool()
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    """Stop the background job workers"""
+    await job_queue.stop()
+
+
+@app.on_event("shutdown")
+async def stop_conversion_pool():
+    """Stop the document converter processes"""
+    await conversion_pool.shutdown()
+
 
 @app.get("/")
 async def root():
@@ -49,7 +161,11 @@ async def root():
         "docs": "/docs",
         "endpoints": {
             "health": "/health",
+            "ready": "/ready",
             "improvement_profile": "/improvement-profile",
+            "improvement_profile_stream": "/improvement-profile/stream",
+            "improvement_profile_jobs": "/improvement-profile/jobs",
+            "job_status": "/jobs/{job_id}",
             "job_member_data": "/job-member-data",
             "job_member_matching_explanation": "/job-member-matching-explanation",
             "job_matching_explanation": "/job-matching-explanation"
@@ -64,46 +180,86 @@ async def health_check():
         "service": "Resume Maker API"
     }
 
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once lookups, OpenAI connections and converters are warm, 503 until then"""
+    readiness = startup_profile.readiness()
+    return JSONResponse(
+        status_code=200 if readiness["ready"] else 503,
+        content={"status": "ready" if readiness["ready"] else "warming_up", **readiness}
+    )
+
+async def save_upload(resume_file: UploadFile):
+    """
+    Validate the uploaded resume type and read it into an upload buffer.
+
+    The buffer holds the content hash and must be closed once processed.
+    """
+    # Validate file type
+    file_extension = Path(resume_file.filename).suffix.lower()
+    
+    if file_extension not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"File type {file_extension} not supported. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+    
+    try:
+        return await read_upload(resume_file, file_extension)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+
+def delete_upload(upload: ResumeUpload):
+    """Release an upload buffer after processing"""
+    try:
+        upload.close()
+    except Exception as delete_error:
+        print(f"Warning: Could not delete uploaded file: {delete_error}")
+        # Continue execution even if file deletion fails
+
+
+async def analyze_upload(upload: ResumeUpload):
+    """Run the pipeline on an upload buffer and release it afterwards"""
+    stage_timings = {}
+    try:
+        string_data, processed_results, total_tokens, cached = await main(
+            upload.path, stage_timings=stage_timings, file_extension=upload.extension,
+            content_hash=upload.content_hash
+        )
+    finally:
+        delete_upload(upload)
+    return string_data, processed_results, total_tokens, cached, stage_timings
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
 @app.post("/improvement-profile")
 async def improve_resume(
     resume_file: UploadFile = File(..., description="Resume file (PDF, DOC, DOCX)")
 ):
     """Improve resume using provided links and uploaded resume file"""
     try:
-        # Validate file type
-        allowed_extensions = {'.pdf', '.doc', '.docx', '.txt'}
-        file_extension = Path(resume_file.filename).suffix.lower()
-        
-        if file_extension not in allowed_extensions:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"File type {file_extension} not supported. Allowed types: {', '.join(allowed_extensions)}"
-            )
-        
-        # Validate URLs if provided
-        # profile_data = {}
-        
-        # Save uploaded file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_filename = f"{timestamp}_{resume_file.filename}"
-        file_path = UPLOAD_DIR / safe_filename
-        
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await resume_file.read()
-            await f.write(content)
+        upload = await save_upload(resume_file)
 
-        string_data, processed_results, total_tokens = await main(file_path)
+        started = []
 
-        
+        def analyze():
+            started.append(upload)
+            return analyze_upload(upload)
 
-        # Clean up: delete the uploaded file after processing
+        # Concurrent uploads of the same file share one pipeline run
         try:
-            if file_path.exists():
-                file_path.unlink()
-                print(f"Successfully deleted uploaded file: {file_path}")
-        except Exception as delete_error:
-            print(f"Warning: Could not delete file {file_path}: {delete_error}")
-            # Continue execution even if file deletion fails
+            result, coalesced = await analysis_flight.do(upload.content_hash, analyze)
+        finally:
+            # An upload whose run was started is released by analyze_upload when the run ends
+            if not started:
+                delete_upload(upload)
+        string_data, processed_results, total_tokens, cached, stage_timings = result
 
         return {
             "status_code": 200,
@@ -111,8 +267,10 @@ async def improve_resume(
             "message": "Comprehensive resume analysis completed successfully",
             "processed_results": processed_results,
             "string_data": string_data,
-            "total_tokens": total_tokens
-            
+            "total_tokens": total_tokens,
+            "cached": cached,
+            "coalesced": coalesced,
+            "stage_timings": stage_timings
 
         }
         
@@ -124,6 +282,109 @@ async def improve_resume(
         
 
 
+@app.post("/improvement-profile/stream")
+async def improve_resume_stream(
+    resume_file: UploadFile = File(..., description="Resume file (PDF, DOC, DOCX)")
+):
+    """
+    Stream the resume analysis as Server-Sent Events.
+
+    Emits "string_data" as soon as the resume is parsed, one event per agent
+    result ("character", "leadership", "experience", "education", ...) as each
+    completes, then "complete" with total_tokens (or "error").
+    """
+    upload = await save_upload(resume_file)
+    events = asyncio.Queue()
+
+    async def run_pipeline():
+        stage_timings = {}
+        try:
+            _, _, total_tokens, cached = await main(
+                upload.path,
+                stage_timings=stage_timings,
+                on_event=lambda name, data: events.put_nowait((name, data)),
+                file_extension=upload.extension,
+                content_hash=upload.content_hash
+            )
+            events.put_nowait(("complete", {"total_tokens": total_tokens, "cached": cached, "stage_timings": stage_timings}))
+        except Exception as e:
+            events.put_nowait(("error", {"detail": f"Error processing resume: {str(e)}"}))
+        finally:
+            delete_upload(upload)
+            events.put_nowait(None)
+
+    async def event_stream():
+        task = asyncio.create_task(run_pipeline())
+        try:
+            while (item := await events.get()) is not None:
+                yield sse_event(*item)
+        finally:
+            # Stop the pipeline if the client disconnected early
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/improvement-profile/jobs", status_code=202)
+async def submit_resume_job(
+    resume_file: UploadFile = File(..., description="Resume file (PDF, DOC, DOCX)")
+):
+    """
+    Queue a resume analysis and return immediately.
+
+    Poll GET /jobs/{job_id} for its status, progress and result.
+    """
+    upload = await save_upload(resume_file)
+
+    async def run(on_step):
+        stage_timings = {}
+        try:
+            string_data, processed_results, total_tokens, cached = await main(
+                upload.path,
+                stage_timings=stage_timings,
+                on_event=lambda name, data: on_step(name),
+                file_extension=upload.extension,
+                content_hash=upload.content_hash
+            )
+        finally:
+            delete_upload(upload)
+        return {
+            "processed_results": processed_results,
+            "string_data": string_data,
+            "total_tokens": total_tokens,
+            "cached": cached,
+            "stage_timings": stage_timings
+        }
+
+    try:
+        # string_data plus one step per agent
+        job = await job_queue.submit(run, total_steps=len(AGENT_STAGES) + 1, cleanup=lambda: delete_upload(upload))
+    except QueueFull as e:
+        delete_upload(upload)
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {
+        "status_code": 202,
+        "status": job["status"],
+        "job_id": job["id"],
+        "status_url": f"/jobs/{job['id']}"
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status, per-stage progress and (once completed) the result of a resume analysis job"""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+
 @app.post("/job-matching-explanation")
 async def job_matching_explanation(request: JobMatchRequest):
     """
@@ -131,7 +392,9 @@ async def job_matching_explanation(request: JobMatchRequest):
     Accepts complete job and member data structure
     """
     try:
-        result, tokens = await matching_explanation(request.dict())
+        payload = request.dict()
+        # Identical payloads in flight share one GPT-4o call
+        (result, tokens), _ = await job_match_flight.do(payload_key(payload), lambda: matching_explanation(payload))
         
         if result and "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
@@ -148,6 +411,132 @@ async def job_matching_explanation(request: JobMatchRequest):
         raise HTTPException(status_code=500, detail=f"Error analyzing job match: {str(e)}")
 
 
+@app.get("/admin/lookup-cache", dependencies=[Depends(require_admin)])
+async def lookup_cache_status():
+    """Show the state of the in-memory lookup table cache"""
+    return lookup_cache.status()
+
+
+@app.post("/admin/lookup-cache/invalidate", dependencies=[Depends(require_admin)])
+async def invalidate_lookup_cache():
+    """Drop the cached lookup tables and reload them from the database"""
+    if not await lookup_cache.invalidate():
+        raise HTTPException(status_code=503, detail=f"Lookup table reload failed: {lookup_cache.status()['last_error']}")
+    return {
+        "status": "success",
+        "message": "Lookup tables reloaded",
+        "cache": lookup_cache.status()
+    }
+
+
+@app.get("/admin/result-cache", dependencies=[Depends(require_admin)])
+async def result_cache_status():
+    """Show size and hit rate of the resume result cache"""
+    if result_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **await result_cache.stats()}
+
+
+@app.post("/admin/result-cache/clear", dependencies=[Depends(require_admin)])
+async def clear_result_cache():
+    """Remove every cached resume analysis"""
+    if result_cache is not None:
+        await result_cache.clear()
+    return {"status": "success", "message": "Result cache cleared"}
+
+
+@app.get("/admin/agent-memo", dependencies=[Depends(require_admin)])
+async def agent_memo_status():
+    """Show per-agent hit/miss counters of the agent memoization layer"""
+    return agent_memo.stats()
+
+
+@app.get("/admin/lookup-index", dependencies=[Depends(require_admin)])
+async def lookup_index_status():
+    """Show the per-agent top-K and how many lookup rows were kept out of agent prompts"""
+    return lookup_index.stats()
+
+
+@app.get("/admin/prompt-cache", dependencies=[Depends(require_admin)])
+async def prompt_cache_status():
+    """Show cached vs. uncached prompt tokens per GPT-4o call site"""
+    return prompt_cache_stats.stats()
+
+
+@app.get("/admin/resume-compaction", dependencies=[Depends(require_admin)])
+async def resume_compaction_status():
+    """Show resume tokens before and after compaction"""
+    return compaction_stats
+
+
+@app.get("/admin/rate-limiter", dependencies=[Depends(require_admin)])
+async def rate_limiter_status():
+    """Show the shared OpenAI request/token buckets and throttling counters"""
+    if rate_limiter is None:
+        return {"enabled": False}
+    return await rate_limiter.stats()
+
+
+@app.get("/admin/single-flight", dependencies=[Depends(require_admin)])
+async def single_flight_status():
+    """Show how many requests were coalesced onto an in-flight execution"""
+    return {flight.name: flight.stats() for flight in (analysis_flight, job_match_flight)}
+
+
+@app.get("/admin/micro-batching", dependencies=[Depends(require_admin)])
+async def micro_batching_status():
+    """Show batch sizes and call counts of the micro-batched agents"""
+    return {agent_name: batcher.stats() for agent_name, batcher in sorted(micro_batchers.items())}
+
+
+@app.get("/admin/conversion-pool", dependencies=[Depends(require_admin)])
+async def conversion_pool_status():
+    """Show converter pool size, queued conversions, timeouts and conversion times"""
+    return conversion_pool.stats()
+
+
+@app.get("/admin/conversion-cache", dependencies=[Depends(require_admin)])
+async def conversion_cache_status():
+    """Show the size, hit rate and parsing saved by the document conversion cache"""
+    if conversion_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **await conversion_cache.stats()}
+
+
+@app.post("/admin/conversion-cache/clear", dependencies=[Depends(require_admin)])
+async def clear_conversion_cache():
+    """Remove every cached document conversion"""
+    if conversion_cache is not None:
+        await conversion_cache.store.clear()
+    return {"status": "success", "message": "Conversion cache cleared"}
+
+
+@app.get("/admin/ocr", dependencies=[Depends(require_admin)])
+async def ocr_status():
+    """Show pages read by the local OCR, their confidence and how many went to the LLM"""
+    return ocr_fallback.stats()
+
+
+@app.get("/admin/startup", dependencies=[Depends(require_admin)])
+async def startup_status():
+    """Show import time per module and package, and the duration of each warm-up step"""
+    return startup_profile.report()
+
+
+@app.get("/admin/jobs", dependencies=[Depends(require_admin)])
+async def job_queue_status():
+    """Show job queue depth and job counts by status"""
+    return job_queue.stats()
+
+
+@app.get("/admin/near-duplicates", dependencies=[Depends(require_admin)])
+async def near_duplicate_status():
+    """Show the size and reuse rate of the near-duplicate resume index"""
+    if near_duplicate_index is None:
+        return {"enabled": False}
+    return {"enabled": True, **near_duplicate_index.stats()}
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "app:app",
@@ -0,0 +1,99 @@
+"""
+Lookup Fetch Benchmark
+
+Compares the per-table and batched lookup loaders of
+scraper/databse_scraper_agent.py against a local SQLite stand-in for
+SQL Server. Every statement sent to the stand-in pays a simulated network
+round-trip, which is what dominates on a cross-region database link.
+
+Usage:
+    python benchmarks/lookup_fetch_benchmark.py --rtt-ms 40 --rounds 5
+"""
+import argparse
+import sqlite3
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import the scraper package
+sys.path.append(str(Path(__file__).parent.parent))
+from scraper.databse_scraper_agent import (
+    LOOKUP_TABLES,
+    fetch_lookup_tables,
+    fetch_lookup_tables_batched,
+)
+
+
+class LatencyCursor:
+    """
+    sqlite3 cursor wrapper that sleeps for one round-trip on every execute.
+    """
+
+    def __init__(self, cursor, rtt):
+        self._cursor = cursor
+        self._rtt = rtt
+        self.round_trips = 0
+
+    def execute(self, query, *params):
+        time.sleep(self._rtt)
+        self.round_trips += 1
+        return self._cursor.execute(query, *params)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+
+def build_stand_in_database(rows_per_table):
+    conn = sqlite3.connect(":memory:")
+    for table_name, name_column in LOOKUP_TABLES.values():
+        conn.execute(f"CREATE TABLE {table_name} (Id INTEGER PRIMARY KEY, {name_column} TEXT)")
+        conn.executemany(
+            f"INSERT INTO {table_name} (Id, {name_column}) VALUES (?, ?)",
+            [(i, f"{table_name} option {i}") for i in range(1, rows_per_table + 1)]
+        )
+    conn.commit()
+    return conn
+
+
+def run_strategy(conn, loader, rtt, rounds):
+    timings = []
+    result = None
+    round_trips = 0
+    for _ in range(rounds):
+        cursor = LatencyCursor(conn.cursor(), rtt)
+        start = time.perf_counter()
+        result = loader(cursor)
+        timings.append(time.perf_counter() - start)
+        round_trips = cursor.round_trips
+    return result, timings, round_trips
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rtt-ms", type=float, default=40.0, help="Simulated round-trip time per statement")
+    parser.add_argument("--rows", type=int, default=60, help="Rows per lookup table")
+    parser.add_argument("--rounds", type=int, default=5, help="Refreshes to time per strategy")
+    args = parser.parse_args()
+
+    conn = build_stand_in_database(args.rows)
+    rtt = args.rtt_ms / 1000
+
+    per_table, per_table_timings, per_table_trips = run_strategy(conn, fetch_lookup_tables, rtt, args.rounds)
+    batched, batched_timings, batched_trips = run_strategy(conn, fetch_lookup_tables_batched, rtt, args.rounds)
+
+    if per_table != batched:
+        raise SystemExit("Batched loader returned different lookup data than the per-table loader")
+
+    print(f"{len(LOOKUP_TABLES)} tables x {args.rows} rows, simulated RTT {args.rtt_ms:.1f} ms, {args.rounds} rounds")
+    print(f"{'strategy':<12}{'round-trips':>12}{'median ms':>12}{'min ms':>10}")
+    for name, timings, trips in (
+        ("per_table", per_table_timings, per_table_trips),
+        ("batched", batched_timings, batched_trips),
+    ):
+        print(f"{name:<12}{trips:>12}{statistics.median(timings) * 1000:>12.1f}{min(timings) * 1000:>10.1f}")
+    print(f"speedup: {statistics.median(per_table_timings) / statistics.median(batched_timings):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+PDF Extraction Benchmark
+
+Compares whole-document PDF text extraction (one pdfminer pass over the
+file, which is what MarkItDown's PDF converter does) with the page-parallel
+extraction of scraper/pdf_pages.py in the conversion pool, over generated
+text PDFs of 1 to 20 pages. With --early-pages it also reports when the
+first pages were handed to the string extraction.
+
+Usage:
+    python benchmarks/pdf_extraction_benchmark.py --max-pages 20 --workers 4 --rounds 3 --early-pages 2
+"""
+import argparse
+import asyncio
+import io
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+WORDS = (
+    "managed designed delivered platform customers revenue python aws kubernetes team "
+    "stakeholders roadmap analytics migration reliability latency pipeline hiring mentoring "
+    "budget quarterly launch security compliance automation testing documentation"
+).split()
+
+
+def escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_pdf(page_count, lines_per_page=55, seed=0):
+    """
+    Write a minimal text-only PDF with one Helvetica text block per page.
+    """
+    rng = random.Random(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_numbers = []
+    for page in range(page_count):
+        lines = [f"Experience page {page + 1}"] + [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 14))).capitalize() + "."
+            for _ in range(lines_per_page)
+        ]
+        stream = "BT /F1 10 Tf 12 TL 50 790 Td " + " ".join(f"({escape(line)}) Tj T*" for line in lines) + " ET"
+        stream = stream.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_number = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_number
+        )
+        page_numbers.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % number for number in page_numbers)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, page_count)
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+
+async def run_benchmark(args):
+    from pdfminer.high_level import extract_text
+    from scraper.conversion_pool import ConversionPool
+
+    pool = ConversionPool(size=args.workers, timeout=600)
+    pool.start()
+    # Let every worker finish starting before timing
+    await asyncio.gather(*[pool.run(time.sleep, 0.2) for _ in range(args.workers)])
+    directory = tempfile.TemporaryDirectory()
+
+    print(f"{args.workers} workers, {args.rounds} rounds, early start pages: {args.early_pages or 'off'}")
+    print(f"{'pages':>5}{'whole ms':>11}{'parallel ms':>13}{'speedup':>9}{'first pages ms':>16}")
+    for page_count in sorted({1, 2, 3, 5, 10, 15, args.max_pages} | set(range(1, args.max_pages + 1, 5))):
+        if page_count > args.max_pages:
+            continue
+        pdf = build_pdf(page_count, seed=page_count)
+        # The conversion pool workers open the file by its path
+        pdf_path = Path(directory.name) / f"resume_{page_count}.pdf"
+        pdf_path.write_bytes(pdf)
+        whole, parallel, first = [], [], []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            expected = extract_text(io.BytesIO(pdf))
+            whole.append(time.perf_counter() - start)
+
+            first_pages_at = []
+            start = time.perf_counter()
+            text = await pool.convert(
+                pdf_path, ".pdf",
+                on_first_pages=lambda _: first_pages_at.append(time.perf_counter() - start)
+            )
+            parallel.append(time.perf_counter() - start)
+            first.extend(first_pages_at)
+            if text.split() != expected.split():
+                raise SystemExit(f"Page-parallel text differs from whole-document text for {page_count} pages")
+
+        whole_ms = statistics.median(whole) * 1000
+        parallel_ms = statistics.median(parallel) * 1000
+        first_ms = f"{statistics.median(first) * 1000:.1f}" if first else "-"
+        print(f"{page_count:>5}{whole_ms:>11.1f}{parallel_ms:>13.1f}{whole_ms / parallel_ms:>8.1f}x{first_ms:>16}")
+    await pool.shutdown()
+    directory.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-pages", type=int, default=20, help="Largest generated PDF")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="Conversion pool processes")
+    parser.add_argument("--rounds", type=int, default=3, help="Extractions to time per PDF and strategy")
+    parser.add_argument("--early-pages", type=int, default=0, help="First pages handed over early (0 disables)")
+    args = parser.parse_args()
+
+    # Configure the extraction modules before they are imported
+    os.environ["CONVERSION_CACHE_PATH"] = ""
+    os.environ["LOCAL_OCR"] = "false"
+    os.environ["PDF_PAGE_PARALLEL"] = "true"
+    os.environ["PDF_EARLY_START_PAGES"] = str(args.early_pages)
+    # Add parent directory to path to import the scraper package
+    sys.path.append(str(Path(__file__).parent.parent))
+    asyncio.run(run_benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
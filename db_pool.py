@@ -0,0 +1,173 @@
+"""
+Shared Database Access Layer
+
+This module provides a bounded pool of reusable pyodbc connections. pyodbc is
+blocking, so every query runs on a dedicated thread pool and is awaited from
+the event loop, which keeps slow SQL Server round-trips from stalling the
+other requests handled by the same worker.
+"""
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from dotenv import load_dotenv
+
+load_dotenv()
+DRIVER = os.getenv("DRIVER")
+SERVER = os.getenv("SERVER")
+DATABASE = os.getenv("DATABASE")
+TRUSTED_CONNECTION = os.getenv("TRUSTED_CONNECTION")
+UID = os.getenv("UID")
+PWD = os.getenv("PWD")
+
+# Maximum number of open connections (and database threads) per worker
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+# Seconds to wait for a free connection before giving up
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Idle connections older than this many seconds are checked before reuse
+DB_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_HEALTH_CHECK_INTERVAL", "60"))
+
+
+def connect():
+    """
+    Open a new SQL Server connection using the configured authentication method.
+    """
+    # Imported on first connection, so the driver manager is not loaded at import time
+    import pyodbc
+
+    if TRUSTED_CONNECTION and TRUSTED_CONNECTION.lower() == 'yes':
+        # Windows Authentication
+        return pyodbc.connect(
+            DRIVER=DRIVER,
+            SERVER=SERVER,
+            DATABASE=DATABASE,
+            Trusted_Connection=TRUSTED_CONNECTION,
+            autocommit=True
+        )
+    # SQL Server Authentication
+    return pyodbc.connect(
+        DRIVER=DRIVER,
+        SERVER=SERVER,
+        DATABASE=DATABASE,
+        UID=UID,
+        PWD=PWD,
+        autocommit=True
+    )
+
+
+class ConnectionPool:
+    """
+    Bounded pool of database connections served from a dedicated thread pool.
+    """
+
+    def __init__(self, connect, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                 health_check_interval=DB_HEALTH_CHECK_INTERVAL):
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="db-pool")
+
+    def _is_healthy(self, conn):
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _acquire(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No database connection available after {self.timeout}s")
+        try:
+            while True:
+                try:
+                    conn, last_used = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._connect()
+                if time.monotonic() - last_used < self.health_check_interval or self._is_healthy(conn):
+                    return conn
+                self._discard(conn)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, conn, broken=False):
+        if broken:
+            self._discard(conn)
+        else:
+            self._idle.put((conn, time.monotonic()))
+        self._slots.release()
+
+    def _run(self, fn, *args):
+        conn = self._acquire()
+        try:
+            result = fn(conn, *args)
+        except BaseException:
+            # The connection state is unknown after a failure, never reuse it
+            self._release(conn, broken=True)
+            raise
+        self._release(conn)
+        return result
+
+    async def run(self, fn, *args):
+        """
+        Run ``fn(connection, *args)`` on the database thread pool.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(self._run, fn, *args))
+
+    def close(self):
+        """
+        Close every idle connection and stop the database threads.
+        """
+        self._executor.shutdown(wait=False)
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
+# Shared connection pool used by all database modules
+db_pool = ConnectionPool(connect)
+
+
+def _with_cursor(conn, fn, *args):
+    cursor = conn.cursor()
+    try:
+        return fn(cursor, *args)
+    finally:
+        cursor.close()
+
+
+async def run_with_cursor(fn, *args):
+    """
+    Run ``fn(cursor, *args)`` with a pooled connection without blocking the event loop.
+
+    Returns:
+        Whatever ``fn`` returns
+    """
+    return await db_pool.run(_with_cursor, fn, *args)
+
+
+def close_pool():
+    """
+    Close the shared connection pool when shutting down.
+    """
+    db_pool.close()
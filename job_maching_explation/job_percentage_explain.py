@@ -6,9 +6,9 @@ from dotenv import load_dotenv
 import sys
 from pathlib import Path
 
-# Add parent directory to path to import shared_client
+# Add parent directory to path to import shared modules
 sys.path.append(str(Path(__file__).parent.parent))
-from shared_client import get_async_client
+from prompt_assembly import assemble_messages, parse_completion
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -24,6 +24,47 @@ class JobMatchAnalysis(BaseModel):
     
 
 
+prompt_template = """You are an AI career advisor analyzing a job match. Based on the provided job posting and member profile data, provide a detailed analysis of the job match.
+
+MATCHING ALGORITHM COMPONENTS:
+1. Required Skills (30%): Job's Required Skills matched against your Technical Skills and Soft Skills (Character, Collaboration, Communication, Creativity, Critical Thinking, Fortitude, Growth Mindset, Leadership, Mindfulness) and Other Skills
+2. Preferred Skills (15%): Job's Preferred Skills matched against your Technical Skills and Other Skills
+3. Other Skills (10%): Job's Required & Preferred Skills matched against your Technical Skills and Other Skills
+4. Qualifications (15%): Job's Qualifications matched against your Education and Experience
+5. Responsibilities (15%): Job's Key Responsibilities matched against your Experience
+6. Industry (5%): Job's Industry matched against your Industry experience
+7. Role (5%): Job's Role matched against your Job Titles
+8. Location (5%): Job's Location matched against your City
+
+SKILL ANALYSIS REQUIREMENTS:
+1. FUNDAMENTAL SKILLS MATCHING: Analyze and identify which fundamental/soft skills from your profile (Communication, Leadership, Critical Thinking, Collaboration, Character, Creativity, Growth Mindset, Mindfulness, Fortitude) match with the job requirements. Consider both explicit mentions and implicit requirements based on job responsibilities.
+
+2. TECHNICAL SKILLS MATCHING: Analyze and identify which technical skills from your profile (TechnicalSkillNames, OtherSkills) directly match with the job's Required Skills, Preferred Skills, and responsibilities. Include programming languages, frameworks, tools, platforms, methodologies, and domain-specific technical knowledge.
+
+3. VISA SPONSORSHIP ANALYSIS: The job posting states whether the candidate requires visa sponsorship. Analyze how this might impact job eligibility and application strategy.
+
+Based on the job posting, profile and match result provided by the user and the matching algorithm above, provide a detailed explanation of:
+1. Why the profile received its match score for this job
+2. Identify the strongest matching areas between your profile and the job
+3. Identify skills or qualifications gaps you should work on to improve your match percentage
+4. Provide 3-5 specific, actionable recommendations for how you can improve your match score
+5. List specific fundamental skills that match between your profile and job requirements
+6. List specific technical skills that match between your profile and job requirements
+7. Analyze visa sponsorship implications for this job opportunity
+
+Provide your response with these components:
+- match_explanation: detailed explanation text of why the profile received this match score
+- strengths: list of matching strengths between the profile and job (provide as array of strings)
+- gaps: list of skill/qualification gaps that should be addressed (provide as array of strings)  
+- recommendations: list of specific, actionable recommendations for improvement (provide as array of strings)
+- fundamental_skills_matched: list of specific fundamental/soft skills that match between your profile and job requirements (provide as array of strings)
+- technical_skills_matched: list of specific technical skills that match between your profile and job requirements (provide as array of strings)
+- visa_sponsorship: boolean value indicating whether visa sponsorship is required for this position (MUST return exactly the Visa Sponsorship Required value of the job posting)
+
+IMPORTANT: All list fields (strengths, gaps, recommendations, fundamental_skills_matched, technical_skills_matched) MUST be arrays of strings, not single strings or other formats. The visa_sponsorship field MUST be the exact boolean value provided in the input.
+"""
+
+
 async def matching_explanation(data):
     """
     Use OpenAI to analyze the job match and provide an explanation
@@ -44,8 +85,6 @@ async def matching_explanation(data):
         # For now, return error asking for complete data structure
         return {"error": "Please provide complete data structure with member and jobpost data"}, 0
     
-    prompt_template = """You are an AI career advisor analyzing a job match. Based on the provided job posting and member profile data, provide a detailed analysis of the job match."""
-    
     user_prompt = f"""
 JOB POSTING:
 - Title: {job_data.get('JobTitle', 'N/A')}
@@ -79,55 +118,14 @@ YOUR PROFILE:
 MATCH RESULT:
 - Match Percentage: {match_percentage}%
 
-MATCHING ALGORITHM COMPONENTS:
-1. Required Skills (30%): Job's Required Skills matched against your Technical Skills and Soft Skills (Character, Collaboration, Communication, Creativity, Critical Thinking, Fortitude, Growth Mindset, Leadership, Mindfulness) and Other Skills
-2. Preferred Skills (15%): Job's Preferred Skills matched against your Technical Skills and Other Skills
-3. Other Skills (10%): Job's Required & Preferred Skills matched against your Technical Skills and Other Skills
-4. Qualifications (15%): Job's Qualifications matched against your Education and Experience
-5. Responsibilities (15%): Job's Key Responsibilities matched against your Experience
-6. Industry (5%): Job's Industry matched against your Industry experience
-7. Role (5%): Job's Role matched against your Job Titles
-8. Location (5%): Job's Location matched against your City
-
-SKILL ANALYSIS REQUIREMENTS:
-1. FUNDAMENTAL SKILLS MATCHING: Analyze and identify which fundamental/soft skills from your profile (Communication, Leadership, Critical Thinking, Collaboration, Character, Creativity, Growth Mindset, Mindfulness, Fortitude) match with the job requirements. Consider both explicit mentions and implicit requirements based on job responsibilities.
-
-2. TECHNICAL SKILLS MATCHING: Analyze and identify which technical skills from your profile (TechnicalSkillNames, OtherSkills) directly match with the job's Required Skills, Preferred Skills, and responsibilities. Include programming languages, frameworks, tools, platforms, methodologies, and domain-specific technical knowledge.
-
-3. VISA SPONSORSHIP ANALYSIS: The candidate requires visa sponsorship: {visa_sponsorship_needed}. Analyze how this might impact job eligibility and application strategy.
-
-Based on the above information and matching algorithm, provide a detailed explanation of:
-1. Why your profile received a {match_percentage}% match score for this job
-2. Identify the strongest matching areas between your profile and the job
-3. Identify skills or qualifications gaps you should work on to improve your match percentage
-4. Provide 3-5 specific, actionable recommendations for how you can improve your match score
-5. List specific fundamental skills that match between your profile and job requirements
-6. List specific technical skills that match between your profile and job requirements
-7. Analyze visa sponsorship implications for this job opportunity
-
-Provide your response with these components:
-- match_explanation: detailed explanation text of why the profile received this match score
-- strengths: list of matching strengths between the profile and job (provide as array of strings)
-- gaps: list of skill/qualification gaps that should be addressed (provide as array of strings)  
-- recommendations: list of specific, actionable recommendations for improvement (provide as array of strings)
-- fundamental_skills_matched: list of specific fundamental/soft skills that match between your profile and job requirements (provide as array of strings)
-- technical_skills_matched: list of specific technical skills that match between your profile and job requirements (provide as array of strings)
-- visa_sponsorship: boolean value indicating whether visa sponsorship is required for this position (MUST return exactly {visa_sponsorship_needed})
-
-IMPORTANT: All list fields (strengths, gaps, recommendations, fundamental_skills_matched, technical_skills_matched) MUST be arrays of strings, not single strings or other formats. The visa_sponsorship field MUST be the exact boolean value {visa_sponsorship_needed} as provided in the input.
+The candidate requires visa sponsorship: {visa_sponsorship_needed}. Explain why this profile received a {match_percentage}% match score and return visa_sponsorship exactly as {visa_sponsorship_needed}.
 """
 
     try:
-        # Get the async client
-        client = await get_async_client()
-        
-        completion = await client.beta.chat.completions.parse(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": prompt_template},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format=JobMatchAnalysis,
+        completion = await parse_completion(
+            "matching_explanation",
+            assemble_messages(prompt_template, request=user_prompt),
+            JobMatchAnalysis
         )
 
         analysis_response = completion.choices[0].message
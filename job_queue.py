@@ -0,0 +1,197 @@
+"""
+Background Job Queue
+
+This module runs resume analyses as background jobs. Submitting a job only
+enqueues it; a bounded pool of worker tasks runs the jobs and records their
+status, progress and result. Job records are also written to a small SQLite
+store shared by all uvicorn workers, so a job can be polled on any worker,
+and are kept for a TTL after they finish.
+"""
+import asyncio
+import os
+import time
+import uuid
+
+from pydantic_core import to_jsonable_python
+
+from result_cache import ResultCache
+
+# Concurrent jobs per worker process
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# Jobs waiting per worker process before submissions are rejected
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+# Seconds finished jobs are kept
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "3600"))
+# SQLite file shared by the workers for job records (empty keeps jobs per process)
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "cache/jobs.sqlite3")
+
+
+class QueueFull(Exception):
+    """Raised when the job queue has no room for another job."""
+
+
+class JobQueue:
+    """
+    Bounded queue of coroutine jobs processed by a fixed number of workers.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, max_queued=JOB_QUEUE_SIZE, ttl=JOB_RESULT_TTL, store=None):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self.store = store
+        self._queue = None
+        self._tasks = []
+        self._jobs = {}
+        self._locks = {}
+        self._step_writes = set()
+
+    def start(self):
+        """
+        Start the worker tasks (call from the running event loop).
+        """
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [asyncio.create_task(self._worker(), name=f"job-worker-{i}") for i in range(self.workers)]
+
+    async def stop(self):
+        """
+        Cancel the workers; running and queued jobs are marked as failed.
+        """
+        unfinished = [job for job in self._jobs.values() if job["finished_at"] is None]
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Jobs that never started release their resources too
+        while self._queue is not None and not self._queue.empty():
+            job, _, cleanup = self._queue.get_nowait()
+            job.update(status="failed", error="Server shutting down", finished_at=time.time())
+            if cleanup is not None:
+                cleanup()
+        # Other workers read the store, where these jobs would otherwise stay pending
+        await asyncio.gather(*[self._persist(job) for job in unfinished])
+
+    def _prune(self):
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job["finished_at"] is not None and now - job["finished_at"] > self.ttl:
+                del self._jobs[job_id]
+                self._locks.pop(job_id, None)
+
+    async def _persist(self, job):
+        if self.store is None:
+            return
+        async with self._locks.setdefault(job["id"], asyncio.Lock()):
+            # Written under the job's lock so the latest state is always stored last
+            await self.store.put(job["id"], to_jsonable_python(job))
+
+    async def submit(self, run, total_steps=None, cleanup=None):
+        """
+        Enqueue a job.
+
+        Args:
+            run: ``run(on_step)`` coroutine function returning the job result;
+                ``on_step(name)`` records a completed step
+            total_steps: Number of steps expected, for progress reporting
+            cleanup: Optional callable run when the job is dropped before it ran
+
+        Returns:
+            dict: The job record
+
+        Raises:
+            QueueFull: If the queue is full or not started
+        """
+        self._prune()
+        if self._queue is None or self._queue.full():
+            raise QueueFull("Job queue is full, try again later")
+
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": "queued",
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "progress": {"completed_steps": [], "total_steps": total_steps},
+            "result": None,
+            "error": None
+        }
+        self._jobs[job["id"]] = job
+        self._queue.put_nowait((job, run, cleanup))
+        await self._persist(job)
+        if self.store is not None:
+            # Records are rewritten whenever a job changes, so expired jobs are the ones not written for the TTL
+            await self.store.prune(self.ttl)
+        return job
+
+    async def _worker(self):
+        while True:
+            job, run, cleanup = await self._queue.get()
+            try:
+                await self._run(job, run)
+            except asyncio.CancelledError:
+                job.update(status="failed", error="Server shutting down", finished_at=time.time())
+                if cleanup is not None:
+                    cleanup()
+                raise
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job, run):
+        job.update(status="running", started_at=time.time())
+        await self._persist(job)
+
+        def on_step(name):
+            job["progress"]["completed_steps"].append(name)
+            task = asyncio.ensure_future(self._persist(job))
+            # Keep a reference so the write is not garbage collected while running
+            self._step_writes.add(task)
+            task.add_done_callback(self._step_written)
+
+        try:
+            job["result"] = await run(on_step)
+            job["status"] = "completed"
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+        job["finished_at"] = time.time()
+        await self._persist(job)
+
+    def _step_written(self, task):
+        self._step_writes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Error saving job progress: {task.exception()}")
+
+    async def get(self, job_id):
+        """
+        Get a job record from this worker or the shared store.
+
+        Returns:
+            dict: The job record, or None if unknown or expired
+        """
+        self._prune()
+        job = self._jobs.get(job_id)
+        if job is None and self.store is not None:
+            job = await self.store.get(job_id)
+        if job is None:
+            return None
+        if job["finished_at"] is not None and time.time() - job["finished_at"] > self.ttl:
+            return None
+        return job
+
+    def stats(self):
+        statuses = {}
+        for job in self._jobs.values():
+            statuses[job["status"]] = statuses.get(job["status"], 0) + 1
+        return {
+            "workers": self.workers,
+            "max_queued": self.max_queued,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "ttl_seconds": self.ttl,
+            "jobs": statuses
+        }
+
+
+# Shared job queue used by the API
+job_queue = JobQueue(store=ResultCache(JOB_STORE_PATH) if JOB_STORE_PATH else None)
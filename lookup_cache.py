@@ -0,0 +1,299 @@
+"""
+Lookup Table Cache
+
+This module keeps the SQL Server lookup tables (Industry, JobLevel, Leadership,
+TechnicalSkills, ...) in process memory. The tables are loaded once at startup,
+served from memory to every request and revalidated in the background once the
+TTL has expired (stale-while-revalidate), so the database is no longer on the
+critical path of the resume pipeline.
+
+Every table carries a content fingerprint. Revalidation first runs a cheap
+version probe and only reloads the tables when it reports a change; listeners
+are then told exactly which tables changed so that derived caches can drop
+only the affected entries.
+
+Successful loads are also written to a small JSON snapshot file. Workers load
+the snapshot on boot for a DB-free start and fall back to it whenever SQL
+Server cannot be reached.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+from scraper.databse_scraper_agent import fetch_data_async, fetch_versions_async
+
+# Seconds before cached lookup tables are considered stale and revalidated
+LOOKUP_CACHE_TTL = float(os.getenv("LOOKUP_CACHE_TTL", "3600"))
+# Snapshot file written after every successful load (empty to disable)
+LOOKUP_SNAPSHOT_PATH = os.getenv("LOOKUP_SNAPSHOT_PATH", "cache/lookup_snapshot.json")
+
+def table_fingerprint(rows):
+    """
+    Content fingerprint of one lookup table ({id: name}), independent of row order.
+    """
+    items = sorted((str(row_id), str(name)) for row_id, name in rows.items())
+    return hashlib.sha256(json.dumps(items).encode("utf-8")).hexdigest()[:16]
+
+
+def combine_fingerprints(fingerprints):
+    """
+    Combine per-table fingerprints ({table: fingerprint}) into one fingerprint.
+    """
+    payload = json.dumps(sorted(fingerprints.items()))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class LookupCache:
+    """
+    In-memory cache for the lookup tables returned by a loader coroutine.
+
+    The loader must return either ``{table: {id: name}}`` or ``{'error': ...}``
+    (the contract of ``fetch_data_async``). The optional version probe follows
+    the same contract with ``{table: version}``.
+    """
+
+    def __init__(self, loader, ttl=LOOKUP_CACHE_TTL, version_probe=None, snapshot_path=None):
+        self._loader = loader
+        self._version_probe = version_probe
+        self.ttl = ttl
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self._source = None
+        self._data = None
+        self._versions = None
+        self._fingerprints = {}
+        # Monotonic time of the last database load, None when the tables are stale
+        self._loaded_at = None
+        # Wall-clock time the cached tables were read from their source
+        self._loaded_time = None
+        self._last_error = None
+        self._listeners = []
+        self._lock = asyncio.Lock()
+        self._refresh_task = None
+
+    @property
+    def is_loaded(self):
+        return self._data is not None
+
+    @property
+    def is_stale(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl
+
+    def add_listener(self, callback):
+        """
+        Register ``callback(changed_tables)`` to be called whenever reloaded
+        tables differ from the previously cached ones.
+        """
+        self._listeners.append(callback)
+
+    def fingerprint(self, tables=None):
+        """
+        Fingerprint of the given lookup tables, or of all tables when omitted.
+
+        Returns:
+            str: Combined fingerprint, or None if the tables are not loaded
+        """
+        if self._data is None:
+            return None
+        if tables is None:
+            tables = self._fingerprints.keys()
+        return combine_fingerprints({table: self._fingerprints.get(table) for table in tables})
+
+    async def refresh(self):
+        """
+        Reload the lookup tables from the loader.
+
+        On failure the previously cached tables are kept so that requests can
+        still be served from stale data.
+
+        Returns:
+            bool: True if the tables were reloaded successfully
+        """
+        async with self._lock:
+            return await self._load()
+
+    async def _probe_versions(self):
+        if self._version_probe is None:
+            return None
+        versions = await self._version_probe()
+        if isinstance(versions, dict) and 'error' in versions:
+            print(f"Lookup version probe failed: {versions['error']}")
+            return None
+        return versions
+
+    async def _load(self):
+        # Probe before loading so a concurrent change is caught by the next probe
+        versions = await self._probe_versions()
+        data = await self._loader()
+        if isinstance(data, dict) and 'error' in data:
+            self._last_error = data['error']
+            print(f"Lookup cache refresh failed: {self._last_error}")
+            return False
+
+        self._set_data(data, versions, "database")
+        await asyncio.to_thread(self._write_snapshot)
+        return True
+
+    def _set_data(self, data, versions, source, loaded_time=None):
+        fingerprints = {table: table_fingerprint(rows) for table, rows in data.items()}
+        changed = {
+            table for table in fingerprints.keys() | self._fingerprints.keys()
+            if fingerprints.get(table) != self._fingerprints.get(table)
+        }
+        had_data = self._data is not None
+
+        self._data = data
+        self._versions = versions
+        self._fingerprints = fingerprints
+        self._loaded_at = time.monotonic() if source == "database" else None
+        self._loaded_time = loaded_time or time.time()
+        self._last_error = None
+        self._source = source
+
+        if had_data and changed:
+            self._notify(changed)
+
+    def _write_snapshot(self):
+        if self.snapshot_path is None:
+            return
+        snapshot = {
+            "written_at": datetime.now().isoformat(),
+            "versions": self._versions,
+            "tables": {table: [[row_id, name] for row_id, name in rows.items()] for table, rows in self._data.items()}
+        }
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.snapshot_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(snapshot, separators=(",", ":")), encoding="utf-8")
+            # Atomic replace so readers never see a partially written snapshot
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            print(f"Warning: Could not write lookup snapshot {self.snapshot_path}: {e}")
+
+    def load_snapshot(self):
+        """
+        Load the lookup tables from the snapshot file.
+
+        Snapshot data is treated as stale, so the next ``get`` revalidates it
+        against the database in the background.
+
+        Returns:
+            bool: True if the snapshot was loaded
+        """
+        if self.snapshot_path is None or not self.snapshot_path.exists():
+            return False
+        try:
+            snapshot = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+            written_time = self.snapshot_path.stat().st_mtime
+            data = {table: {row_id: name for row_id, name in rows} for table, rows in snapshot["tables"].items()}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Warning: Could not read lookup snapshot {self.snapshot_path}: {e}")
+            return False
+
+        self._set_data(data, snapshot.get("versions"), "snapshot", written_time)
+        print(f"Lookup tables loaded from snapshot written at {snapshot.get('written_at')}")
+        return True
+
+    def _notify(self, changed):
+        print(f"Lookup tables changed: {sorted(changed)}")
+        for callback in self._listeners:
+            try:
+                callback(changed)
+            except Exception as e:
+                print(f"Lookup change listener failed: {e}")
+
+    async def revalidate(self):
+        """
+        Check the table versions and reload only if they changed.
+
+        Returns:
+            bool: True if the cached tables are current
+        """
+        async with self._lock:
+            if self._versions is not None:
+                versions = await self._probe_versions()
+                if versions == self._versions:
+                    self._loaded_at = time.monotonic()
+                    self._loaded_time = time.time()
+                    self._source = "database"
+                    return True
+            return await self._load()
+
+    def schedule_revalidation(self):
+        """
+        Start a background revalidation unless one is already running.
+        """
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.revalidate())
+
+    async def get(self):
+        """
+        Get the cached lookup tables.
+
+        The first call loads the tables synchronously. Afterwards stale tables
+        are returned immediately while a background revalidation is scheduled.
+
+        Returns:
+            dict: ``{table: {id: name}}`` or ``{'error': ...}`` if the tables
+            have never been loaded successfully
+        """
+        if self._data is None:
+            async with self._lock:
+                # Another request may have loaded the tables while we waited
+                if self._data is None and not await self._load():
+                    # Database unreachable, serve the last snapshot instead
+                    self.load_snapshot()
+            if self._data is None:
+                return {'error': self._last_error or 'Lookup tables unavailable'}
+        elif self.is_stale:
+            self.schedule_revalidation()
+        return self._data
+
+    async def invalidate(self):
+        """
+        Mark the cached tables as stale and reload them immediately.
+
+        Returns:
+            bool: True if the tables were reloaded successfully
+        """
+        self._loaded_at = None
+        return await self.refresh()
+
+    def status(self):
+        """
+        Describe the cache state for the admin endpoints.
+        """
+        return {
+            "loaded": self.is_loaded,
+            "stale": self.is_stale,
+            "age_seconds": round(time.time() - self._loaded_time, 1) if self.is_loaded else None,
+            "ttl_seconds": self.ttl,
+            "source": self._source,
+            "fingerprint": self.fingerprint(),
+            "tables": {
+                table: {"rows": len(rows), "fingerprint": self._fingerprints.get(table)}
+                for table, rows in (self._data or {}).items()
+            },
+            "last_error": self._last_error
+        }
+
+
+# Shared lookup cache instance used by the API and the processing pipeline
+lookup_cache = LookupCache(
+    fetch_data_async,
+    version_probe=fetch_versions_async,
+    snapshot_path=LOOKUP_SNAPSHOT_PATH
+)
+
+
+async def get_lookup_data():
+    """
+    Get the lookup tables from the shared cache.
+
+    Returns:
+        dict: ``{table: {id: name}}`` or ``{'error': ...}``
+    """
+    return await lookup_cache.get()
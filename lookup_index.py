@@ -0,0 +1,170 @@
+"""
+Lookup Shortlist Index
+
+This module ranks the rows of a lookup table against a resume assessment
+with BM25 computed in NumPy over the (stemmed) lookup names, so that the
+single-table agents only receive the top-K candidate IDs in their prompt
+instead of the whole table. Prompt size then stays flat as admins add
+categories.
+
+A shortlist differs per request, so the agent's options block (and with it
+the prompt prefix the provider caches, and the micro-batching key) is no
+longer shared between requests. Tables that still fit in the prompt, up to
+SHORTLIST_MIN_ROWS rows, are therefore passed through unchanged and only
+larger tables are shortlisted. Shortlisted rows keep the table order.
+
+The per-table indexes are built on first use and dropped whenever the
+lookup cache reports that their table changed.
+"""
+import os
+import re
+
+import numpy as np
+
+from lookup_cache import lookup_cache
+
+# Default number of lookup rows each agent receives (0 disables shortlisting)
+SHORTLIST_TOP_K = int(os.getenv("SHORTLIST_TOP_K", "30"))
+# Per-agent overrides, e.g. "technicalskills_agent=20,leadership_agent=10"
+SHORTLIST_TOP_K_OVERRIDES = os.getenv("SHORTLIST_TOP_K_OVERRIDES", "")
+# Tables with at most this many rows are sent whole, keeping their options block cacheable
+SHORTLIST_MIN_ROWS = int(os.getenv("SHORTLIST_MIN_ROWS", "200"))
+
+_SUFFIXES = ("ational", "ization", "ments", "ment", "ness", "ship", "ings", "ing", "ions", "ion",
+             "ers", "er", "ed", "es", "s", "e", "al", "ive", "ity", "ly")
+
+
+def parse_overrides(value):
+    """
+    Parse "agent=K,agent=K" into {agent: K}.
+    """
+    overrides = {}
+    for item in value.split(","):
+        if "=" in item:
+            agent_name, k = item.split("=", 1)
+            overrides[agent_name.strip()] = int(k)
+    return overrides
+
+
+AGENT_TOP_K = parse_overrides(SHORTLIST_TOP_K_OVERRIDES)
+
+
+def stem(word):
+    """
+    Crude suffix stripping so "managed", "manager" and "Management" share a term.
+    """
+    for _ in range(2):
+        for suffix in _SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+                word = word[:-len(suffix)]
+                break
+    return word[:6]
+
+
+def terms(text):
+    return [stem(word) for word in re.findall(r"[a-z0-9+#]+", str(text).casefold())]
+
+
+class BM25Index:
+    """
+    BM25 ranking of the rows of one lookup table ({id: name}).
+    """
+
+    def __init__(self, rows, k1=1.2, b=0.75):
+        self.ids = list(rows)
+        docs = [terms(name) for name in rows.values()]
+        self.vocabulary = {}
+        for doc in docs:
+            for term in doc:
+                self.vocabulary.setdefault(term, len(self.vocabulary))
+
+        tf = np.zeros((len(docs), max(len(self.vocabulary), 1)), dtype=np.float32)
+        for row, doc in enumerate(docs):
+            for term in doc:
+                tf[row, self.vocabulary[term]] += 1
+
+        df = (tf > 0).sum(axis=0)
+        idf = np.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+        lengths = tf.sum(axis=1, keepdims=True)
+        norm = k1 * (1 - b + b * lengths / max(float(lengths.mean()), 1.0))
+        # Term weights are precomputed so a query is a single matrix-vector product
+        self.weights = idf * tf * (k1 + 1) / (tf + norm)
+
+    def rank(self, text, k):
+        """
+        IDs of the k best matching rows; ties keep the table order.
+        """
+        query = np.zeros(self.weights.shape[1], dtype=np.float32)
+        for term in terms(text):
+            column = self.vocabulary.get(term)
+            if column is not None:
+                query[column] = 1
+        scores = self.weights @ query
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [self.ids[i] for i in order]
+
+
+class LookupIndex:
+    """
+    BM25 indexes of the lookup tables, rebuilt after table changes.
+    """
+
+    def __init__(self, top_k=SHORTLIST_TOP_K, agent_top_k=None, min_rows=SHORTLIST_MIN_ROWS):
+        self.top_k = top_k
+        self.agent_top_k = agent_top_k or {}
+        self.min_rows = min_rows
+        self._indexes = {}
+        self.counters = {}
+
+    def k_for(self, agent_name):
+        return self.agent_top_k.get(agent_name, self.top_k)
+
+    def invalidate(self, tables):
+        """
+        Drop the indexes of changed tables (lookup cache listener).
+        """
+        for table in tables:
+            self._indexes.pop(table, None)
+
+    def shortlist(self, agent_name, table, rows, resume_input):
+        """
+        Top-K rows of a lookup table for an agent input.
+
+        Args:
+            agent_name: Agent the rows are for (selects K)
+            table: Lookup table name
+            rows: Lookup table ({id: name})
+            resume_input: Assessment text or list of skills
+
+        Returns:
+            dict: The shortlisted rows in table order, or ``rows`` if the table has
+            at most K or SHORTLIST_MIN_ROWS rows
+        """
+        k = self.k_for(agent_name)
+        if k <= 0 or len(rows) <= max(k, self.min_rows):
+            return rows
+        index = self._indexes.get(table)
+        if index is None or len(index.ids) != len(rows):
+            index = self._indexes[table] = BM25Index(rows)
+        if isinstance(resume_input, (list, tuple)):
+            resume_input = " ".join(str(item) for item in resume_input)
+        selected = set(index.rank(resume_input, k))
+
+        counters = self.counters.setdefault(agent_name, {"shortlists": 0, "rows_dropped": 0})
+        counters["shortlists"] += 1
+        counters["rows_dropped"] += len(rows) - len(selected)
+        return {row_id: name for row_id, name in rows.items() if row_id in selected}
+
+    def stats(self):
+        return {
+            "default_top_k": self.top_k,
+            "min_rows": self.min_rows,
+            "agent_top_k": dict(sorted(self.agent_top_k.items())),
+            "indexed_tables": sorted(self._indexes),
+            "agents": dict(sorted(self.counters.items()))
+        }
+
+
+# Shared shortlist index, kept in sync with the lookup cache
+lookup_index = LookupIndex(agent_top_k=AGENT_TOP_K)
+lookup_cache.add_listener(lookup_index.invalidate)
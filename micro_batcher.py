@@ -0,0 +1,219 @@
+"""
+Agent Micro-Batching
+
+This module optionally merges concurrent calls of the same trait agent
+(from different requests) into one structured-output call. Calls are
+collected for a short window or until a batch is full, sent once with the
+agent's system prompt and lookup options, and each caller receives the ID
+list for its own input. A batch of one is sent as the normal agent call.
+
+Batching is configured per agent with MICRO_BATCH_CONFIG, e.g.
+"leadership_agent=8:50,communication_agent=16:30" (max batch size : max
+wait in milliseconds). Agents that are not listed are never batched.
+"""
+import asyncio
+import os
+import sys
+from functools import wraps
+
+from pydantic import BaseModel
+
+from agent_memo import options_hash
+from prompt_assembly import assemble_messages, parse_completion
+
+# "agent=max_size:max_wait_ms,..." (empty disables batching)
+MICRO_BATCH_CONFIG = os.getenv("MICRO_BATCH_CONFIG", "")
+
+BATCH_INSTRUCTIONS = """**Batch Mode:**
+The user message contains several numbered assessments from different resumes.
+Analyze each assessment independently with the instructions above and return
+exactly one result per assessment, with its number as index and its matching
+IDs (or [0]) as id."""
+
+
+class BatchItem(BaseModel):
+    index: int
+    id: list[int]
+
+
+class BatchResult(BaseModel):
+    results: list[BatchItem]
+
+
+def parse_config(value):
+    """
+    Parse "agent=size:wait_ms,..." into {agent: (max_size, max_wait_seconds)}.
+    """
+    config = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        agent_name, limits = item.split("=", 1)
+        max_size, _, max_wait_ms = limits.partition(":")
+        config[agent_name.strip()] = (int(max_size), int(max_wait_ms or 50) / 1000)
+    return config
+
+
+AGENT_BATCH_CONFIG = parse_config(MICRO_BATCH_CONFIG)
+
+
+def format_options(database):
+    return "\n".join([f'"{id}": "{name}"' for id, name in database.items()])
+
+
+class MicroBatcher:
+    """
+    Collects calls of one agent and sends them as batched completions.
+    """
+
+    def __init__(self, agent_name, fn, response_model, options_title, max_size, max_wait):
+        self.agent_name = agent_name
+        self.fn = fn
+        self.response_model = response_model
+        self.options_title = options_title
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending = {}  # options hash -> (database, [(assessment, future)])
+        self._timers = {}
+        self._tasks = set()
+        self.counters = {"calls": 0, "batches": 0, "batched_calls": 0, "single_calls": 0, "fallback_calls": 0}
+
+    async def submit(self, database, assessment):
+        """
+        Queue one agent call and wait for its ``(result, total_tokens)``.
+        """
+        self.counters["calls"] += 1
+        # Only calls with identical lookup options can share a prompt
+        key = options_hash([database])
+        future = asyncio.get_running_loop().create_future()
+        _, batch = self._pending.setdefault(key, (database, []))
+        batch.append((assessment, future))
+        if len(batch) >= self.max_size:
+            self._flush(key)
+        elif len(batch) == 1:
+            self._timers[key] = asyncio.get_running_loop().call_later(self.max_wait, self._flush, key)
+        return await future
+
+    def _flush(self, key):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            task = asyncio.ensure_future(self._run(*pending))
+            # Keep a reference so the batch is not garbage collected while running
+            self._tasks.add(task)
+            task.add_done_callback(lambda done: self._finished(done, pending[1]))
+
+    def _finished(self, task, batch):
+        self._tasks.discard(task)
+        error = None if task.cancelled() else task.exception()
+        if error is not None:
+            print(f"Micro-batch of {self.agent_name} failed: {error}")
+        # Callers still waiting would otherwise hang
+        for _, future in batch:
+            if not future.done():
+                if error is None:
+                    future.cancel()
+                else:
+                    future.set_exception(error)
+
+    async def _call_single(self, database, assessment, future, extra_tokens=0):
+        try:
+            result, total_tokens = await self.fn(database, assessment)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result((result, total_tokens + extra_tokens))
+
+    async def _run(self, database, batch):
+        # Callers that went away (cancelled requests) are skipped
+        batch = [(assessment, future) for assessment, future in batch if not future.done()]
+        if len(batch) == 1:
+            self.counters["single_calls"] += 1
+            await self._call_single(database, *batch[0])
+            return
+        if not batch:
+            return
+
+        self.counters["batches"] += 1
+        self.counters["batched_calls"] += len(batch)
+        prompt_template = sys.modules[self.fn.__module__].prompt_template
+        request = "\n\n".join(
+            f"Assessment {index}:\n{assessment}" for index, (assessment, _) in enumerate(batch, start=1)
+        )
+        try:
+            completion = await parse_completion(
+                f"{self.agent_name}_batch",
+                assemble_messages(
+                    prompt_template,
+                    [f"**{self.options_title}:**\n{format_options(database)}", BATCH_INSTRUCTIONS],
+                    request
+                ),
+                BatchResult
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        message = completion.choices[0].message
+        # The batch's tokens are shared evenly by its callers
+        share, remainder = divmod(completion.usage.total_tokens, len(batch))
+        results = {}
+        if not getattr(message, "refusal", None) and message.parsed is not None:
+            results = {item.index: item.id for item in message.parsed.results}
+        else:
+            print(f"Model refused to respond: {getattr(message, 'refusal', None)}")
+
+        fallback = []
+        for index, (assessment, future) in enumerate(batch, start=1):
+            tokens = share + (remainder if index == 1 else 0)
+            if index in results:
+                if not future.done():
+                    parsed = self.response_model.model_validate({"steps": [{"id": results[index] or [0]}]})
+                    future.set_result((parsed, tokens))
+            else:
+                fallback.append((assessment, future, tokens))
+        if fallback:
+            # Inputs the batch answer skipped are sent on their own
+            self.counters["fallback_calls"] += len(fallback)
+            await asyncio.gather(*[self._call_single(database, *item) for item in fallback])
+
+    def stats(self):
+        batches = self.counters["batches"]
+        return {
+            "max_size": self.max_size,
+            "max_wait_ms": round(self.max_wait * 1000),
+            **self.counters,
+            "average_batch_size": round(self.counters["batched_calls"] / batches, 2) if batches else None
+        }
+
+
+# Batchers of the agents enabled in MICRO_BATCH_CONFIG
+micro_batchers = {}
+
+
+def micro_batched(agent_name, response_model, options_title):
+    """
+    Decorator batching ``fn(database, assessment)`` calls of a trait agent
+    when the agent is listed in MICRO_BATCH_CONFIG.
+
+    The agent module must define ``prompt_template`` (its static instructions).
+    """
+    def decorator(fn):
+        if agent_name not in AGENT_BATCH_CONFIG:
+            return fn
+        max_size, max_wait = AGENT_BATCH_CONFIG[agent_name]
+        batcher = micro_batchers[agent_name] = MicroBatcher(
+            agent_name, fn, response_model, options_title, max_size, max_wait
+        )
+
+        @wraps(fn)
+        async def wrapper(database, assessment):
+            return await batcher.submit(database, assessment)
+        return wrapper
+    return decorator
@@ -0,0 +1,204 @@
+"""
+Near-Duplicate Resume Index
+
+This module finds previously analyzed resumes that are nearly identical to a
+new upload (a changed phone number, one extra bullet, ...) so their trait
+agent results can be reused. Resumes are reduced to MinHash signatures over
+word shingles and indexed with locality-sensitive hashing (LSH) bands, so a
+lookup only compares against a handful of candidates even with hundreds of
+thousands of indexed resumes.
+"""
+import hashlib
+import os
+import re
+import threading
+
+import numpy as np
+
+# Reuse prior results for resumes at least this similar (estimated Jaccard of word shingles)
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.9"))
+# Memory budget of the in-memory near-duplicate index per worker
+NEAR_DUP_MEMORY_MB = float(os.getenv("NEAR_DUP_MEMORY_MB", "64"))
+# Maximum number of indexed resumes per worker, oldest are dropped first (default: fits the memory budget)
+NEAR_DUP_MAX_DOCS = os.getenv("NEAR_DUP_MAX_DOCS", "")
+NEAR_DUP_ENABLED = os.getenv("NEAR_DUP_ENABLED", "true").lower() == "true"
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+_PRIME = (1 << 31) - 1
+# New documents are merged into the sorted band arrays in batches of this size
+MERGE_BATCH = 1024
+# Approximate memory per indexed resume: signature, band keys, sorted band
+# entries (key + doc number), doc number, and the stored value (cache key tuple)
+DOC_BYTES = NUM_PERM * 4 + BANDS * 4 + BANDS * (4 + 8) + 8 + 200
+
+
+def default_max_docs():
+    if NEAR_DUP_MAX_DOCS:
+        return int(NEAR_DUP_MAX_DOCS)
+    return max(int(NEAR_DUP_MEMORY_MB * 1024 * 1024 // DOC_BYTES), 1)
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """
+    Hashed word shingles of a resume, as a uint64 array.
+    """
+    words = re.findall(r"\w+", text.casefold())
+    if len(words) < size:
+        grams = {" ".join(words)} if words else set()
+    else:
+        grams = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=4).digest(), "little") for gram in grams),
+        dtype=np.uint64,
+        count=len(grams)
+    )
+
+
+class MinHashIndex:
+    """
+    In-memory MinHash/LSH index mapping resumes to an opaque value (e.g. a result cache key).
+
+    Signatures and band keys live in preallocated arrays used as a ring
+    buffer: document ``n`` occupies slot ``n % max_docs`` and overwrites the
+    oldest document once the index is full. Each band keeps its keys sorted
+    together with the document number they came from, so a lookup is a
+    binary search per band. Entries of overwritten documents are recognized
+    by their document number and dropped when new documents are merged in.
+    """
+
+    def __init__(self, threshold=NEAR_DUP_THRESHOLD, max_docs=None, seed=1):
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=NUM_PERM, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=NUM_PERM, dtype=np.uint64)
+        self._band_multipliers = rng.integers(1, _PRIME, size=ROWS, dtype=np.uint64)
+        self.threshold = threshold
+        self.max_docs = max_docs or default_max_docs()
+        # Zero-filled arrays are only backed by memory once slots are written
+        self._signatures = np.zeros((self.max_docs, NUM_PERM), dtype=np.uint32)
+        self._band_keys = np.zeros((self.max_docs, BANDS), dtype=np.uint32)
+        self._doc_numbers = np.full(self.max_docs, -1, dtype=np.int64)  # slot -> document stored in it
+        self._values = [None] * self.max_docs
+        self._added = 0
+        # Per band: sorted band keys and the document number of each key
+        self._sorted_keys = [np.empty(0, dtype=np.uint32) for _ in range(BANDS)]
+        self._sorted_docs = [np.empty(0, dtype=np.int64) for _ in range(BANDS)]
+        self._unmerged = []  # document numbers not yet in the sorted band arrays
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.matches = 0
+
+    def signature(self, text):
+        """
+        MinHash signature (NUM_PERM uint32 values) of a resume text.
+        """
+        hashes = shingles(text) % _PRIME
+        if hashes.size == 0:
+            return np.full(NUM_PERM, _PRIME, dtype=np.uint32)
+        # (a * h + b) mod p for every permutation and shingle, minimum per permutation
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def band_keys(self, signature):
+        """
+        One uint32 key per band; colliding keys only add candidates that fail the similarity check.
+        """
+        rows = signature.reshape(BANDS, ROWS).astype(np.uint64)
+        return ((rows * self._band_multipliers).sum(axis=1) % _PRIME).astype(np.uint32)
+
+    def _merge(self):
+        docs = np.array(self._unmerged, dtype=np.int64)
+        docs = docs[self._doc_numbers[docs % self.max_docs] == docs]
+        self._unmerged = []
+        for band in range(BANDS):
+            keys, band_docs = self._sorted_keys[band], self._sorted_docs[band]
+            # Drop entries of documents whose slot has been reused since
+            live = self._doc_numbers[band_docs % self.max_docs] == band_docs
+            keys, band_docs = keys[live], band_docs[live]
+            new_keys = self._band_keys[docs % self.max_docs, band]
+            order = np.argsort(new_keys, kind="stable")
+            positions = np.searchsorted(keys, new_keys[order])
+            self._sorted_keys[band] = np.insert(keys, positions, new_keys[order])
+            self._sorted_docs[band] = np.insert(band_docs, positions, docs[order])
+
+    def add(self, text, value, signature=None):
+        """
+        Index a resume text with the value to return for its near duplicates.
+        """
+        if signature is None:
+            signature = self.signature(text)
+        keys = self.band_keys(signature)
+        with self._lock:
+            doc = self._added
+            slot = doc % self.max_docs
+            self._signatures[slot] = signature
+            self._band_keys[slot] = keys
+            self._doc_numbers[slot] = doc
+            self._values[slot] = value
+            self._added += 1
+            self._unmerged.append(doc)
+            if len(self._unmerged) >= MERGE_BATCH:
+                self._merge()
+
+    def _candidates(self, keys):
+        found = []
+        for band in range(BANDS):
+            sorted_keys = self._sorted_keys[band]
+            start = np.searchsorted(sorted_keys, keys[band], side="left")
+            end = np.searchsorted(sorted_keys, keys[band], side="right")
+            found.append(self._sorted_docs[band][start:end])
+        if self._unmerged:
+            unmerged = np.array(self._unmerged, dtype=np.int64)
+            found.append(unmerged[(self._band_keys[unmerged % self.max_docs] == keys).any(axis=1)])
+        docs = np.unique(np.concatenate(found))
+        # Skip documents whose slot has been reused since they were indexed
+        return docs[self._doc_numbers[docs % self.max_docs] == docs]
+
+    def query(self, text, accept=None, signature=None):
+        """
+        Find the most similar indexed resume above the threshold.
+
+        Args:
+            text: Resume text
+            accept: Optional ``accept(value)`` filter for candidates (e.g. still valid results)
+
+        Returns:
+            tuple: (value, similarity) or (None, best similarity below threshold)
+        """
+        if signature is None:
+            signature = self.signature(text)
+        keys = self.band_keys(signature)
+        with self._lock:
+            self.queries += 1
+            slots = self._candidates(keys) % self.max_docs
+            similarities = (self._signatures[slots] == signature).mean(axis=1)
+            for index in np.argsort(-similarities, kind="stable"):
+                value = self._values[slots[index]]
+                if accept is not None and not accept(value):
+                    continue
+                similarity = float(similarities[index])
+                if similarity < self.threshold:
+                    return None, similarity
+                self.matches += 1
+                return value, similarity
+            return None, 0.0
+
+    def __len__(self):
+        return min(self._added, self.max_docs)
+
+    def stats(self):
+        return {
+            "indexed": len(self),
+            "max_docs": self.max_docs,
+            "memory_mb": round(len(self) * DOC_BYTES / (1024 * 1024), 1),
+            "threshold": self.threshold,
+            "queries": self.queries,
+            "reused": self.matches,
+            "reuse_rate": round(self.matches / self.queries, 3) if self.queries else None
+        }
+
+
+# Shared near-duplicate index, None when disabled
+near_duplicate_index = MinHashIndex() if NEAR_DUP_ENABLED else None
@@ -0,0 +1,119 @@
+"""
+Pipeline Stage Scheduler
+
+This module provides a small dependency-aware executor for the resume
+pipeline. Each stage declares the stages it needs and starts as soon as
+those have resolved, instead of waiting for a barrier over unrelated work.
+Per-stage start and finish times are recorded for every run.
+"""
+import asyncio
+import time
+
+
+class StageScheduler:
+    """
+    Run async stages as a DAG.
+
+    A stage is ``fn(*dependency_results)`` returning an awaitable. Stages can
+    also be resolved from outside the scheduler with ``provide``. The optional
+    ``on_stage_done(name, result)`` callback is called as each stage finishes.
+    """
+
+    def __init__(self, on_stage_done=None):
+        self._on_stage_done = on_stage_done
+        self._stages = {}
+        self._futures = {}
+        self._started = None
+        self.timings = {}
+
+    def _future(self, name):
+        if name not in self._futures:
+            self._futures[name] = asyncio.get_running_loop().create_future()
+        return self._futures[name]
+
+    def add(self, name, fn, deps=()):
+        """
+        Register a stage that runs ``fn`` once every stage in ``deps`` resolved.
+        """
+        if name in self._stages:
+            raise ValueError(f"Stage '{name}' is already registered")
+        self._stages[name] = (fn, tuple(deps))
+
+    def expect(self, name):
+        """
+        Declare a stage that is resolved from outside with ``provide`` or ``fail``.
+        """
+        self._future(name)
+
+    def provide(self, name, value):
+        """
+        Resolve an externally produced stage result.
+        """
+        future = self._future(name)
+        if not future.done():
+            future.set_result(value)
+            if self._started is not None:
+                offset = self._offset()
+                self.timings[name] = {"start": offset, "finish": offset}
+
+    def fail(self, name, error):
+        """
+        Fail an external stage, propagating ``error`` to the stages depending on it.
+        """
+        future = self._future(name)
+        if not future.done():
+            future.set_exception(error)
+            future.exception()
+
+    def _offset(self):
+        return round(time.perf_counter() - self._started, 3)
+
+    async def _run_stage(self, name, fn, deps):
+        future = self._future(name)
+        try:
+            inputs = [await self._future(dep) for dep in deps]
+            self.timings[name] = {"start": self._offset()}
+            result = await fn(*inputs)
+            self.timings[name]["finish"] = self._offset()
+        except BaseException as e:
+            if not future.done():
+                future.set_exception(e)
+                # Mark the exception as retrieved, it is re-raised by run()
+                future.exception()
+            raise
+        future.set_result(result)
+        if self._on_stage_done is not None:
+            try:
+                self._on_stage_done(name, result)
+            except Exception as e:
+                print(f"Stage callback failed for '{name}': {e}")
+        return result
+
+    async def run(self):
+        """
+        Run every registered stage.
+
+        Returns:
+            dict: {stage name: result}
+
+        Raises:
+            The first exception raised by a stage. Stages still running are cancelled.
+        """
+        self._started = time.perf_counter()
+        missing = {dep for _, deps in self._stages.values() for dep in deps} - self._stages.keys() - self._futures.keys()
+        if missing:
+            raise ValueError(f"Unknown stage dependencies: {sorted(missing)}")
+
+        tasks = [
+            asyncio.create_task(self._run_stage(name, fn, deps), name=f"stage:{name}")
+            for name, (fn, deps) in self._stages.items()
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        return {name: future.result() for name, future in self._futures.items()}
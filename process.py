@@ -1,11 +1,23 @@
 import asyncio
+import hashlib
+import importlib
 import json
+import os
+from pathlib import Path
 
 #Scraper imports
-from scraper.document_scraper import get_resume_content
+from scraper.conversion_cache import file_hash
+from scraper.conversion_pool import conversion_pool
+from scraper.pdf_pages import PDF_EARLY_START_PAGES
+from scraper.resume_compactor import compact_resume, RESUME_COMPACTION, RESUME_TOKEN_BUDGET
 from scraper.resume_scraper_string_agent import analyze_resume
-from scraper.resume_scraper_array_agent import analyze_resume_array
-from scraper.databse_scraper_agent import async_route, fetch_data_async
+from scraper.resume_scraper_array_agent import analyze_resume_array, analyze_resume_array_stream
+from lookup_cache import get_lookup_data, lookup_cache
+from result_cache import result_cache, result_key
+from near_duplicate import near_duplicate_index
+from lookup_index import lookup_index, SHORTLIST_TOP_K, SHORTLIST_MIN_ROWS, AGENT_TOP_K
+from pipeline_scheduler import StageScheduler
+from micro_batcher import AGENT_BATCH_CONFIG
 
 #McpAgent imports
 from McpAgent.character_agent import character_agent
@@ -21,70 +33,150 @@ from McpAgent.leadership_agent import leadership_agent
 from McpAgent.metacognition_agent import metacognition_agent
 from McpAgent.criticalthinking_agent import criticalthinking_agent
 from McpAgent.fortitude_agent import fortitude_agent
+from McpAgent.technicalskills_matcher import LOCAL_SKILL_MATCH, SKILL_FUZZY_CUTOFF
 
-async def main(path):
-    resume_data = get_resume_content(path)
-    
-    # Run all three async functions in parallel
-    results = await asyncio.gather(
-        analyze_resume_array(resume_data),
-        analyze_resume(resume_data),
-        fetch_data_async()
-    )
-    
-    # Unpack results
-    resume_array, total_tokens1 = results[0]
-    string_data, total_tokens2 = results[1]
-    databse_data = results[2]
-    
+# Stream the array extraction and start each trait agent as soon as its field is complete
+RESUME_ARRAY_STREAMING = os.getenv("RESUME_ARRAY_STREAMING", "false").lower() == "true"
+
+# Agent stages as (result name, agent, source extraction stage, lookup tables, resume field)
+AGENT_STAGES = [
+    ('character', character_agent, 'resume_array', ('character',), 'character'),
+    ('collaboration', collaboration_agent, 'resume_array', ('collaboration',), 'collaboration'),
+    ('creativity', creativity_agent, 'resume_array', ('creativity',), 'creativity'),
+    ('growthmindset', growthmindset_agent, 'resume_array', ('growthmindset',), 'growthMindset'),
+    ('mindfulness', mindfulness_agent, 'resume_array', ('mindfulness',), 'mindfulness'),
+    ('technicalskills', technicalskills_agent, 'resume_array', ('technicalskills',), 'technicalSkill'),
+    ('experience', industry_agent, 'resume_string', ('industry', 'JobLevel'), 'experience'),
+    ('education', educationlevel_agent, 'resume_string', ('educationlevel',), 'education'),
+    ('communication', communication_agent, 'resume_array', ('communication',), 'communication'),
+    ('leadership', leadership_agent, 'resume_array', ('leadership',), 'leadership'),
+    ('metacognition', metacognition_agent, 'resume_array', ('metacognition',), 'metacognition'),
+    ('criticalthinking', criticalthinking_agent, 'resume_array', ('criticalthinking',), 'criticalThinking'),
+    ('fortitude', fortitude_agent, 'resume_array', ('fortitude',), 'fortitude')
+]
+
+
+# Modules besides the extractors and agents whose logic shapes the results
+RESULT_MODULES = ['prompt_assembly', 'lookup_index', 'micro_batcher',
+                  'McpAgent.technicalskills_matcher', 'scraper.resume_compactor']
+
+
+def result_settings():
+    """
+    Settings that change what the pipeline returns for the same resume.
+    """
+    return {
+        'SHORTLIST_TOP_K': SHORTLIST_TOP_K,
+        'SHORTLIST_TOP_K_OVERRIDES': AGENT_TOP_K,
+        'SHORTLIST_MIN_ROWS': SHORTLIST_MIN_ROWS,
+        'LOCAL_SKILL_MATCH': LOCAL_SKILL_MATCH,
+        'SKILL_FUZZY_CUTOFF': SKILL_FUZZY_CUTOFF,
+        'RESUME_COMPACTION': RESUME_COMPACTION,
+        'RESUME_TOKEN_BUDGET': RESUME_TOKEN_BUDGET,
+        # Batched agents answer several assessments in one prompt
+        'MICRO_BATCH_CONFIG': AGENT_BATCH_CONFIG,
+        # The early string extraction only reads the first pages of longer PDFs
+        'PDF_EARLY_START_PAGES': PDF_EARLY_START_PAGES
+    }
+
+
+def pipeline_version():
+    """
+    Hash of the extraction, agent and prompt/ranking/compaction module sources
+    and of the settings that affect results, so that any prompt, model or
+    tuning change invalidates previously cached results.
+    """
+    digest = hashlib.sha256()
+    modules = [fn.__module__ for fn in [analyze_resume, analyze_resume_array] + [agent for _, agent, *_ in AGENT_STAGES]]
+    for module in modules + RESULT_MODULES:
+        with open(importlib.import_module(module).__file__, 'rb') as f:
+            digest.update(f.read())
+    digest.update(json.dumps(result_settings(), sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+PIPELINE_VERSION = pipeline_version()
+
+
+async def load_lookup_tables():
+    databse_data = await get_lookup_data()
     # Check if database connection failed
     if isinstance(databse_data, dict) and 'error' in databse_data:
         raise Exception(f"Database connection failed: {databse_data['error']}")
-    
-    # Extract data for all agents
-    resume_step = resume_array.steps[0]
-    resume_string_step = string_data.steps[0]
-    # Run all MCP agents in parallel
-    agent_results = await asyncio.gather(
-        character_agent(databse_data['character'], resume_step.character),
-        collaboration_agent(databse_data['collaboration'], resume_step.collaboration),
-        creativity_agent(databse_data['creativity'], resume_step.creativity),
-        growthmindset_agent(databse_data['growthmindset'], resume_step.growthMindset),
-        mindfulness_agent(databse_data['mindfulness'], resume_step.mindfulness),
-        technicalskills_agent(databse_data['technicalskills'], resume_step.technicalSkill),
-        industry_agent(databse_data['industry'], databse_data['JobLevel'], resume_string_step.experience),
-        educationlevel_agent(databse_data['educationlevel'], resume_string_step.education),
-        communication_agent(databse_data['communication'], resume_step.communication),
-        leadership_agent(databse_data['leadership'], resume_step.leadership),
-        metacognition_agent(databse_data['metacognition'], resume_step.metacognition),
-        criticalthinking_agent(databse_data['criticalthinking'], resume_step.criticalThinking),
-        fortitude_agent(databse_data['fortitude'], resume_step.fortitude)
-    )
-    
-    # Extract agent results and tokens
-    agent_tokens = 0
-    processed_results = {}
-    enriched_education = None
-    agent_names = [
-        'character', 'collaboration', 'creativity', 'growthmindset', 
-        'mindfulness', 'technicalskills', 'experience', 'education',
-        'communication', 'leadership', 'metacognition', 'criticalthinking', 'fortitude'
-    ]
-    
-    for i, (result, tokens) in enumerate(agent_results):
-        name = agent_names[i]
-        # Handle structured agents that return full objects
-        if name == 'experience':
-            processed_results[name] = result.steps[0].experience if (result and getattr(result, 'steps', None)) else []
-        elif name == 'education':
-            enriched_education = result.steps[0].education if (result and getattr(result, 'steps', None)) else []
-        else:
-            # Store only the matched_ids array (flat structure) for other agents
-            processed_results[name] = result.steps[0].id if (result and getattr(result, 'steps', None)) else [0]
-        agent_tokens += tokens
-    
-    total_tokens = total_tokens1 + total_tokens2 + agent_tokens
-    
+    return databse_data
+
+
+def agent_lookups(agent, tables, databse_data, resume_input, shortlist):
+    """
+    Lookup tables passed to an agent, reduced to the BM25 top-K rows for the
+    single-table trait agents.
+    """
+    if not shortlist:
+        return [databse_data[table] for table in tables]
+    return [lookup_index.shortlist(agent.__name__, table, databse_data[table], resume_input) for table in tables]
+
+
+def agent_stage(agent, tables, field, shortlist=False):
+    async def run(extraction_result, databse_data):
+        extraction, _ = extraction_result
+        resume_step = extraction.steps[0]
+        value = getattr(resume_step, field)
+        return await agent(*agent_lookups(agent, tables, databse_data, value, shortlist), value)
+    return run
+
+
+def agent_field_stage(agent, tables, shortlist=False):
+    async def run(value, databse_data):
+        return await agent(*agent_lookups(agent, tables, databse_data, value, shortlist), value)
+    return run
+
+
+def streamed_array_stage(scheduler, resume_data, fields=None):
+    """
+    Stream the array extraction, resolving one 'resume_array.<field>' stage per completed field.
+
+    Only ``fields`` (by default every array field) are resolved; the fields of
+    agents reused from a near-duplicate are not expected by any stage.
+    """
+    if fields is None:
+        fields = [field for name, agent, source, tables, field in AGENT_STAGES if source == 'resume_array']
+
+    def on_field(field, value):
+        if field in fields:
+            scheduler.provide(f'resume_array.{field}', value)
+
+    async def run():
+        try:
+            result = await analyze_resume_array_stream(resume_data, on_field)
+        except Exception as e:
+            for field in fields:
+                scheduler.fail(f'resume_array.{field}', e)
+            raise
+        # Fields never streamed (refusal, empty steps) fail their agents instead of
+        # leaving them waiting; fail() leaves the provided fields untouched
+        for field in fields:
+            scheduler.fail(f'resume_array.{field}', Exception(
+                "Resume array analysis returned no data" if result[0] is None
+                else f"Resume array analysis returned no '{field}' field"
+            ))
+        return result
+    return run
+
+
+def agent_output(name, result):
+    """
+    Reduce an agent result to the value returned for it.
+    """
+    # Handle structured agents that return full objects
+    if name == 'experience':
+        return result.steps[0].experience if (result and getattr(result, 'steps', None)) else []
+    elif name == 'education':
+        return result.steps[0].education if (result and getattr(result, 'steps', None)) else []
+    # Store only the matched_ids array (flat structure) for other agents
+    return result.steps[0].id if (result and getattr(result, 'steps', None)) else [0]
+
+
+def clean_string_data(string_data, enriched_education=None):
     # Remove the "steps" wrapper from string_data and exclude experience data
     clean_string_data = string_data.steps[0] if string_data.steps else {}
     
@@ -98,13 +190,253 @@ async def main(path):
             clean_string_data_dict['education'] = enriched_education
     else:
         clean_string_data_dict = clean_string_data
+
+    return clean_string_data_dict
+
+
+async def resume_cache_key(resume_data):
+    """
+    Result cache key of a resume, or None when the result cache is disabled.
+    """
+    if result_cache is None:
+        return None
+    # Make sure the lookup tables are loaded so their fingerprint is known
+    await load_lookup_tables()
+    return result_key(resume_data, lookup_cache.fingerprint(), PIPELINE_VERSION)
+
+
+def stage_fingerprints():
+    """
+    Fingerprint of the lookup tables each agent stage reads, so a table change
+    only invalidates the reused results of the agents built from it.
+    """
+    return {name: lookup_cache.fingerprint(tables) for name, agent, source, tables, field in AGENT_STAGES}
+
+
+async def find_near_duplicate(resume_data, signature):
+    """
+    Trait agent results of a previously analyzed, nearly identical resume.
+
+    Only results computed with the current prompts and the current version of
+    the agent's own lookup tables are reused; the string extraction (identity,
+    experience, education) is always re-run because that is where
+    near-duplicates differ.
+
+    Returns:
+        dict: {agent result name: value} for the array-derived agents, empty if none found
+    """
+    match, similarity = near_duplicate_index.query(
+        resume_data,
+        accept=lambda value: value[1] == PIPELINE_VERSION,
+        signature=signature
+    )
+    if match is None:
+        return {}
+    prior = await result_cache.get(match[0])
+    if prior is None:
+        return {}
+    fingerprints = stage_fingerprints()
+    prior_fingerprints = prior.get('lookup_fingerprints', {})
+    reused = {
+        name: prior['processed_results'][name]
+        for name, agent, source, tables, field in AGENT_STAGES
+        if source == 'resume_array' and name in prior['processed_results']
+        and prior_fingerprints.get(name) == fingerprints[name]
+    }
+    if reused:
+        print(f"Reusing {len(reused)} trait results of a near-duplicate resume (similarity {similarity:.2f})")
+    return reused
+
+
+async def cached_file_result(file_key):
+    """
+    Cached result of a file looked up from its content hash, before it is converted.
+    """
+    entry = await result_cache.get(file_key)
+    if entry is None:
+        return None
+    return await result_cache.get(entry['result_key'])
+
+
+def cancel_tasks(tasks):
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            # Retrieve the exception so a result nobody awaited does not log a warning
+            task.exception()
+
+
+def emit_cached(on_event, string_data, processed_results):
+    """
+    Replay a cached result through the on_event callback.
+    """
+    on_event('string_data', {key: value for key, value in string_data.items() if key != 'education'})
+    for name, value in processed_results.items():
+        on_event(name, value)
+    on_event('education', string_data.get('education', []))
+
+
+def serve_cached(cached, on_event):
+    """
+    Return a cached result in main's format, replaying it through on_event.
+    """
+    if on_event is not None:
+        emit_cached(on_event, cached['string_data'], cached['processed_results'])
+    return cached['string_data'], cached['processed_results'], 0, True
+
+
+async def main(path, stage_timings=None, on_event=None, file_extension=None, content_hash=None):
+    """
+    Run the full resume analysis pipeline.
+
+    Every agent starts as soon as the extraction it reads from and the lookup
+    tables are available, instead of waiting for both extractions. With
+    RESUME_ARRAY_STREAMING enabled the trait agents start as soon as their
+    own field of the array extraction has been generated. For near-duplicates
+    of a previously analyzed resume the trait agent results are reused and
+    only the string extraction and its agents run.
+
+    Args:
+        path: Path of the resume file
+        stage_timings: Optional dict filled with {stage: {"start", "finish"}} offsets in seconds
+        on_event: Optional ``on_event(name, data)`` callback receiving the parsed
+            resume ("string_data") and then each agent result as soon as it is ready
+        file_extension: Extension of the resume, when the path has none (e.g. ".pdf")
+        content_hash: SHA-256 of the resume file, when already known
+
+    Returns:
+        tuple: (string_data, processed_results, total_tokens, cached). Results
+        served from the result cache report zero tokens and cached=True.
+    """
+    # With PDF_EARLY_START_PAGES the string extraction of a longer PDF starts on its
+    # first pages while the remaining pages are still being extracted. Cached files are
+    # looked up by their content hash first, so their string extraction never starts
+    early_string = []
+    file_key = None
+    if PDF_EARLY_START_PAGES and result_cache is not None:
+        content_hash = content_hash or file_hash(path)
+        file_key = await resume_cache_key(f"file\0{content_hash}\0{file_extension or Path(path).suffix.lower()}")
+        cached = await cached_file_result(file_key)
+        if cached is not None:
+            return serve_cached(cached, on_event)
+
+    def start_string_extraction(first_pages):
+        first_pages_data, _ = compact_resume(first_pages, record=False)
+        # Scanned first pages have no text until OCR, so the full text is used instead
+        if first_pages_data.strip():
+            early_string.append(asyncio.ensure_future(analyze_resume(first_pages_data)))
+
+    try:
+        # Document parsing is CPU-bound and runs in the conversion pool, off the event loop.
+        # Both extraction calls read the resume, so it is compacted once up front
+        resume_data, _ = compact_resume(await conversion_pool.convert(
+            path, file_extension,
+            on_first_pages=start_string_extraction if PDF_EARLY_START_PAGES else None,
+            content_hash=content_hash
+        ))
+
+        cache_key = await resume_cache_key(resume_data)
+        if cache_key is not None:
+            cached = await result_cache.get(cache_key)
+            if cached is not None:
+                return serve_cached(cached, on_event)
+
+        reused = {}
+        signature = None
+        if cache_key is not None and near_duplicate_index is not None:
+            signature = near_duplicate_index.signature(resume_data)
+            reused = await find_near_duplicate(resume_data, signature)
+            if on_event is not None:
+                for name, value in reused.items():
+                    on_event(name, value)
+
+        agent_names = [name for name, *_ in AGENT_STAGES]
+
+        def emit_stage(name, result):
+            if on_event is None:
+                return
+            if name == 'resume_string' and result[0] is not None:
+                on_event('string_data', clean_string_data(result[0]))
+            elif name in agent_names:
+                on_event(name, agent_output(name, result[0]))
+
+        scheduler = StageScheduler(on_stage_done=emit_stage)
+        # The array extraction is skipped when a near-duplicate supplied every trait result
+        array_fields = [field for name, agent, source, tables, field in AGENT_STAGES
+                        if source == 'resume_array' and name not in reused]
+        if array_fields:
+            if RESUME_ARRAY_STREAMING:
+                scheduler.add('resume_array', streamed_array_stage(scheduler, resume_data, array_fields))
+            else:
+                scheduler.add('resume_array', lambda: analyze_resume_array(resume_data))
+        if early_string:
+            scheduler.add('resume_string', lambda: early_string[0])
+        else:
+            scheduler.add('resume_string', lambda: analyze_resume(resume_data))
+        scheduler.add('lookups', load_lookup_tables)
+        for name, agent, source, tables, field in AGENT_STAGES:
+            if name in reused:
+                continue
+            # technicalskills_agent shortlists only the skills its local matcher could not resolve
+            shortlist = source == 'resume_array' and name != 'technicalskills'
+            if RESUME_ARRAY_STREAMING and source == 'resume_array':
+                scheduler.expect(f'{source}.{field}')
+                scheduler.add(name, agent_field_stage(agent, tables, shortlist), deps=(f'{source}.{field}', 'lookups'))
+            else:
+                scheduler.add(name, agent_stage(agent, tables, field, shortlist), deps=(source, 'lookups'))
+
+        try:
+            results = await scheduler.run()
+        finally:
+            if stage_timings is not None:
+                stage_timings.update(scheduler.timings)
+    finally:
+        # The early extraction is stopped on a cache hit or when anything above failed
+        cancel_tasks(early_string)
+
+    # Unpack results
+    resume_array, total_tokens1 = results.get('resume_array', (None, 0))
+    string_data, total_tokens2 = results['resume_string']
+    
+    # Extract agent results and tokens
+    agent_tokens = 0
+    processed_results = {}
+    enriched_education = None
+    
+    for name in agent_names:
+        if name in reused:
+            processed_results[name] = reused[name]
+            continue
+        result, tokens = results[name]
+        if name == 'education':
+            enriched_education = agent_output(name, result)
+        else:
+            processed_results[name] = agent_output(name, result)
+        agent_tokens += tokens
+    
+    total_tokens = total_tokens1 + total_tokens2 + agent_tokens
+    clean_string_data_dict = clean_string_data(string_data, enriched_education)
+
+    if cache_key is not None:
+        await result_cache.put(cache_key, {
+            'string_data': clean_string_data_dict,
+            'processed_results': processed_results,
+            'total_tokens': total_tokens,
+            'lookup_fingerprints': stage_fingerprints()
+        })
+        if file_key is not None:
+            # Lets the next upload of the same file skip conversion and the early start
+            await result_cache.put(file_key, {'result_key': cache_key})
+        if near_duplicate_index is not None:
+            near_duplicate_index.add(resume_data, (cache_key, PIPELINE_VERSION), signature=signature)
     
-    return clean_string_data_dict, processed_results, total_tokens
+    return clean_string_data_dict, processed_results, total_tokens, False
 
 
 if __name__ == "__main__":
     path = "Jayanta_Roy_CV.pdf"
-    string_data, processed_results, total_tokens = asyncio.run(main(path))
+    string_data, processed_results, total_tokens, cached = asyncio.run(main(path))
     print("string_data: ", string_data)
     print("processed_results: ", processed_results)
     print("total_tokens: ", total_tokens)
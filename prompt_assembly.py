@@ -0,0 +1,124 @@
+"""
+Prompt Assembly
+
+This module builds the chat messages of every GPT-4o call site in a fixed
+order: static instructions first, then reference blocks that only change
+with the lookup tables (database options), and the per-request content
+(resume assessment, job posting, ...) last in the user message. Requests of
+the same call site then share the longest possible prefix, which lets the
+provider's automatic prompt caching kick in.
+
+Cached and uncached prompt tokens are read from each response's usage and
+counted per call site, so cache hit rates can be checked on the admin
+endpoint.
+"""
+import threading
+
+from shared_client import get_async_client
+
+
+def assemble_messages(instructions, reference=(), request=""):
+    """
+    Build chat messages with the stable content first.
+
+    Args:
+        instructions: Static instructions, identical for every call of a call site
+        reference: Blocks that only change with the lookup tables (e.g. database options)
+        request: Per-request content, sent as the user message
+
+    Returns:
+        list: Chat messages
+    """
+    if isinstance(reference, str):
+        reference = (reference,)
+    system = "\n\n".join([instructions.strip(), *(block.strip() for block in reference)])
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": request}
+    ]
+
+
+class PromptCacheStats:
+    """
+    Per call site counters of prompt tokens served from the provider cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.call_sites = {}
+
+    def record(self, call_site, usage):
+        """
+        Count the prompt tokens of one response usage object.
+        """
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = (getattr(details, "cached_tokens", None) or 0) if details is not None else 0
+        with self._lock:
+            counters = self.call_sites.setdefault(
+                call_site, {"calls": 0, "calls_with_cache_hit": 0, "prompt_tokens": 0, "cached_tokens": 0}
+            )
+            counters["calls"] += 1
+            counters["prompt_tokens"] += usage.prompt_tokens
+            counters["cached_tokens"] += cached_tokens
+            if cached_tokens:
+                counters["calls_with_cache_hit"] += 1
+
+    def stats(self):
+        call_sites = {}
+        with self._lock:
+            for call_site, counters in sorted(self.call_sites.items()):
+                prompt_tokens = counters["prompt_tokens"]
+                call_sites[call_site] = {
+                    **counters,
+                    "uncached_tokens": prompt_tokens - counters["cached_tokens"],
+                    "cached_ratio": round(counters["cached_tokens"] / prompt_tokens, 3) if prompt_tokens else None
+                }
+        return {"call_sites": call_sites}
+
+
+# Shared prompt cache counters (per worker)
+prompt_cache_stats = PromptCacheStats()
+
+
+async def parse_completion(call_site, messages, response_format, model="gpt-4o"):
+    """
+    Run a structured-output completion and record its prompt cache usage.
+
+    Returns:
+        ParsedChatCompletion: The completion returned by the OpenAI client
+    """
+    client = await get_async_client()
+    completion = await client.beta.chat.completions.parse(
+        model=model,
+        messages=messages,
+        response_format=response_format,
+    )
+    prompt_cache_stats.record(call_site, completion.usage)
+    return completion
+
+
+async def stream_completion(call_site, messages, response_format, on_parsed, model="gpt-4o"):
+    """
+    Stream a structured-output completion and record its prompt cache usage.
+
+    ``on_parsed(partial)`` is called with the partially parsed JSON object
+    after every content delta.
+
+    Returns:
+        ParsedChatCompletion: The final completion
+    """
+    client = await get_async_client()
+    async with client.beta.chat.completions.stream(
+        model=model,
+        messages=messages,
+        response_format=response_format,
+        stream_options={"include_usage": True},
+    ) as stream:
+        async for event in stream:
+            if event.type == "content.delta" and isinstance(event.parsed, dict):
+                on_parsed(event.parsed)
+        completion = await stream.get_final_completion()
+    prompt_cache_stats.record(call_site, completion.usage)
+    return completion
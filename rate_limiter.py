@@ -0,0 +1,302 @@
+"""
+OpenAI Rate Limiter
+
+This module keeps GPT-4o traffic under the account's requests-per-minute and
+tokens-per-minute limits. Every request takes from two token buckets (one
+request, plus its estimated prompt tokens and completion allowance) before
+it is sent, and waits for the buckets to refill otherwise. The buckets live
+in a small lock-protected state file so that all uvicorn workers on a host
+share them.
+
+Limits start from the configured values and follow the x-ratelimit-*
+response headers, so the buckets track what the API reports. A 429 blocks
+every worker until the reset time and is retried with exponential backoff
+and jitter. The OpenAI client itself does not retry 429s again, it only
+retries other failures.
+
+The state file is locked and read off the event loop, so a worker waiting
+for the lock does not stall its other requests.
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+from scraper.resume_compactor import count_tokens
+
+try:
+    import fcntl
+except ImportError:  # Windows: the buckets are shared by the threads of one process only
+    fcntl = None
+
+# Initial limits, replaced by the x-ratelimit-limit-* headers of the first response
+OPENAI_RPM_LIMIT = int(os.getenv("OPENAI_RPM_LIMIT", "500"))
+OPENAI_TPM_LIMIT = int(os.getenv("OPENAI_TPM_LIMIT", "30000"))
+# State file shared by the workers (empty to keep the buckets per process)
+RATE_LIMIT_STATE_PATH = os.getenv("RATE_LIMIT_STATE_PATH", "cache/openai_ratelimit.json")
+# Retries of a request answered with 429
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "5"))
+# Completion tokens reserved for requests that do not set max_tokens
+RATE_LIMIT_COMPLETION_ESTIMATE = int(os.getenv("RATE_LIMIT_COMPLETION_ESTIMATE", "1000"))
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+
+
+def parse_reset(value):
+    """
+    Parse an x-ratelimit-reset-* duration ("1s", "6m0s", "250ms") into seconds.
+    """
+    if not value:
+        return None
+    seconds = 0.0
+    for amount, unit in re.findall(r"([\d.]+)(ms|h|m|s)", value):
+        seconds += float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return seconds
+
+
+def estimate_tokens(content):
+    """
+    Tokens a chat completion request body counts against the TPM limit.
+    """
+    try:
+        body = json.loads(content)
+    except (ValueError, UnicodeDecodeError):
+        return RATE_LIMIT_COMPLETION_ESTIMATE
+    prompt = []
+    for message in body.get("messages") or []:
+        message_content = message.get("content")
+        if isinstance(message_content, list):
+            prompt.extend(str(part.get("text", "")) for part in message_content if isinstance(part, dict))
+        elif message_content:
+            prompt.append(str(message_content))
+    if body.get("response_format"):
+        prompt.append(json.dumps(body["response_format"]))
+    completion = body.get("max_tokens") or body.get("max_completion_tokens") or RATE_LIMIT_COMPLETION_ESTIMATE
+    return count_tokens("\n".join(prompt)) + completion
+
+
+class RateLimiter:
+    """
+    Request and token buckets, optionally shared through a locked state file.
+    """
+
+    def __init__(self, rpm=OPENAI_RPM_LIMIT, tpm=OPENAI_TPM_LIMIT, state_path=RATE_LIMIT_STATE_PATH):
+        self.state_path = Path(state_path) if state_path else None
+        self._initial = {"rpm": rpm, "tpm": tpm}
+        self._state = None
+        self._lock = threading.Lock()
+        # Per-process counters for the admin endpoint, with their own lock so they never wait for the state file
+        self._counters_lock = threading.Lock()
+        self.counters = {"requests": 0, "throttled": 0, "wait_seconds": 0.0, "rate_limited": 0, "retries": 0}
+
+    def count(self, name, amount=1):
+        with self._counters_lock:
+            self.counters[name] += amount
+
+    def _fresh_state(self):
+        now = time.time()
+        return {
+            "rpm": self._initial["rpm"], "tpm": self._initial["tpm"],
+            "requests": float(self._initial["rpm"]), "tokens": float(self._initial["tpm"]),
+            "updated": now, "blocked_until": 0.0
+        }
+
+    def _update_state(self, change):
+        """
+        Apply ``change(state, now)`` to the refilled shared state and return its result.
+        """
+        with self._lock:
+            if not self.shared:
+                if self._state is None:
+                    self._state = self._fresh_state()
+                return self._apply(self._state, change)
+
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.state_path, "a+", encoding="utf-8") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    try:
+                        state = json.loads(f.read())
+                    except ValueError:
+                        state = self._fresh_state()
+                    result = self._apply(state, change)
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps(state))
+                    f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                return result
+
+    @property
+    def shared(self):
+        return self.state_path is not None and fcntl is not None
+
+    async def update(self, change):
+        """
+        ``_update_state`` without blocking the event loop on the shared state file.
+        """
+        if self.shared:
+            return await asyncio.to_thread(self._update_state, change)
+        return self._update_state(change)
+
+    @staticmethod
+    def _apply(state, change):
+        now = time.time()
+        elapsed = max(now - state["updated"], 0.0)
+        state["requests"] = min(state["rpm"], state["requests"] + elapsed * state["rpm"] / 60)
+        state["tokens"] = min(state["tpm"], state["tokens"] + elapsed * state["tpm"] / 60)
+        state["updated"] = now
+        return change(state, now)
+
+    async def acquire(self, tokens):
+        """
+        Wait until one request and ``tokens`` tokens are available, then take them.
+        """
+        self.count("requests")
+
+        def take(state, now):
+            if state["blocked_until"] > now:
+                return state["blocked_until"] - now
+            # A request larger than the whole bucket only waits for a full bucket
+            needed = min(tokens, state["tpm"])
+            if state["requests"] >= 1 and state["tokens"] >= needed:
+                state["requests"] -= 1
+                state["tokens"] -= tokens
+                return 0.0
+            wait_requests = (1 - state["requests"]) * 60 / state["rpm"] if state["requests"] < 1 else 0.0
+            wait_tokens = (needed - state["tokens"]) * 60 / state["tpm"] if state["tokens"] < needed else 0.0
+            return max(wait_requests, wait_tokens)
+
+        throttled = False
+        while True:
+            wait = await self.update(take)
+            if wait <= 0:
+                return
+            if not throttled:
+                throttled = True
+                self.count("throttled")
+            # Small jitter so waiting workers do not all retry at the same instant
+            wait = min(wait, 60.0) + random.uniform(0, 0.05)
+            self.count("wait_seconds", wait)
+            await asyncio.sleep(wait)
+
+    async def observe(self, headers):
+        """
+        Align the buckets with the x-ratelimit-* headers of a response.
+        """
+        def header_int(name):
+            try:
+                return int(headers[name])
+            except (KeyError, ValueError):
+                return None
+
+        limit_requests = header_int("x-ratelimit-limit-requests")
+        limit_tokens = header_int("x-ratelimit-limit-tokens")
+        remaining_requests = header_int("x-ratelimit-remaining-requests")
+        remaining_tokens = header_int("x-ratelimit-remaining-tokens")
+        if None in (limit_requests, limit_tokens, remaining_requests, remaining_tokens):
+            return
+
+        def align(state, now):
+            state["rpm"] = limit_requests
+            state["tpm"] = limit_tokens
+            # The API's view includes other clients of the same key
+            state["requests"] = min(state["requests"], remaining_requests)
+            state["tokens"] = min(state["tokens"], remaining_tokens)
+
+        await self.update(align)
+
+    async def block(self, seconds):
+        """
+        Stop every worker from sending requests for ``seconds``.
+        """
+        self.count("rate_limited")
+
+        def apply_block(state, now):
+            state["blocked_until"] = max(state["blocked_until"], now + seconds)
+            state["requests"] = 0.0
+
+        await self.update(apply_block)
+
+    async def stats(self):
+        state = await self.update(lambda state, now: dict(state))
+        with self._counters_lock:
+            counters = dict(self.counters)
+        return {
+            "enabled": RATE_LIMIT_ENABLED,
+            "shared_state": str(self.state_path) if self.shared else None,
+            "rpm_limit": state["rpm"],
+            "tpm_limit": state["tpm"],
+            "available_requests": round(state["requests"], 1),
+            "available_tokens": round(state["tokens"]),
+            "blocked_for_seconds": round(max(state["blocked_until"] - time.time(), 0.0), 3),
+            **{name: round(value, 3) for name, value in counters.items()}
+        }
+
+
+def retry_delay(response, attempt):
+    """
+    Seconds to wait before retrying a 429: the API's hint, else exponential backoff, plus jitter.
+    """
+    hint = None
+    if response.headers.get("retry-after-ms"):
+        hint = float(response.headers["retry-after-ms"]) / 1000
+    elif response.headers.get("retry-after", "").replace(".", "", 1).isdigit():
+        hint = float(response.headers["retry-after"])
+    else:
+        hint = parse_reset(response.headers.get("x-ratelimit-reset-tokens")) or parse_reset(
+            response.headers.get("x-ratelimit-reset-requests")
+        )
+    backoff = hint if hint is not None else min(2 ** attempt, 60)
+    return backoff + random.uniform(0, backoff * 0.25 + 0.1)
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that rate limits chat completion requests and retries 429s.
+
+    A 429 still returned after the last retry is marked ``x-should-retry: false``
+    so the OpenAI client does not retry it once more on top.
+    """
+
+    def __init__(self, transport, limiter):
+        self._transport = transport
+        self._limiter = limiter
+
+    async def handle_async_request(self, request):
+        if not request.url.path.endswith("/chat/completions"):
+            return await self._transport.handle_async_request(request)
+
+        try:
+            tokens = estimate_tokens(request.content)
+        except httpx.RequestNotRead:
+            tokens = RATE_LIMIT_COMPLETION_ESTIMATE
+        for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+            await self._limiter.acquire(tokens)
+            response = await self._transport.handle_async_request(request)
+            await self._limiter.observe(response.headers)
+            if response.status_code != 429:
+                return response
+            if attempt == RATE_LIMIT_MAX_RETRIES:
+                response.headers["x-should-retry"] = "false"
+                return response
+
+            delay = retry_delay(response, attempt)
+            await response.aclose()
+            print(f"OpenAI rate limit hit, retrying in {delay:.1f}s (attempt {attempt + 1}/{RATE_LIMIT_MAX_RETRIES})")
+            self._limiter.count("retries")
+            await self._limiter.block(delay)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+# Shared limiter used by the OpenAI client, None when disabled
+rate_limiter = RateLimiter() if RATE_LIMIT_ENABLED else None
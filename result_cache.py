@@ -0,0 +1,190 @@
+"""
+Resume Result Cache
+
+This module stores complete resume analysis results in a local SQLite file,
+keyed on a hash of the extracted resume text, the lookup table fingerprint and
+the prompt/model version. Re-uploading the same resume then returns the stored
+analysis in milliseconds instead of re-running every GPT-4o call. The file is
+bounded by a byte budget and evicts the least recently used results.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from pydantic_core import to_jsonable_python
+
+# SQLite file holding cached results (empty to disable)
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", "cache/results.sqlite3")
+# Maximum size of the stored (compressed) results before LRU eviction
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def result_key(resume_text, lookup_fingerprint, pipeline_version):
+    """
+    Content address of one analysis: resume text + lookup tables + prompt/model version.
+    """
+    digest = hashlib.sha256()
+    for part in (pipeline_version, lookup_fingerprint, resume_text):
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Size-bounded LRU store of JSON results on local disk.
+    """
+
+    def __init__(self, path, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            # WAL lets several uvicorn workers read while one writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _get(self, key):
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+                conn.commit()
+                return json.loads(zlib.decompress(row[0]))
+            finally:
+                conn.close()
+
+    def _put(self, key, value):
+        blob = zlib.compress(json.dumps(to_jsonable_python(value), separators=(",", ":")).encode("utf-8"))
+        if len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (key, blob, len(blob), now, now)
+                )
+                self._evict(conn)
+                conn.commit()
+            finally:
+                conn.close()
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY last_access").fetchall():
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    async def get(self, key):
+        """
+        Get a cached result, or None on a miss or if the cache cannot be read.
+        """
+        try:
+            value = await asyncio.to_thread(self._get, key)
+        except (sqlite3.Error, OSError, ValueError, zlib.error) as e:
+            print(f"Warning: Result cache read failed: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def put(self, key, value):
+        """
+        Store a JSON-serializable result (pydantic models are converted).
+        """
+        try:
+            await asyncio.to_thread(self._put, key, value)
+        except (sqlite3.Error, OSError, TypeError, ValueError) as e:
+            print(f"Warning: Result cache write failed: {e}")
+
+    def _prune(self, max_age):
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM results WHERE created_at < ?", (time.time() - max_age,))
+                conn.commit()
+            finally:
+                conn.close()
+
+    async def prune(self, max_age):
+        """
+        Remove the entries last written more than ``max_age`` seconds ago.
+        """
+        try:
+            await asyncio.to_thread(self._prune, max_age)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Warning: Result cache prune failed: {e}")
+
+    def _clear(self):
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM results")
+                conn.commit()
+            finally:
+                conn.close()
+
+    async def clear(self):
+        """
+        Remove every cached result.
+        """
+        await asyncio.to_thread(self._clear)
+
+    def _stats(self):
+        with self._lock:
+            conn = self._connect()
+            try:
+                entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            finally:
+                conn.close()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None
+        }
+
+    async def stats(self):
+        """
+        Describe the cache for the admin endpoints (hit counters are per worker).
+        """
+        return await asyncio.to_thread(self._stats)
+
+
+# Shared result cache instance, None when disabled
+result_cache = ResultCache(RESULT_CACHE_PATH) if RESULT_CACHE_PATH else None
@@ -0,0 +1,97 @@
+"""
+Document Conversion Cache
+
+This module stores the markdown extracted from uploaded documents, keyed on
+the SHA-256 of the file bytes and the MarkItDown version. A file that was
+converted before then skips parsing, and for image-only PDFs the gpt-4o-mini
+fallback, entirely. Entries are kept compressed in a SQLite file with an LRU
+byte budget, independent of the result cache.
+"""
+import hashlib
+import os
+import sys
+from importlib import metadata
+from pathlib import Path
+
+# Add parent directory to path to import shared modules
+sys.path.append(str(Path(__file__).parent.parent))
+from result_cache import ResultCache
+
+# SQLite file holding converted documents (empty to disable)
+CONVERSION_CACHE_PATH = os.getenv("CONVERSION_CACHE_PATH", "cache/conversions.sqlite3")
+# Maximum size of the stored (compressed) conversions before LRU eviction
+CONVERSION_CACHE_MAX_BYTES = int(os.getenv("CONVERSION_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def file_hash(path, chunk_size=256 * 1024):
+    """
+    SHA-256 of a file, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def converter_version():
+    try:
+        return metadata.version("markitdown")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class ConversionCache:
+    """
+    Converted document text keyed on the file content, with savings counters.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.version = converter_version()
+        self.counters = {"bytes_saved": 0, "convert_seconds_saved": 0.0, "llm_conversions_saved": 0}
+
+    def key(self, content_hash, file_extension):
+        """
+        Cache key of a file from the SHA-256 of its bytes.
+        """
+        # The extension picks the converter, so the same bytes may convert differently
+        key = f"{content_hash}\0{file_extension or ''}\0{self.version}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    async def get(self, key):
+        """
+        Get the text of a previously converted file, or None.
+        """
+        entry = await self.store.get(key)
+        if entry is None:
+            return None
+        self.counters["bytes_saved"] += entry["file_bytes"]
+        self.counters["convert_seconds_saved"] += entry["convert_seconds"]
+        self.counters["llm_conversions_saved"] += int(entry.get("llm_fallback", False))
+        return entry["text"]
+
+    async def put(self, key, text, file_bytes, convert_seconds, llm_fallback=False):
+        if not text:
+            # Failed conversions are retried on the next upload
+            return
+        await self.store.put(key, {
+            "text": text,
+            "file_bytes": file_bytes,
+            "convert_seconds": round(convert_seconds, 3),
+            "llm_fallback": llm_fallback
+        })
+
+    async def stats(self):
+        return {
+            **await self.store.stats(),
+            "converter_version": self.version,
+            **{name: round(value, 3) for name, value in self.counters.items()}
+        }
+
+
+# Shared conversion cache, None when disabled
+conversion_cache = (
+    ConversionCache(ResultCache(CONVERSION_CACHE_PATH, max_bytes=CONVERSION_CACHE_MAX_BYTES))
+    if CONVERSION_CACHE_PATH else None
+)
@@ -0,0 +1,265 @@
+"""
+Document Conversion Pool
+
+This module runs MarkItDown conversions (pdfminer, mammoth, ...) in a pool
+of worker processes so that CPU-bound parsing does not block the event
+loop. Each worker builds its MarkItDown converter once when it starts and
+reuses it for every file. Scanned PDF pages are OCRed as separate tasks in
+the same pool. Tasks are awaited with a timeout; a task that times out gets
+its pool replaced so a stuck parser does not keep holding a worker.
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from scraper.document_scraper import get_converter, convert_resume
+from scraper.conversion_cache import conversion_cache, file_hash
+from scraper.ocr_fallback import ocr_enabled, ocr_pages, textless_indexes, textless_pages
+from scraper.pdf_pages import (
+    PDF_EARLY_START_PAGES,
+    extract_pages,
+    join_pages,
+    page_count,
+    page_parallel_enabled,
+    page_ranges,
+)
+
+# Converter processes per API worker (0 converts in a thread of the API worker instead)
+CONVERSION_POOL_SIZE = int(os.getenv("CONVERSION_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+# Seconds a single document may take to convert
+CONVERSION_TIMEOUT = float(os.getenv("CONVERSION_TIMEOUT", "60"))
+
+
+class ConversionTimeout(Exception):
+    """Raised when a document takes longer than CONVERSION_TIMEOUT to convert."""
+
+
+def warm_worker():
+    # Runs once in every new worker process
+    get_converter()
+
+
+def convert_in_worker(path, file_extension):
+    """
+    Convert a resume file in a worker process.
+
+    Text-less pages of PDFs are left to the local OCR, when available, instead
+    of the LLM converter.
+
+    Returns:
+        tuple: (text, LLM fallback used, (page texts, page indexes to OCR) or None,
+        start time, conversion seconds)
+    """
+    started = time.time()
+    local_ocr = file_extension == ".pdf" and ocr_enabled()
+    text, llm_fallback = convert_resume(path, llm_fallback=not local_ocr)
+    ocr = None
+    if local_ocr:
+        try:
+            ocr = textless_pages(path, text)
+        except Exception as e:
+            print(f"Warning: Local OCR unavailable, using the LLM converter: {e}")
+            if text == "":
+                text, llm_fallback = convert_resume(path)
+    return text, llm_fallback, ocr, started, time.time() - started
+
+
+class ConversionPool:
+    """
+    Process pool of warm MarkItDown converters with queue and timing metrics.
+    """
+
+    def __init__(self, size=CONVERSION_POOL_SIZE, timeout=CONVERSION_TIMEOUT):
+        self.size = size
+        self.timeout = timeout
+        self._executor = None
+        self.in_flight = 0
+        self.counters = {
+            "conversions": 0, "failed": 0, "timeouts": 0, "restarts": 0,
+            "queue_wait_seconds": 0.0, "max_queue_wait_seconds": 0.0, "convert_seconds": 0.0
+        }
+
+    def start(self):
+        """
+        Create the pool and start its workers so the first upload does not pay for it.
+        """
+        if self.size <= 0 or self._executor is not None:
+            return
+        # Spawned workers do not inherit the API worker's threads and connections
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.size,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=warm_worker
+        )
+        for _ in range(self.size):
+            self._executor.submit(time.time)
+
+    async def warm(self):
+        """
+        Start the pool and wait until its workers have built their converters.
+        """
+        if self.size <= 0:
+            await asyncio.get_running_loop().run_in_executor(None, warm_worker)
+            return
+        self.start()
+        # A worker runs tasks only once its initializer has finished
+        await asyncio.gather(*[self.run(os.getpid) for _ in range(self.size)])
+
+    def _restart(self, executor):
+        if executor is None or executor is not self._executor:
+            # Already replaced by another conversion
+            return
+        self._executor = None
+        self.counters["restarts"] += 1
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False)
+        # Stuck conversions cannot be cancelled, so their processes are stopped
+        for process in processes:
+            process.terminate()
+        self.start()
+
+    async def _run(self, executor, fn, *args):
+        # A None executor (pool size 0) runs the task in the default thread pool
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(executor, fn, *args)
+        # Shielded so a timeout does not cancel the executor future (stuck tasks are
+        # stopped by replacing the pool); the callback retrieves its late BrokenProcessPool
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        return await asyncio.shield(future)
+
+    async def run(self, fn, *args):
+        """
+        Run ``fn(*args)`` in the pool with the per-task timeout.
+
+        Raises:
+            ConversionTimeout: If the task takes longer than the timeout
+        """
+        self.in_flight += 1
+        try:
+            for attempt in range(2):
+                self.start()
+                executor = self._executor
+                try:
+                    return await asyncio.wait_for(self._run(executor, fn, *args), self.timeout)
+                except BrokenProcessPool:
+                    # A worker died, or the pool was replaced under this task
+                    if attempt == 1:
+                        raise
+                    self._restart(executor)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            self._restart(executor)
+            raise ConversionTimeout(f"Document conversion took longer than {self.timeout:g}s")
+        finally:
+            self.in_flight -= 1
+
+    async def _convert_pdf(self, path, on_first_pages=None):
+        """
+        Extract a PDF in page ranges across the pool.
+
+        Returns:
+            tuple: the convert_in_worker result for the whole document
+        """
+        count = await self.run(page_count, path)
+        ranges = page_ranges(count)
+        tasks = [asyncio.ensure_future(self.run(extract_pages, path, pages)) for pages in ranges]
+        try:
+            # page_ranges made the first pages a range of their own
+            if on_first_pages is not None and 0 < PDF_EARLY_START_PAGES < count and len(ranges) > 1:
+                first_pages, _ = await tasks[0]
+                on_first_pages(join_pages(first_pages))
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        pages = [page for range_pages, _ in results for page in range_pages]
+        started = min(range_started for _, range_started in results) if results else time.time()
+        indexes = textless_indexes(pages) if ocr_enabled() else []
+        if not join_pages(pages) and not indexes:
+            # No text and no local OCR: the MarkItDown converter with its LLM fallback
+            return await self.run(convert_in_worker, path, ".pdf")
+        return join_pages(pages), False, (pages, indexes), started, time.time() - started
+
+    async def convert(self, path, file_extension=None, on_first_pages=None, content_hash=None):
+        """
+        Convert a resume to markdown text off the event loop.
+
+        Files converted before are served from the conversion cache. PDFs are
+        extracted in page ranges in parallel, and their text-less pages are
+        OCRed in parallel across the pool.
+
+        The workers open the file by its path, so it is never read into the
+        API worker's memory.
+
+        Args:
+            path: Path of the resume file
+            file_extension: Extension of the resume (defaults to the path's suffix)
+            on_first_pages: Optional ``on_first_pages(text)`` called with the
+                first PDF_EARLY_START_PAGES pages of a longer PDF as soon as
+                they are extracted
+            content_hash: SHA-256 of the file, when already known (hashed in chunks otherwise)
+
+        Raises:
+            ConversionTimeout: If the conversion takes longer than the timeout
+        """
+        path = str(path)
+        file_extension = file_extension or Path(path).suffix.lower()
+
+        cache_key = None
+        if conversion_cache is not None:
+            cache_key = conversion_cache.key(content_hash or file_hash(path), file_extension)
+            text = await conversion_cache.get(cache_key)
+            if text is not None:
+                return text
+
+        submitted = time.time()
+        try:
+            if file_extension == ".pdf" and page_parallel_enabled():
+                text, llm_fallback, ocr, started, seconds = await self._convert_pdf(path, on_first_pages)
+            else:
+                text, llm_fallback, ocr, started, seconds = await self.run(convert_in_worker, path, file_extension)
+            if ocr is not None and ocr[1]:
+                text, ocr_llm_fallback = await ocr_pages(self.run, path, *ocr)
+                llm_fallback = llm_fallback or ocr_llm_fallback
+                seconds = time.time() - started
+        except ConversionTimeout:
+            raise
+        except Exception:
+            self.counters["failed"] += 1
+            raise
+
+        wait = max(started - submitted, 0.0)
+        self.counters["conversions"] += 1
+        self.counters["queue_wait_seconds"] += wait
+        self.counters["max_queue_wait_seconds"] = max(self.counters["max_queue_wait_seconds"], wait)
+        self.counters["convert_seconds"] += seconds
+        if cache_key is not None:
+            await conversion_cache.put(cache_key, text, os.path.getsize(path), seconds, llm_fallback)
+        return text
+
+    async def shutdown(self):
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+
+    def stats(self):
+        conversions = self.counters["conversions"]
+        return {
+            "pool_size": self.size,
+            "timeout_seconds": self.timeout,
+            "in_flight": self.in_flight,
+            "queued": max(self.in_flight - self.size, 0) if self.size > 0 else 0,
+            **{name: round(value, 3) for name, value in self.counters.items()},
+            "average_queue_wait_seconds": round(self.counters["queue_wait_seconds"] / conversions, 3) if conversions else None,
+            "average_convert_seconds": round(self.counters["convert_seconds"] / conversions, 3) if conversions else None
+        }
+
+
+# Shared conversion pool used by the pipeline
+conversion_pool = ConversionPool()
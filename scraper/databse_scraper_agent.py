@@ -1,20 +1,15 @@
 import os
 from datetime import datetime
 from decimal import Decimal
-import pyodbc
 from functools import wraps
 import asyncio
 import json
+import sys
+from pathlib import Path
 
-DRIVER = os.getenv("DRIVER")
-SERVER = os.getenv("SERVER")
-DATABASE = os.getenv("DATABASE")
-TRUSTED_CONNECTION = os.getenv("TRUSTED_CONNECTION")
-UID = os.getenv("UID")
-PWD = os.getenv("PWD")
-
-
-
+# Add parent directory to path to import db_pool
+sys.path.append(str(Path(__file__).parent.parent))
+from db_pool import run_with_cursor
 
 
 def async_route(f):
@@ -23,73 +18,132 @@ def async_route(f):
         return asyncio.run(f(*args, **kwargs))
     return wrapped
 
-async def fetch_data_async():
+# Lookup tables as {key: (table name, name column)}
+LOOKUP_TABLES = {
+    "industry": ("Industry", "IndustryName"),
+    "JobLevel": ("JobLevel", "JobLevelName"),
+    "educationlevel": ("EducationLevel", "EducationLevelName"),
+    "communication": ("Communication", "CommunicationName"),
+    "leadership": ("Leadership", "LeadershipName"),
+    "metacognition": ("Metacognition", "MetacognitionName"),
+    "criticalthinking": ("CriticalThinking", "CriticalThinkingName"),
+    "collaboration": ("Collaboration", "CollaborationName"),
+    "character": ("Character", "CharacterName"),
+    "creativity": ("Creativity", "CreativityName"),
+    "growthmindset": ("GrowthMindset", "GrowthMindsetName"),
+    "mindfulness": ("Mindfulness", "MindfulnessName"),
+    "fortitude": ("Fortitude", "FortitudeName"),
+    "technicalskills": ("TechnicalSkills", "TechnicalSkillsName")
+}
+
+# "batched" fetches every lookup table in one round-trip, "per_table" runs one query per table
+LOOKUP_FETCH_MODE = os.getenv("LOOKUP_FETCH_MODE", "batched")
+
+
+def fetch_lookup_tables(cursor):
+    """
+    Fetch every lookup table with one query per table (one round-trip each).
+
+    Returns:
+        dict: {table: {id: name}}
+    """
+    table_details = {}
+
+    for table, (table_name, name_column) in LOOKUP_TABLES.items():
+        try:
+            cursor.execute(f"SELECT Id, {name_column} FROM {table_name}")
+        except Exception as e:
+            raise RuntimeError(f'Error fetching data for {table}') from e
+
+        # Format as {id: name} pairs
+        lookup_data = {}
+        for row in cursor.fetchall():
+            lookup_data[row[0]] = row[1]  # Id: Name
+
+        table_details[table] = lookup_data
+
+    return table_details
+
+
+def build_batched_lookup_query():
+    """
+    Build a single UNION ALL query returning (table key, Id, Name) rows for every lookup table.
+    """
+    return "\nUNION ALL\n".join(
+        f"SELECT '{table}' AS LookupTable, Id, {name_column} AS Name FROM {table_name}"
+        for table, (table_name, name_column) in LOOKUP_TABLES.items()
+    )
+
+
+def fetch_lookup_tables_batched(cursor):
+    """
+    Fetch every lookup table in a single round-trip and decode the rows
+    back into the per-table shape of fetch_lookup_tables.
+
+    Returns:
+        dict: {table: {id: name}}
+    """
     try:
-        # Build connection string based on available authentication method
-        if TRUSTED_CONNECTION and TRUSTED_CONNECTION.lower() == 'yes':
-            # Windows Authentication
-            conn = pyodbc.connect(
-                DRIVER=DRIVER,
-                SERVER=SERVER,
-                DATABASE=DATABASE,
-                Trusted_Connection=TRUSTED_CONNECTION
-            )
-        else:
-            # SQL Server Authentication
-            conn = pyodbc.connect(
-                DRIVER=DRIVER,
-                SERVER=SERVER,
-                DATABASE=DATABASE,
-                UID=UID,
-                PWD=PWD
-            )
-        cursor = conn.cursor()
-
-        # Lookup table queries for ID and Name pairs
-        queries = {
-            "industry": "SELECT Id, IndustryName FROM Industry",
-            "JobLevel": "SELECT Id, JobLevelName FROM JobLevel",
-            "educationlevel": "SELECT Id, EducationLevelName FROM EducationLevel",
-            "communication": "SELECT Id, CommunicationName FROM Communication",
-            "leadership": "SELECT Id, LeadershipName FROM Leadership",
-            "metacognition": "SELECT Id, MetacognitionName FROM Metacognition",
-            "criticalthinking": "SELECT Id, CriticalThinkingName FROM CriticalThinking",
-            "collaboration": "SELECT Id, CollaborationName FROM Collaboration",
-            "character": "SELECT Id, CharacterName FROM Character",
-            "creativity": "SELECT Id, CreativityName FROM Creativity",
-            "growthmindset": "SELECT Id, GrowthMindsetName FROM GrowthMindset",
-            "mindfulness": "SELECT Id, MindfulnessName FROM Mindfulness",
-            "fortitude": "SELECT Id, FortitudeName FROM Fortitude",
-            "technicalskills": "SELECT Id, TechnicalSkillsName FROM TechnicalSkills"
-        }
-
-        table_details = {}
-
-        for table, query in queries.items():
-            try:
-                cursor.execute(query)
-                
-                # Format as {id: name} pairs
-                lookup_data = {}
-                for row in cursor.fetchall():
-                    lookup_data[row[0]] = row[1]  # Id: Name
-                
-                table_details[table] = lookup_data
-                # print(f"Fetched {len(lookup_data)} records from '{table}' table.")
-
-            except Exception as e:
-                # print(f"Error fetching data for {table}: {e}")
-                return {'error': f'Error fetching data for {table}'}
-
-        cursor.close()
-        conn.close()
-
-        if not table_details:
-            return {'error': 'No data found'}
-            
-        return table_details
+        cursor.execute(build_batched_lookup_query())
+        rows = cursor.fetchall()
+    except Exception as e:
+        raise RuntimeError('Error fetching lookup tables') from e
+
+    table_details = {table: {} for table in LOOKUP_TABLES}
+    for table, row_id, name in rows:
+        table_details[table][row_id] = name
 
+    return table_details
+
+
+async def fetch_data_async():
+    loader = fetch_lookup_tables if LOOKUP_FETCH_MODE == "per_table" else fetch_lookup_tables_batched
+    try:
+        table_details = await run_with_cursor(loader)
+    except RuntimeError as e:
+        # print(f"{e}: {e.__cause__}")
+        return {'error': str(e)}
     except Exception as e:
         # print(f"Database connection error: {e}")
         return {'error': 'Database connection error'}
 
+    if not table_details:
+        return {'error': 'No data found'}
+
+    return table_details
+
+
+def build_lookup_version_query():
+    """
+    Build a single query returning (table key, row count, checksum) for every lookup table.
+    """
+    return "\nUNION ALL\n".join(
+        f"SELECT '{table}' AS LookupTable, COUNT_BIG(*) AS RowTotal, "
+        f"CHECKSUM_AGG(BINARY_CHECKSUM(Id, {name_column})) AS RowChecksum FROM {table_name}"
+        for table, (table_name, name_column) in LOOKUP_TABLES.items()
+    )
+
+
+def fetch_lookup_versions(cursor):
+    """
+    Fetch a cheap version marker for every lookup table in a single round-trip.
+
+    Returns:
+        dict: {table: "row count:checksum"}
+    """
+    try:
+        cursor.execute(build_lookup_version_query())
+        rows = cursor.fetchall()
+    except Exception as e:
+        raise RuntimeError('Error fetching lookup table versions') from e
+
+    return {table: f"{row_total}:{row_checksum}" for table, row_total, row_checksum in rows}
+
+
+async def fetch_versions_async():
+    try:
+        return await run_with_cursor(fetch_lookup_versions)
+    except RuntimeError as e:
+        return {'error': str(e)}
+    except Exception as e:
+        return {'error': 'Database connection error'}
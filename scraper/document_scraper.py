@@ -1,19 +1,49 @@
-from markitdown import MarkItDown
-from openai import OpenAI
 from dotenv import load_dotenv
 import os
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI()
+
+# MarkItDown (with all its converters) and the OpenAI client are imported on
+# first use, in the conversion pool workers, not when the API worker starts
+_client = None
+
+# Long-lived converters, built once per process
+_converters = {}
+
+def get_client():
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI()
+    return _client
+
+def get_converter(llm=False):
+    if llm not in _converters:
+        from markitdown import MarkItDown
+        if llm:
+            _converters[llm] = MarkItDown(llm_client=get_client(), llm_model="gpt-4o-mini")
+        else:
+            _converters[llm] = MarkItDown(enable_plugins=False)
+    return _converters[llm]
+
+def convert_resume(resume_path, llm_fallback=True):
+    """
+    Convert a resume to markdown text, falling back to the LLM converter when
+    no text can be extracted (e.g. image-only PDFs).
+
+    Args:
+        resume_path: Path of the resume file
+        llm_fallback: Whether to retry with the LLM converter when no text was extracted
+
+    Returns:
+        tuple: (text, whether the LLM fallback was used)
+    """
+    result = get_converter().convert(resume_path)
+    if result.text_content == "" and llm_fallback:
+        result = get_converter(llm=True).convert(resume_path)
+        return result.text_content, True
+    return result.text_content, False
 
 def get_resume_content(resume_path):
-    md = MarkItDown(enable_plugins=False) 
-    result = md.convert(resume_path)
-    text_content = result.text_content
-    if text_content == "":
-        md = MarkItDown(llm_client=client, llm_model="gpt-4o-mini")
-        result = md.convert(resume_path)
-        text_content = result.text_content
-        return text_content
-    else:
-        return text_content
\ No newline at end of file
+    text_content, _ = convert_resume(resume_path)
+    return text_content
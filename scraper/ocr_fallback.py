@@ -0,0 +1,198 @@
+"""
+Local OCR Fallback
+
+This module reads scanned resume pages with Tesseract instead of sending the
+whole document to gpt-4o-mini. Pages of a PDF whose extracted text is empty
+are rasterized with pdf2image and OCRed one page per task in the conversion
+pool, so the pages of a document are read in parallel. Only pages whose mean
+Tesseract word confidence is too low are transcribed by gpt-4o-mini.
+
+Requires pytesseract and pdf2image plus the tesseract and poppler binaries;
+without them scanned PDFs keep using the MarkItDown LLM fallback.
+"""
+import asyncio
+import base64
+import importlib.util
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+# pytesseract and pdf2image are only imported by the conversion pool workers;
+# without them the LLM fallback is used instead
+OCR_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in ("pytesseract", "pdf2image"))
+
+# Add parent directory to path to import shared modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+LOCAL_OCR = os.getenv("LOCAL_OCR", "true").lower() == "true"
+# Resolution pages are rasterized at for OCR
+OCR_DPI = int(os.getenv("OCR_DPI", "300"))
+# Tesseract language(s), e.g. "eng+deu"
+OCR_LANGUAGE = os.getenv("OCR_LANGUAGE", "eng")
+# Pages with fewer extracted characters are OCRed
+OCR_MIN_PAGE_CHARS = int(os.getenv("OCR_MIN_PAGE_CHARS", "20"))
+# Pages with a lower mean word confidence (0-100) are sent to the LLM (0 never sends them)
+OCR_MIN_CONFIDENCE = float(os.getenv("OCR_MIN_CONFIDENCE", "60"))
+# Longest side of page images sent to the LLM
+OCR_LLM_IMAGE_SIZE = 2000
+
+TRANSCRIBE_PROMPT = """Transcribe all text on this resume page exactly as written.
+Keep the reading order, put each line on its own line and return only the text."""
+
+# Totals over every OCRed document in this worker
+ocr_stats = {"documents": 0, "ocr_pages": 0, "llm_pages": 0, "confidence_total": 0.0, "ocr_seconds": 0.0, "llm_tokens": 0}
+
+
+def ocr_enabled():
+    return LOCAL_OCR and OCR_AVAILABLE
+
+
+def split_pages(text, page_count):
+    """
+    Split pdfminer text (pages end with a form feed) into one string per page, or None.
+    """
+    pages = text.split("\f")
+    if len(pages) == page_count + 1 and not pages[-1].strip():
+        pages = pages[:-1]
+    return pages if len(pages) == page_count else None
+
+
+def textless_indexes(pages):
+    return [index for index, page in enumerate(pages) if len(page.strip()) < OCR_MIN_PAGE_CHARS]
+
+
+def textless_pages(path, text):
+    """
+    Find the pages of a PDF that need OCR.
+
+    Args:
+        path: Path of the PDF file
+        text: Text extracted by MarkItDown
+
+    Returns:
+        tuple: (text of every page, indexes of the pages without text)
+    """
+    from pdf2image import pdfinfo_from_path
+
+    page_count = pdfinfo_from_path(path)["Pages"]
+    pages = split_pages(text, page_count)
+    if pages is None:
+        if text.strip():
+            # Page boundaries are unknown, so the extracted text is kept as is
+            return [text], []
+        pages = [""] * page_count
+    return pages, textless_indexes(pages)
+
+
+def ocr_page(path, page_index):
+    """
+    Rasterize and OCR one PDF page (runs in a conversion pool worker).
+
+    Returns:
+        dict: text, mean word confidence, seconds, and the page image as PNG
+        when the confidence is below OCR_MIN_CONFIDENCE
+    """
+    import pytesseract
+    from pdf2image import convert_from_path
+
+    started = time.time()
+    image = convert_from_path(path, dpi=OCR_DPI, first_page=page_index + 1, last_page=page_index + 1)[0]
+    data = pytesseract.image_to_data(image, lang=OCR_LANGUAGE, output_type=pytesseract.Output.DICT)
+
+    lines = {}
+    confidences = []
+    for index, word in enumerate(data["text"]):
+        confidence = float(data["conf"][index])
+        if not word.strip() or confidence < 0:
+            continue
+        line = (data["block_num"][index], data["par_num"][index], data["line_num"][index])
+        lines.setdefault(line, []).append(word)
+        confidences.append(confidence)
+    confidence = sum(confidences) / len(confidences) if confidences else 0.0
+
+    png = None
+    if confidence < OCR_MIN_CONFIDENCE:
+        image.thumbnail((OCR_LLM_IMAGE_SIZE, OCR_LLM_IMAGE_SIZE))
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        png = buffer.getvalue()
+    return {
+        "text": "\n".join(" ".join(words) for words in lines.values()),
+        "confidence": confidence,
+        "seconds": time.time() - started,
+        "image": png
+    }
+
+
+async def transcribe_page(png):
+    """
+    Transcribe one page image with gpt-4o-mini.
+
+    Returns:
+        tuple: (text, total_tokens)
+    """
+    # Imported here so the converter processes do not create an HTTP client
+    from shared_client import async_openai_client
+
+    completion = await async_openai_client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[{
+            "role": "user",
+            "content": [
+                {"type": "text", "text": TRANSCRIBE_PROMPT},
+                {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{base64.b64encode(png).decode()}"}}
+            ]
+        }]
+    )
+    return completion.choices[0].message.content or "", completion.usage.total_tokens
+
+
+async def ocr_pages(run, path, pages, page_indexes):
+    """
+    OCR the text-less pages of a PDF in parallel and merge them with the extracted pages.
+
+    Args:
+        run: ``run(fn, *args)`` coroutine running a function in the conversion pool
+        path: Path of the PDF file
+        pages: Text of every page, as returned by textless_pages
+        page_indexes: Pages to OCR
+
+    Returns:
+        tuple: (document text, whether any page was transcribed by the LLM)
+    """
+    async def read_page(index):
+        result = await run(ocr_page, path, index)
+        ocr_stats["ocr_pages"] += 1
+        ocr_stats["confidence_total"] += result["confidence"]
+        ocr_stats["ocr_seconds"] += result["seconds"]
+        if result["image"] is None:
+            return result["text"], False
+        try:
+            text, total_tokens = await transcribe_page(result["image"])
+        except Exception as e:
+            print(f"Warning: LLM transcription of page {index + 1} failed, keeping OCR text: {e}")
+            return result["text"], False
+        ocr_stats["llm_pages"] += 1
+        ocr_stats["llm_tokens"] += total_tokens
+        return text, True
+
+    ocr_stats["documents"] += 1
+    results = await asyncio.gather(*[read_page(index) for index in page_indexes])
+    pages = list(pages)
+    for index, (text, _) in zip(page_indexes, results):
+        pages[index] = text
+    print(f"OCR read {len(page_indexes)} page(s), {sum(used for _, used in results)} transcribed by the LLM")
+    return "\f".join(page.strip() for page in pages if page.strip()), any(used for _, used in results)
+
+
+def stats():
+    pages = ocr_stats["ocr_pages"]
+    return {
+        "enabled": ocr_enabled(),
+        "min_confidence": OCR_MIN_CONFIDENCE,
+        **{name: round(value, 3) for name, value in ocr_stats.items() if name != "confidence_total"},
+        "average_confidence": round(ocr_stats["confidence_total"] / pages, 1) if pages else None,
+        "llm_page_rate": round(ocr_stats["llm_pages"] / pages, 3) if pages else None
+    }
@@ -0,0 +1,79 @@
+"""
+Page-Parallel PDF Extraction
+
+This module extracts the text of PDFs with pdfminer (the same extractor
+MarkItDown uses for PDFs) in page ranges, so the ranges of one document can
+be parsed concurrently in the conversion pool and assembled in page order.
+Every task opens the document itself and only lays out its own pages.
+
+Optionally the first pages are extracted as a separate range so that the
+string extraction can start on them while the rest is still being parsed.
+"""
+import importlib.util
+import os
+import time
+
+# pdfminer is only imported by the conversion pool workers; without it PDFs
+# are converted by MarkItDown as a whole
+PDFMINER_AVAILABLE = importlib.util.find_spec("pdfminer") is not None
+
+PDF_PAGE_PARALLEL = os.getenv("PDF_PAGE_PARALLEL", "true").lower() == "true"
+# Pages laid out per pool task
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "2"))
+# PDFs with fewer pages are extracted in a single task
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "4"))
+# First pages handed to the string extraction before the rest is parsed (0 disables)
+PDF_EARLY_START_PAGES = int(os.getenv("PDF_EARLY_START_PAGES", "0"))
+
+
+def page_parallel_enabled():
+    return PDF_PAGE_PARALLEL and PDFMINER_AVAILABLE
+
+
+def page_count(path):
+    """
+    Number of pages of a PDF file (reads the page tree only, no layout).
+    """
+    from pdfminer.pdfpage import PDFPage
+
+    with open(path, "rb") as file:
+        return sum(1 for _ in PDFPage.get_pages(file))
+
+
+def page_ranges(count, early_pages=PDF_EARLY_START_PAGES):
+    """
+    Split page indexes into the ranges extracted by one task each.
+
+    With early start, the first ``early_pages`` pages form the first range.
+    """
+    if count < PDF_PARALLEL_MIN_PAGES:
+        return [list(range(count))] if count else []
+    ranges = []
+    start = 0
+    if 0 < early_pages < count:
+        ranges.append(list(range(early_pages)))
+        start = early_pages
+    step = max(PDF_PAGES_PER_TASK, 1)
+    ranges.extend(list(range(first, min(first + step, count))) for first in range(start, count, step))
+    return ranges
+
+
+def extract_pages(path, page_numbers):
+    """
+    Extract the text of some pages of a PDF file (runs in a conversion pool worker).
+
+    Returns:
+        tuple: (one text per page, start time)
+    """
+    from pdfminer.high_level import extract_text
+
+    started = time.time()
+    text = extract_text(path, page_numbers=page_numbers)
+    # pdfminer ends every page with a form feed
+    pages = text.split("\f")[:len(page_numbers)]
+    return pages + [""] * (len(page_numbers) - len(pages)), started
+
+
+def join_pages(pages):
+    # Pages stay separated by form feeds, like pdfminer's whole-document text
+    return "\f".join(page.strip() for page in pages if page.strip())
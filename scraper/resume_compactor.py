@@ -0,0 +1,194 @@
+"""
+Resume Compaction
+
+This module shrinks the MarkItDown output of a resume before it is sent to
+the two extraction calls. Whitespace is normalized, markdown noise (table
+pipes and separators, emphasis, images, rules, HTML comments, page numbers)
+is stripped, page headers/footers and immediately repeated lines are dropped
+and the result is cut to a token budget measured with tiktoken.
+"""
+import os
+import re
+
+# Resume text sent to the extraction calls is cut to this many tokens (0 disables the budget)
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "6000"))
+RESUME_COMPACTION = os.getenv("RESUME_COMPACTION", "true").lower() == "true"
+
+# Lines at least this long that repeat at the top or bottom of several pages are page headers/footers
+DUPLICATE_LINE_MIN_CHARS = 20
+# Lines checked for headers/footers at the top and at the bottom of each page
+PAGE_EDGE_LINES = 3
+
+_encoding = None
+
+# Totals over every compacted resume in this worker
+compaction_stats = {"resumes": 0, "tokens_before": 0, "tokens_after": 0, "truncated": 0}
+
+
+def get_encoding(retry=False):
+    """
+    tiktoken encoding of gpt-4o, or None if it cannot be loaded (e.g. offline).
+
+    A failed load is remembered; ``retry=True`` tries to load it again.
+    """
+    global _encoding
+    if _encoding is None or (retry and _encoding is False):
+        try:
+            # Imported on first use to keep it out of worker startup
+            import tiktoken
+            _encoding = tiktoken.encoding_for_model("gpt-4o")
+        except Exception as e:
+            print(f"Warning: Could not load the tiktoken encoding, estimating tokens: {e}")
+            _encoding = False
+    return _encoding or None
+
+
+def count_tokens(text):
+    encoding = get_encoding()
+    if encoding is None:
+        # Roughly four characters per token for English text
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_budget(text, budget):
+    """
+    Cut text to at most ``budget`` tokens, at a line boundary where possible.
+    """
+    encoding = get_encoding()
+    if encoding is None:
+        cut = text[:budget * 4]
+    else:
+        cut = encoding.decode(encoding.encode(text, disallowed_special=())[:budget])
+    if "\n" in cut:
+        cut = cut[:cut.rindex("\n")]
+    return cut.rstrip()
+
+
+def clean_line(line):
+    """
+    Strip markdown noise from one line, keeping its text.
+    """
+    line = re.sub(r"!\[[^\]]*\]\([^)]*\)", "", line)  # images
+    line = re.sub(r"\[([^\]]+)\]\(([^)]+)\)", lambda m: m.group(1) if m.group(1) == m.group(2) else f"{m.group(1)} {m.group(2)}", line)
+    line = re.sub(r"(\*\*|__)(.+?)\1", r"\2", line)  # bold
+    line = re.sub(r"^\s{0,3}#{1,6}\s+", "", line)  # heading markers
+    if line.lstrip().startswith("|"):
+        cells = [cell.strip() for cell in line.strip().strip("|").split("|")]
+        line = " | ".join(cell for cell in cells if cell)
+    line = re.sub(r"[ \t\u00a0\u2000-\u200b]+", " ", line)
+    return line.strip()
+
+
+def is_noise(line):
+    return bool(
+        re.fullmatch(r"\|?[\s:|-]*-{3,}[\s:|-]*\|?", line)  # table separators
+        or re.fullmatch(r"(-{3,}|\*{3,}|_{3,})", line)  # horizontal rules
+    )
+
+
+def is_page_number(line):
+    # "Page 2", "Page 2 of 3", "page 2/3" or "2 of 3"; bare numbers (years, phone numbers) are content
+    return bool(
+        re.fullmatch(r"page\s*\d+(\s*(of|/)\s*\d+)?", line, re.IGNORECASE)
+        or re.fullmatch(r"\d+\s+of\s+\d+", line, re.IGNORECASE)
+    )
+
+
+def clean_lines(page):
+    """
+    Cleaned lines of one page, with runs of blank lines collapsed to one "".
+
+    Page numbers are only dropped at the top or bottom of the page.
+    """
+    cleaned = [clean_line(raw_line) for raw_line in page.splitlines() if not is_noise(raw_line.strip())]
+    edges = edge_indexes(cleaned)
+    lines = []
+    for index, line in enumerate(cleaned):
+        if index in edges and is_page_number(line):
+            continue
+        if line or (lines and lines[-1] != ""):
+            lines.append(line)
+    return lines
+
+
+def edge_indexes(lines):
+    """
+    Indexes of the first and last PAGE_EDGE_LINES non-blank lines of a page.
+    """
+    filled = [index for index, line in enumerate(lines) if line]
+    return set(filled[:PAGE_EDGE_LINES] + filled[-PAGE_EDGE_LINES:])
+
+
+def compact_text(text):
+    """
+    Normalize and de-noise resume text without a token budget.
+
+    Pages are separated by form feeds (as extracted by pdfminer). A line is
+    only dropped as a header/footer when it sits at the top or bottom of at
+    least two pages; identical lines elsewhere (e.g. the same bullet under two
+    jobs) are kept, except for immediate repeats.
+    """
+    text = re.sub(r"<!--.*?-->", "", text, flags=re.DOTALL)
+    pages = [clean_lines(page) for page in text.split("\f")]
+
+    edge_pages = {}
+    for page_number, page_lines in enumerate(pages):
+        for index in edge_indexes(page_lines):
+            if len(page_lines[index]) >= DUPLICATE_LINE_MIN_CHARS:
+                edge_pages.setdefault(page_lines[index].casefold(), set()).add(page_number)
+    headers = {key for key, page_numbers in edge_pages.items() if len(page_numbers) > 1}
+
+    seen_headers = set()
+    lines = []
+    previous = None
+    for page_lines in pages:
+        edges = edge_indexes(page_lines)
+        for index, line in enumerate(page_lines):
+            if not line:
+                if lines and lines[-1] != "":
+                    lines.append("")
+                continue
+            key = line.casefold()
+            if key == previous and len(line) >= DUPLICATE_LINE_MIN_CHARS:
+                continue
+            if key in headers and index in edges:
+                if key in seen_headers:
+                    continue
+                seen_headers.add(key)
+            previous = key
+            lines.append(line)
+        if lines and lines[-1] != "":
+            lines.append("")
+    return "\n".join(lines).strip()
+
+
+def compact_resume(text, budget=RESUME_TOKEN_BUDGET, record=True):
+    """
+    Compact resume text for the extraction calls.
+
+    Args:
+        text: Resume text as returned by get_resume_content
+        budget: Maximum number of tokens to keep (0 for no limit)
+        record: Whether to count the resume in compaction_stats
+
+    Returns:
+        tuple: (compacted text, {"tokens_before", "tokens_after", "truncated"})
+    """
+    tokens_before = count_tokens(text)
+    if not RESUME_COMPACTION:
+        return text, {"tokens_before": tokens_before, "tokens_after": tokens_before, "truncated": False}
+
+    compacted = compact_text(text)
+    tokens_after = count_tokens(compacted)
+    truncated = bool(budget) and tokens_after > budget
+    if truncated:
+        compacted = truncate_to_budget(compacted, budget)
+        tokens_after = count_tokens(compacted)
+
+    if record:
+        compaction_stats["resumes"] += 1
+        compaction_stats["tokens_before"] += tokens_before
+        compaction_stats["tokens_after"] += tokens_after
+        compaction_stats["truncated"] += int(truncated)
+    return compacted, {"tokens_before": tokens_before, "tokens_after": tokens_after, "truncated": truncated}
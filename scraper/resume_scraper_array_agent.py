@@ -6,9 +6,9 @@ from dotenv import load_dotenv
 import sys
 from pathlib import Path
 
-# Add parent directory to path to import shared_client
+# Add parent directory to path to import shared modules
 sys.path.append(str(Path(__file__).parent.parent))
-from shared_client import get_async_client
+from prompt_assembly import assemble_messages, parse_completion, stream_completion
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -38,9 +38,7 @@ class resume_data(BaseModel):
     steps: list[Step]
 
 
-async def analyze_resume_array(input_question):
-
-    prompt_template = """ You are an expert resume parser and analyzer. Extract and analyze the following information from the resume data provided:
+prompt_template = """ You are an expert resume parser and analyzer. Extract and analyze the following information from the resume data provided:
 
         **Professional Information:**
         - industry: Identify the primary industry based on work experience, skills, and career focus
@@ -79,16 +77,13 @@ async def analyze_resume_array(input_question):
 
         """
 
-    # Get the async client
-    client = await get_async_client()
-    
-    completion = await client.beta.chat.completions.parse(
-    model="gpt-4o",
-    messages=[
-        {"role": "system", "content": prompt_template},
-        {"role": "user", "content": input_question}
-    ],
-    response_format=resume_data,
+
+async def analyze_resume_array(input_question):
+
+    completion = await parse_completion(
+        "resume_array",
+        assemble_messages(prompt_template, request=input_question),
+        resume_data
     )
 
     analysis_response = completion.choices[0].message
@@ -100,3 +95,46 @@ async def analyze_resume_array(input_question):
         parsed_data = resume_data(steps=analysis_response.parsed.steps)
         return parsed_data, total_tokens 
 
+
+
+async def analyze_resume_array_stream(input_question, on_field):
+    """
+    Same analysis as analyze_resume_array, but streams the structured output
+    and calls ``on_field(name, value)`` as soon as each Step field is complete.
+
+    Fields are generated in schema order, so a field is complete once the
+    next field has started (or the response has finished).
+    """
+    completed = set()
+
+    def emit(step, final=False):
+        fields = [name for name in step if name in Step.model_fields]
+        # The last field may still be generating until the response finishes
+        for name in (fields if final else fields[:-1]):
+            if name not in completed:
+                completed.add(name)
+                on_field(name, step[name])
+
+    def on_parsed(partial):
+        steps = partial.get("steps") or []
+        if steps and isinstance(steps[0], dict):
+            # A second step means the first one is complete
+            emit(steps[0], final=len(steps) > 1)
+
+    completion = await stream_completion(
+        "resume_array",
+        assemble_messages(prompt_template, request=input_question),
+        resume_data,
+        on_parsed
+    )
+
+    analysis_response = completion.choices[0].message
+    total_tokens = completion.usage.total_tokens
+    if hasattr(analysis_response, 'refusal') and analysis_response.refusal:
+        print(f"Model refused to respond: {analysis_response.refusal}")
+        return None, total_tokens
+    else:
+        parsed_data = resume_data(steps=analysis_response.parsed.steps)
+        if parsed_data.steps:
+            emit(parsed_data.steps[0].model_dump(), final=True)
+        return parsed_data, total_tokens
@@ -7,9 +7,9 @@ from dotenv import load_dotenv
 import sys
 from pathlib import Path
 
-# Add parent directory to path to import shared_client
+# Add parent directory to path to import shared modules
 sys.path.append(str(Path(__file__).parent.parent))
-from shared_client import get_async_client
+from prompt_assembly import assemble_messages, parse_completion
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -106,16 +106,10 @@ async def analyze_resume(input_question):
 
         """
 
-    # Get the async client
-    client = await get_async_client()
-    
-    completion = await client.beta.chat.completions.parse(
-    model="gpt-4o",
-    messages=[
-        {"role": "system", "content": prompt_template},
-        {"role": "user", "content": input_question}
-    ],
-    response_format=resume_data,
+    completion = await parse_completion(
+        "resume_string",
+        assemble_messages(prompt_template, request=input_question),
+        resume_data
     )
 
     analysis_response = completion.choices[0].message
@@ -9,16 +9,23 @@ import httpx
 from openai import AsyncOpenAI
 from dotenv import load_dotenv
 
+from rate_limiter import RateLimitedTransport, rate_limiter
+
 # Load environment variables
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
 
-# Create custom HTTP client with higher connection limits for concurrency
-custom_http_client = httpx.AsyncClient(
+# Connection pool with higher connection limits for concurrency
+http_transport = httpx.AsyncHTTPTransport(
     limits=httpx.Limits(
         max_connections=50,      # Allow up to 50 concurrent connections
         max_keepalive_connections=20,  # Keep 20 connections alive
-    ),
+    )
+)
+
+# Create custom HTTP client, rate limited to the account's RPM/TPM limits
+custom_http_client = httpx.AsyncClient(
+    transport=RateLimitedTransport(http_transport, rate_limiter) if rate_limiter is not None else http_transport,
     timeout=httpx.Timeout(
         connect=30.0,    # 30 seconds to establish connection
         read=120.0,      # 2 minutes to read response
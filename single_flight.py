@@ -0,0 +1,75 @@
+"""
+Single-Flight Request Coalescing
+
+This module lets concurrent requests for the same work share one execution.
+The first caller for a key starts the coroutine; callers arriving while it
+is still running await the same task and receive its result (or exception)
+instead of starting the pipeline again. Used for resume uploads (keyed on
+the file content hash) and job matching payloads.
+"""
+import asyncio
+import hashlib
+import json
+
+
+def payload_key(payload):
+    """
+    Stable hash of a JSON-serializable request payload.
+    """
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into one running task.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._in_flight = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def _forget(self, key, task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Retrieve the exception so an execution without waiters does not log a warning
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key, fn):
+        """
+        Run ``fn()`` unless a call with the same key is already running.
+
+        The shared task is shielded, so one caller disconnecting does not
+        cancel the work the other callers are waiting for.
+
+        Returns:
+            tuple: (result, shared) where shared is True if the result came
+            from another caller's execution
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task), True
+
+        self.executions += 1
+        task = asyncio.ensure_future(fn())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task), False
+
+    def stats(self):
+        calls = self.executions + self.coalesced
+        return {
+            "in_flight": len(self._in_flight),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesced_rate": round(self.coalesced / calls, 3) if calls else None
+        }
+
+
+# Shared coalescing groups used by the API
+analysis_flight = SingleFlight("improvement_profile")
+job_match_flight = SingleFlight("job_matching_explanation")
@@ -0,0 +1,179 @@
+"""
+Startup Profile and Readiness
+
+This module records how a worker spends its startup: the import cost of
+every module imported by the app (measured in-process, like
+``python -X importtime``) and the duration of each warm-up step (lookup
+tables, OpenAI HTTP connections, document converters, tokenizer). Warm-up
+steps run in the background after the app started and retry until they
+succeed; the worker only reports ready once all of them have completed.
+"""
+import asyncio
+import importlib.abc
+import os
+import sys
+import threading
+import time
+
+# Measure the import time of every module imported by the app
+STARTUP_IMPORT_PROFILE = os.getenv("STARTUP_IMPORT_PROFILE", "true").lower() == "true"
+# Modules listed in the startup report
+STARTUP_REPORT_TOP = int(os.getenv("STARTUP_REPORT_TOP", "15"))
+# Longest wait between attempts of a failing warm-up step
+WARMUP_MAX_BACKOFF = float(os.getenv("WARMUP_MAX_BACKOFF", "30"))
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """
+    Meta path finder that times the execution of every module it sees loaded.
+
+    Records the inclusive time of each module and its self time (without the
+    modules it imported in turn).
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        loader = spec.loader
+        # Built-in and frozen importers are classes shared by many modules
+        if loader is None or isinstance(loader, type) or not hasattr(loader, "exec_module"):
+            return spec
+        exec_module = loader.exec_module
+
+        def timed_exec_module(module):
+            stack = self._local.__dict__.setdefault("stack", [])
+            stack.append(0.0)
+            started = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                total = time.perf_counter() - started
+                children = stack.pop()
+                if stack:
+                    stack[-1] += total
+                self.timings[fullname] = (total, total - children)
+
+        loader.exec_module = timed_exec_module
+        return spec
+
+
+class StartupProfile:
+    """
+    Import timings, warm-up steps and readiness of this worker.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports_seconds = None
+        self.ready_seconds = None
+        self.steps = {}
+        self._timer = None
+
+    def start_import_timing(self):
+        """
+        Start timing imports (call before the app's imports).
+        """
+        if STARTUP_IMPORT_PROFILE and self._timer is None:
+            self._timer = ImportTimer()
+            sys.meta_path.insert(0, self._timer)
+
+    def imports_done(self):
+        """
+        Stop timing imports (call once the app module is imported).
+        """
+        self.imports_seconds = round(time.perf_counter() - self.started, 3)
+        if self._timer in sys.meta_path:
+            sys.meta_path.remove(self._timer)
+        print(f"App imported in {self.imports_seconds:.3f}s")
+
+    def expect(self, *names):
+        """
+        Declare the warm-up steps that must complete before the worker is ready.
+        """
+        for name in names:
+            self.steps.setdefault(name, {"status": "pending", "attempts": 0, "seconds": None, "error": None})
+
+    async def warm(self, name, fn):
+        """
+        Run the warm-up step ``fn()`` until it succeeds, with exponential backoff.
+        """
+        self.expect(name)
+        step = self.steps[name]
+        started = time.perf_counter()
+        while True:
+            step["attempts"] += 1
+            try:
+                await fn()
+                break
+            except Exception as e:
+                step["error"] = str(e)
+                delay = min(2 ** step["attempts"], WARMUP_MAX_BACKOFF)
+                print(f"Warning: Warm-up step '{name}' failed, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+        step.update(status="ready", seconds=round(time.perf_counter() - started, 3), error=None)
+        if self.is_ready() and self.ready_seconds is None:
+            self.ready_seconds = round(time.perf_counter() - self.started, 3)
+            print(f"Worker ready {self.ready_seconds:.3f}s after start")
+            self.print_report()
+
+    def is_ready(self):
+        return bool(self.steps) and all(step["status"] == "ready" for step in self.steps.values())
+
+    def readiness(self):
+        return {
+            "ready": self.is_ready(),
+            "ready_after_seconds": self.ready_seconds,
+            "warm_up": self.steps
+        }
+
+    def import_costs(self, top=STARTUP_REPORT_TOP):
+        """
+        Slowest modules by self time, and total self time per top-level package.
+        """
+        timings = self._timer.timings if self._timer is not None else {}
+        packages = {}
+        for name, (total, own) in timings.items():
+            package = name.split(".")[0]
+            packages[package] = packages.get(package, 0.0) + own
+        slowest = sorted(timings.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        return {
+            "modules": [
+                {"module": name, "self_ms": round(own * 1000, 1), "cumulative_ms": round(total * 1000, 1)}
+                for name, (total, own) in slowest
+            ],
+            "packages": [
+                {"package": package, "self_ms": round(own * 1000, 1)}
+                for package, own in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+            ]
+        }
+
+    def report(self):
+        return {
+            "imports_seconds": self.imports_seconds,
+            **self.readiness(),
+            **self.import_costs()
+        }
+
+    def print_report(self):
+        costs = self.import_costs()
+        if costs["packages"]:
+            print("Import cost by package: " + ", ".join(
+                f"{entry['package']} {entry['self_ms']:.0f}ms" for entry in costs["packages"]
+            ))
+        print("Warm-up: " + ", ".join(
+            f"{name} {step['seconds']:.3f}s" for name, step in self.steps.items() if step["seconds"] is not None
+        ))
+
+
+# Startup profile of this worker
+startup_profile = StartupProfile()
@@ -0,0 +1,13 @@
+import os
+import sys
+from pathlib import Path
+
+# Keep the shared caches in memory and off disk while testing
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("RESULT_CACHE_PATH", "")
+os.environ.setdefault("CONVERSION_CACHE_PATH", "")
+os.environ.setdefault("LOOKUP_SNAPSHOT_PATH", "")
+os.environ.setdefault("JOB_STORE_PATH", "")
+
+# Add parent directory to path to import the application modules
+sys.path.append(str(Path(__file__).parent.parent))
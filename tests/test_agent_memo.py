@@ -0,0 +1,74 @@
+import asyncio
+
+from pydantic import BaseModel
+
+import agent_memo
+from agent_memo import AgentMemo, memoize_agent, module_version, normalize_input
+
+
+class Result(BaseModel):
+    id: list[int]
+
+
+calls = []
+
+
+@memoize_agent("sample_agent", Result)
+async def sample_agent(options, assessment):
+    calls.append(assessment)
+    if assessment == "refuse":
+        return None, 5
+    return Result(id=sorted(options)), 10
+
+
+def test_normalize_input_ignores_case_whitespace_and_list_order():
+    assert normalize_input("  Strong   LEADER ") == normalize_input("strong leader")
+    assert normalize_input(["SQL", "python", "sql"]) == normalize_input(["Python", "sql"])
+    assert normalize_input({"company": "Acme"}) == {"company": "Acme"}
+
+
+def test_memoized_agent_hits_return_zero_tokens():
+    agent_memo.agent_memo.clear()
+    calls.clear()
+    options = {1: "Delegation", 2: "Vision"}
+
+    first = asyncio.run(sample_agent(options, "Led a team of five"))
+    second = asyncio.run(sample_agent(options, "led a team  of five"))
+    other_options = asyncio.run(sample_agent({1: "Delegation"}, "Led a team of five"))
+
+    assert first == (Result(id=[1, 2]), 10)
+    assert second == (Result(id=[1, 2]), 0)
+    assert other_options == (Result(id=[1]), 10)
+    assert len(calls) == 2
+
+
+def test_refusals_are_not_memoized():
+    agent_memo.agent_memo.clear()
+    calls.clear()
+
+    asyncio.run(sample_agent({1: "Vision"}, "refuse"))
+    asyncio.run(sample_agent({1: "Vision"}, "refuse"))
+
+    assert calls == ["refuse", "refuse"]
+
+
+def test_memo_is_a_bounded_lru():
+    memo = AgentMemo(max_entries=2)
+
+    async def scenario():
+        await memo.put("a", 1)
+        await memo.put("b", 2)
+        await memo.get("agent", "a")
+        await memo.put("c", 3)
+        return [await memo.get("agent", key) for key in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == [1, None, 3]
+    assert memo.stats()["agents"]["agent"] == {"hits": 3, "disk_hits": 0, "misses": 1, "hit_rate": 0.75}
+
+
+def test_module_version_covers_settings(monkeypatch):
+    import lookup_index
+
+    version = module_version("lookup_index")
+    monkeypatch.setattr(lookup_index, "SHORTLIST_TOP_K", lookup_index.SHORTLIST_TOP_K + 5)
+    assert module_version("lookup_index") != version
@@ -0,0 +1,48 @@
+import asyncio
+import io
+import os
+import sys
+
+import pytest
+from fastapi import HTTPException
+from starlette.datastructures import UploadFile
+
+import app
+import upload_buffer
+from scraper import resume_compactor
+
+
+def test_failed_coalesced_uploads_are_all_deleted(monkeypatch):
+    paths = []
+    real_read_upload = upload_buffer.read_upload
+
+    async def read_upload(upload_file, extension):
+        upload = await real_read_upload(upload_file, extension)
+        paths.append(upload.path)
+        return upload
+
+    async def main(path, **kwargs):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("conversion failed")
+
+    monkeypatch.setattr(app, "read_upload", read_upload)
+    monkeypatch.setattr(app, "main", main)
+
+    async def scenario():
+        requests = [app.improve_resume(UploadFile(io.BytesIO(b"%PDF-1.4 resume"), filename="resume.pdf")) for _ in range(2)]
+        return await asyncio.gather(*requests, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert [error.status_code for error in results] == [500, 500]
+    assert all(isinstance(error, HTTPException) for error in results)
+    assert app.analysis_flight.stats()["coalesced"] >= 1
+    assert len(paths) == 2 and not any(os.path.exists(path) for path in paths)
+
+
+def test_tokenizer_warm_up_fails_until_the_encoding_loads(monkeypatch):
+    # The first load failed and tiktoken still cannot be imported
+    monkeypatch.setattr(resume_compactor, "_encoding", False)
+    monkeypatch.setitem(sys.modules, "tiktoken", None)
+    with pytest.raises(RuntimeError, match="tiktoken"):
+        asyncio.run(app.warm_tokenizer())
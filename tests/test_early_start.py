@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+import process
+from result_cache import ResultCache
+
+FULL_TEXT = "Jane Doe, Engineer\fFull resume text"
+CACHED = {"string_data": {"name": "Jane", "education": []}, "processed_results": {"leadership": [1]}}
+
+
+class FakeConversionPool:
+    """Hands over the first pages, then returns the full text or fails."""
+
+    def __init__(self, first_pages="Jane Doe, Engineer", error=None):
+        self.first_pages = first_pages
+        self.error = error
+        self.calls = 0
+
+    async def convert(self, path, file_extension=None, on_first_pages=None, content_hash=None):
+        self.calls += 1
+        on_first_pages(self.first_pages)
+        await asyncio.sleep(0)
+        if self.error is not None:
+            raise self.error
+        return FULL_TEXT
+
+
+@pytest.fixture
+def pipeline(monkeypatch, tmp_path):
+    extractions = []
+    cancelled = []
+
+    async def analyze_resume(resume_data):
+        extractions.append(resume_data)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(resume_data)
+            raise
+
+    async def load_lookup_tables():
+        return {}
+
+    monkeypatch.setattr(process, "PDF_EARLY_START_PAGES", 1)
+    monkeypatch.setattr(process, "result_cache", ResultCache(tmp_path / "results.sqlite3"))
+    monkeypatch.setattr(process, "analyze_resume", analyze_resume)
+    monkeypatch.setattr(process, "load_lookup_tables", load_lookup_tables)
+    resume = tmp_path / "resume.pdf"
+    resume.write_bytes(b"%PDF-1.4 resume")
+    return resume, extractions, cancelled
+
+
+def text_cache_key():
+    resume_data, _ = process.compact_resume(FULL_TEXT, record=False)
+    return asyncio.run(process.resume_cache_key(resume_data))
+
+
+def run_main(monkeypatch, resume, pool):
+    monkeypatch.setattr(process, "conversion_pool", pool)
+    return asyncio.run(asyncio.wait_for(process.main(resume), 2))
+
+
+def test_cached_file_is_served_before_conversion(monkeypatch, pipeline):
+    resume, extractions, _ = pipeline
+    file_key = asyncio.run(process.resume_cache_key(f"file\0{process.file_hash(resume)}\0.pdf"))
+    asyncio.run(process.result_cache.put("text-key", CACHED))
+    asyncio.run(process.result_cache.put(file_key, {"result_key": "text-key"}))
+    pool = FakeConversionPool()
+
+    result = run_main(monkeypatch, resume, pool)
+
+    assert result == (CACHED["string_data"], CACHED["processed_results"], 0, True)
+    assert pool.calls == 0 and extractions == []
+
+
+def test_early_extraction_is_cancelled_on_a_text_cache_hit(monkeypatch, pipeline):
+    resume, extractions, cancelled = pipeline
+    text_key = text_cache_key()
+    asyncio.run(process.result_cache.put(text_key, CACHED))
+
+    assert run_main(monkeypatch, resume, FakeConversionPool())[3] is True
+    assert extractions == cancelled == ["Jane Doe, Engineer"]
+
+
+def test_early_extraction_is_cancelled_when_conversion_fails(monkeypatch, pipeline):
+    resume, extractions, cancelled = pipeline
+
+    monkeypatch.setattr(process, "conversion_pool", FakeConversionPool(error=RuntimeError("pdfminer failed")))
+
+    async def scenario():
+        with pytest.raises(RuntimeError, match="pdfminer failed"):
+            await process.main(resume)
+        # Let the cancellation reach the task before the event loop shuts down
+        await asyncio.sleep(0)
+        return list(cancelled)
+
+    assert asyncio.run(scenario()) == extractions == ["Jane Doe, Engineer"]
+
+
+def test_scanned_first_pages_do_not_start_early(monkeypatch, pipeline):
+    resume, extractions, _ = pipeline
+    text_key = text_cache_key()
+    asyncio.run(process.result_cache.put(text_key, CACHED))
+
+    run_main(monkeypatch, resume, FakeConversionPool(first_pages="  \f "))
+    assert extractions == []
+
+
+def test_pipeline_version_covers_early_start_pages(monkeypatch):
+    version = process.pipeline_version()
+    monkeypatch.setattr(process, "PDF_EARLY_START_PAGES", process.PDF_EARLY_START_PAGES + 2)
+    assert process.pipeline_version() != version
@@ -0,0 +1,81 @@
+import asyncio
+import sqlite3
+import time
+
+from job_queue import JobQueue
+from result_cache import ResultCache
+
+
+class FailingStore:
+    """Job store whose progress writes fail after the job started."""
+
+    def __init__(self):
+        self.writes = []
+
+    async def put(self, key, value):
+        self.writes.append(value["status"])
+        if value["progress"]["completed_steps"] and value["status"] == "running":
+            raise OSError("disk full")
+
+    async def get(self, key):
+        return None
+
+    async def prune(self, max_age):
+        pass
+
+
+def test_job_runs_and_failed_progress_writes_are_logged(capsys):
+    store = FailingStore()
+    queue = JobQueue(workers=1, store=store)
+
+    async def run(on_step):
+        on_step("resume_string")
+        on_step("resume_array")
+        await asyncio.sleep(0.01)
+        return {"done": True}
+
+    async def scenario():
+        queue.start()
+        job = await queue.submit(run, total_steps=2)
+        while job["status"] in ("queued", "running"):
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return job
+
+    job = asyncio.run(asyncio.wait_for(scenario(), 2))
+
+    assert job["status"] == "completed" and job["result"] == {"done": True}
+    assert job["progress"]["completed_steps"] == ["resume_string", "resume_array"]
+    assert store.writes[-1] == "completed"
+    assert queue._step_writes == set()
+    assert capsys.readouterr().out.count("Error saving job progress: disk full") == 2
+
+
+def test_stop_stores_failed_jobs_and_submit_prunes_expired_records(tmp_path):
+    store = ResultCache(tmp_path / "jobs.sqlite3")
+    queue = JobQueue(workers=1, store=store, ttl=3600)
+    cleaned = []
+
+    async def run(on_step):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        await store.put("expired", {"id": "expired"})
+        store_time = time.time() - 7200
+        with sqlite3.connect(store.path) as conn:
+            conn.execute("UPDATE results SET created_at = ?", (store_time,))
+        queue.start()
+        running = await queue.submit(run)
+        queued = await queue.submit(run, cleanup=lambda: cleaned.append(True))
+        await asyncio.sleep(0.01)
+        await queue.stop()
+        return running, queued
+
+    running, queued = asyncio.run(asyncio.wait_for(scenario(), 2))
+    fresh = JobQueue(store=store)
+
+    for job in (running, queued):
+        stored = asyncio.run(fresh.get(job["id"]))
+        assert stored["status"] == "failed" and stored["error"] == "Server shutting down"
+    assert cleaned == [True]
+    assert asyncio.run(store.get("expired")) is None
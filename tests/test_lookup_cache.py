@@ -0,0 +1,57 @@
+import asyncio
+import copy
+import os
+import time
+
+from lookup_cache import LookupCache
+
+
+TABLES = {
+    "industry": {1: "Software", 2: "Finance"},
+    "leadership": {1: "Delegation", 2: "Vision"},
+}
+
+
+def make_cache(tables, **kwargs):
+    async def loader():
+        return copy.deepcopy(tables)
+    return LookupCache(loader, **kwargs)
+
+
+def test_fingerprint_changes_only_for_changed_table():
+    tables = copy.deepcopy(TABLES)
+    cache = make_cache(tables)
+    changed = []
+    cache.add_listener(changed.append)
+    asyncio.run(cache.refresh())
+    industry, leadership = cache.fingerprint(["industry"]), cache.fingerprint(["leadership"])
+
+    tables["leadership"][3] = "Coaching"
+    asyncio.run(cache.refresh())
+
+    assert cache.fingerprint(["industry"]) == industry
+    assert cache.fingerprint(["leadership"]) != leadership
+    assert changed == [{"leadership"}]
+
+
+def test_fingerprint_ignores_row_order():
+    first = make_cache({"industry": {1: "Software", 2: "Finance"}})
+    second = make_cache({"industry": {2: "Finance", 1: "Software"}})
+    asyncio.run(first.refresh())
+    asyncio.run(second.refresh())
+    assert first.fingerprint() == second.fingerprint()
+
+
+def test_snapshot_is_stale_and_reports_its_age(tmp_path):
+    snapshot_path = tmp_path / "lookup_snapshot.json"
+    asyncio.run(make_cache(TABLES, snapshot_path=snapshot_path).refresh())
+    written = time.time() - 120
+    os.utime(snapshot_path, (written, written))
+
+    cache = make_cache(TABLES, snapshot_path=snapshot_path)
+    assert cache.load_snapshot()
+    status = cache.status()
+
+    assert cache.is_stale
+    assert status["source"] == "snapshot"
+    assert 119 <= status["age_seconds"] < 180
@@ -0,0 +1,58 @@
+from lookup_index import BM25Index, LookupIndex, parse_overrides, stem
+
+ROWS = {
+    10: "Team Leadership",
+    11: "Strategic Vision",
+    12: "Delegation",
+    13: "Mentoring and Coaching",
+    14: "Conflict Resolution",
+    15: "Change Management",
+}
+
+
+def test_stem_merges_word_forms():
+    assert stem("managed") == stem("management") == stem("manager")
+    assert stem("mentoring") == stem("mentor")
+
+
+def test_bm25_ranks_matching_rows_first():
+    index = BM25Index(ROWS)
+    assert index.rank("Mentored junior engineers and coached new hires", 2)[0] == 13
+    assert index.rank("Managed the change to a new CRM", 1) == [15]
+    # No matching term keeps the table order
+    assert index.rank("xyz", 3) == [10, 11, 12]
+
+
+def test_shortlist_keeps_top_k_in_table_order_and_counts_dropped_rows():
+    index = LookupIndex(top_k=2, agent_top_k={"leadership_agent": 3}, min_rows=0)
+
+    shortlist = index.shortlist("leadership_agent", "leadership", ROWS, "resolved conflicts while leading the team")
+
+    # The two matching rows, padded with the first unmatched row, returned in table order
+    assert list(shortlist) == [10, 11, 14]
+    assert index.stats()["agents"]["leadership_agent"] == {"shortlists": 1, "rows_dropped": 3}
+
+
+def test_small_tables_and_disabled_shortlists_pass_through():
+    assert LookupIndex(top_k=10, min_rows=0).shortlist("agent", "leadership", ROWS, "anything") is ROWS
+    assert LookupIndex(top_k=0, min_rows=0).shortlist("agent", "leadership", ROWS, "anything") is ROWS
+    # Tables that fit in the prompt keep one options block for every request
+    assert LookupIndex(top_k=2, min_rows=6).shortlist("agent", "leadership", ROWS, "delegation") is ROWS
+    assert list(LookupIndex(top_k=2, min_rows=5).shortlist("agent", "leadership", ROWS, "delegation")) == [10, 12]
+
+
+def test_invalidate_rebuilds_changed_tables():
+    index = LookupIndex(top_k=1, min_rows=0)
+    index.shortlist("agent", "leadership", ROWS, "delegation")
+    index.invalidate({"leadership"})
+    assert index.stats()["indexed_tables"] == []
+
+    changed = {**ROWS, 12: "Public Speaking"}
+    assert index.shortlist("agent", "leadership", changed, "public speaking") == {12: "Public Speaking"}
+
+
+def test_parse_overrides():
+    assert parse_overrides("leadership_agent=10, technicalskills_agent=20") == {
+        "leadership_agent": 10, "technicalskills_agent": 20
+    }
+    assert parse_overrides("") == {}
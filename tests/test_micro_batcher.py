@@ -0,0 +1,105 @@
+import asyncio
+from types import SimpleNamespace
+
+from pydantic import BaseModel
+
+import micro_batcher
+from micro_batcher import BatchItem, BatchResult, MicroBatcher, parse_config
+
+# Read by MicroBatcher from the agent function's module
+prompt_template = "Match the assessment to the options."
+
+DATABASE = {1: "Delegation", 2: "Vision"}
+
+
+class Step(BaseModel):
+    id: list[int]
+
+
+class Result(BaseModel):
+    steps: list[Step]
+
+
+single_calls = []
+
+
+async def agent(database, assessment):
+    single_calls.append(assessment)
+    return Result(steps=[Step(id=[2])]), 7
+
+
+def completion(results, total_tokens):
+    message = SimpleNamespace(refusal=None, parsed=BatchResult(results=results))
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=SimpleNamespace(total_tokens=total_tokens))
+
+
+def make_batcher(max_size=3, max_wait=0.01):
+    single_calls.clear()
+    return MicroBatcher("test_agent", agent, Result, "Options", max_size, max_wait)
+
+
+def test_parse_config():
+    assert parse_config("leadership_agent=8:50, communication_agent=16") == {
+        "leadership_agent": (8, 0.05),
+        "communication_agent": (16, 0.05)
+    }
+    assert parse_config("") == {}
+
+
+def test_full_batch_is_sent_once_and_tokens_are_shared(monkeypatch):
+    batcher = make_batcher()
+    requests = []
+
+    async def parse_completion(call_site, messages, response_format):
+        requests.append(messages[1]["content"])
+        return completion([BatchItem(index=1, id=[1]), BatchItem(index=2, id=[]), BatchItem(index=3, id=[1, 2])], 100)
+
+    async def scenario():
+        return await asyncio.gather(*(batcher.submit(DATABASE, f"assessment {n}") for n in range(3)))
+
+    monkeypatch.setattr(micro_batcher, "parse_completion", parse_completion)
+    results = asyncio.run(scenario())
+
+    assert [(result.steps[0].id, tokens) for result, tokens in results] == [([1], 34), ([0], 33), ([1, 2], 33)]
+    assert len(requests) == 1 and "Assessment 3:\nassessment 2" in requests[0]
+    assert single_calls == []
+    assert batcher.stats()["average_batch_size"] == 3
+
+
+def test_single_call_and_skipped_inputs_use_the_normal_agent(monkeypatch):
+    batcher = make_batcher()
+
+    async def parse_completion(call_site, messages, response_format):
+        return completion([BatchItem(index=1, id=[1])], 10)
+
+    async def scenario():
+        alone = await batcher.submit(DATABASE, "alone")
+        pair = await asyncio.gather(batcher.submit(DATABASE, "answered"), batcher.submit(DATABASE, "skipped"))
+        return alone, pair
+
+    monkeypatch.setattr(micro_batcher, "parse_completion", parse_completion)
+    alone, pair = asyncio.run(scenario())
+
+    assert alone[1] == 7
+    assert pair[0][0].steps[0].id == [1]
+    assert pair[1] == (Result(steps=[Step(id=[2])]), 12)
+    assert single_calls == ["alone", "skipped"]
+    assert batcher.counters["fallback_calls"] == 1
+
+
+def test_failed_batch_reaches_callers_and_is_not_left_running(monkeypatch, capsys):
+    batcher = make_batcher(max_size=2)
+
+    async def parse_completion(call_site, messages, response_format):
+        # An answer that fails validation breaks the batch task itself
+        return completion([BatchItem(index=1, id=[1]), BatchItem(index=2, id=[1])], None)
+
+    async def scenario():
+        return await asyncio.gather(*(batcher.submit(DATABASE, n) for n in range(2)), return_exceptions=True)
+
+    monkeypatch.setattr(micro_batcher, "parse_completion", parse_completion)
+    results = asyncio.run(asyncio.wait_for(scenario(), 2))
+
+    assert all(isinstance(result, TypeError) for result in results)
+    assert batcher._tasks == set()
+    assert "Micro-batch of test_agent failed" in capsys.readouterr().out
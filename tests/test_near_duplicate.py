@@ -0,0 +1,64 @@
+import near_duplicate
+from near_duplicate import MinHashIndex
+
+RESUME = " ".join(
+    f"Senior engineer at company {index} leading platform migrations, mentoring engineers and "
+    f"improving reliability of payment services for customers in region {index}."
+    for index in range(40)
+)
+
+
+def test_near_duplicate_above_threshold_is_found():
+    index = MinHashIndex(threshold=0.9, max_docs=100)
+    index.add(RESUME, "original")
+
+    value, similarity = index.query(RESUME.replace("region 7.", "region 7. Phone +1 555 0100."))
+
+    assert value == "original"
+    assert 0.9 <= similarity < 1.0
+
+
+def test_different_resume_is_not_a_near_duplicate():
+    index = MinHashIndex(threshold=0.9, max_docs=100)
+    index.add(RESUME, "original")
+    other = " ".join(f"Registered nurse in ward {index} caring for patients overnight." for index in range(40))
+
+    value, similarity = index.query(other)
+
+    assert value is None
+    assert similarity < 0.9
+
+
+def test_edited_resume_below_threshold_is_rejected():
+    index = MinHashIndex(threshold=0.95, max_docs=100)
+    index.add(RESUME, "original")
+    # Rewrite a quarter of the resume: still similar, but not a near duplicate at 0.95
+    edited = RESUME.replace("mentoring engineers", "hiring designers", 10)
+
+    value, similarity = index.query(edited)
+
+    assert value is None
+    assert 0.5 < similarity < 0.95
+
+
+def test_accept_filter_skips_stale_values():
+    index = MinHashIndex(max_docs=100)
+    index.add(RESUME, ("old-key", "old-version"))
+    index.add(RESUME, ("new-key", "new-version"))
+
+    value, _ = index.query(RESUME, accept=lambda value: value[1] == "new-version")
+    assert value == ("new-key", "new-version")
+    assert index.query(RESUME, accept=lambda value: False) == (None, 0.0)
+
+
+def test_ring_buffer_drops_oldest_across_merges(monkeypatch):
+    monkeypatch.setattr(near_duplicate, "MERGE_BATCH", 3)
+    index = MinHashIndex(max_docs=4)
+    resumes = [RESUME.replace("company", f"employer{number}") for number in range(10)]
+    for number, text in enumerate(resumes):
+        index.add(text, number)
+
+    assert len(index) == 4
+    # Only the four newest resumes are still indexed, whether merged or not
+    assert [index.query(text)[0] for text in resumes] == [None] * 6 + [6, 7, 8, 9]
+    assert all(len(keys) <= 4 for keys in index._sorted_keys)
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from pipeline_scheduler import StageScheduler
+
+
+def run(coro, timeout=2):
+    # A hanging pipeline fails the test instead of blocking the suite
+    return asyncio.run(asyncio.wait_for(coro, timeout))
+
+
+def test_stages_start_when_their_dependencies_resolve():
+    order = []
+
+    async def stage(name, delay, *inputs):
+        await asyncio.sleep(delay)
+        order.append(name)
+        return (name, inputs)
+
+    async def pipeline():
+        scheduler = StageScheduler()
+        scheduler.add("slow", lambda: stage("slow", 0.05))
+        scheduler.add("fast", lambda: stage("fast", 0))
+        scheduler.add("after_fast", lambda fast: stage("after_fast", 0, fast), deps=("fast",))
+        return await scheduler.run(), scheduler.timings
+
+    results, timings = run(pipeline())
+
+    assert order == ["fast", "after_fast", "slow"]
+    assert results["after_fast"] == ("after_fast", (("fast", ()),))
+    assert set(timings) == {"slow", "fast", "after_fast"}
+    assert timings["after_fast"]["start"] < timings["slow"]["finish"]
+
+
+def test_failing_stage_cancels_running_stages():
+    cancelled = asyncio.Event()
+
+    async def fail():
+        raise RuntimeError("extraction failed")
+
+    async def long_running():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def pipeline():
+        scheduler = StageScheduler()
+        scheduler.add("broken", fail)
+        scheduler.add("dependent", lambda value: asyncio.sleep(0, value), deps=("broken",))
+        scheduler.add("long", long_running)
+        with pytest.raises(RuntimeError, match="extraction failed"):
+            await scheduler.run()
+        return cancelled.is_set()
+
+    assert run(pipeline())
+
+
+def test_failed_external_stage_fails_its_dependents():
+    async def pipeline():
+        scheduler = StageScheduler()
+        scheduler.expect("resume_array.leadership")
+        scheduler.add("leadership", lambda value: asyncio.sleep(0, value), deps=("resume_array.leadership",))
+        scheduler.fail("resume_array.leadership", ValueError("no leadership field"))
+        await scheduler.run()
+
+    with pytest.raises(ValueError, match="no leadership field"):
+        run(pipeline())
+
+
+def test_provided_stage_feeds_dependents_and_callback():
+    done = []
+
+    async def producer(scheduler):
+        scheduler.provide("field", "value")
+        return "produced"
+
+    async def pipeline():
+        scheduler = StageScheduler(on_stage_done=lambda name, result: done.append(name))
+        scheduler.expect("field")
+        scheduler.add("producer", lambda: producer(scheduler))
+        scheduler.add("consumer", lambda value: asyncio.sleep(0, value.upper()), deps=("field",))
+        return await scheduler.run()
+
+    results = run(pipeline())
+
+    assert results == {"field": "value", "producer": "produced", "consumer": "VALUE"}
+    assert sorted(done) == ["consumer", "producer"]
+
+
+def test_unknown_dependency_is_rejected():
+    async def pipeline():
+        scheduler = StageScheduler()
+        scheduler.add("agent", lambda lookups: asyncio.sleep(0), deps=("lookups",))
+        await scheduler.run()
+
+    with pytest.raises(ValueError, match="lookups"):
+        run(pipeline())
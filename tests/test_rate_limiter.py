@@ -0,0 +1,100 @@
+import asyncio
+
+import httpx
+import pytest
+from openai import AsyncOpenAI, RateLimitError
+
+import rate_limiter
+from rate_limiter import RateLimitedTransport, RateLimiter, parse_reset
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "time", clock.time)
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", clock.sleep)
+    monkeypatch.setattr(rate_limiter.random, "uniform", lambda low, high: 0.0)
+    return clock
+
+
+def test_parse_reset():
+    assert parse_reset("6m0s") == 360
+    assert parse_reset("1.5s") == 1.5
+    assert parse_reset("250ms") == 0.25
+    assert parse_reset("") is None
+
+
+def test_token_bucket_waits_for_refill(clock):
+    limiter = RateLimiter(rpm=60, tpm=6000, state_path=None)
+
+    async def scenario():
+        await limiter.acquire(3000)
+        await limiter.acquire(3000)
+        assert clock.sleeps == []
+        # The bucket refills 100 tokens per second
+        await limiter.acquire(1000)
+
+    asyncio.run(scenario())
+    assert clock.sleeps == [pytest.approx(10.0)]
+    assert limiter.counters["throttled"] == 1
+
+
+def test_block_pauses_every_request(clock):
+    limiter = RateLimiter(rpm=600, tpm=60000, state_path=None)
+
+    async def scenario():
+        await limiter.block(5.0)
+        await limiter.acquire(10)
+
+    asyncio.run(scenario())
+    assert sum(clock.sleeps) >= 5.0
+    assert limiter.counters["rate_limited"] == 1
+
+
+def test_state_file_is_shared_between_limiters(tmp_path):
+    state_path = tmp_path / "ratelimit.json"
+    first = RateLimiter(rpm=100, tpm=10000, state_path=state_path)
+    second = RateLimiter(rpm=100, tpm=10000, state_path=state_path)
+
+    async def scenario():
+        await first.acquire(4000)
+        return await second.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["shared_state"] == str(state_path)
+    assert stats["available_tokens"] == pytest.approx(6000, abs=5)
+
+
+def test_429_is_retried_by_the_transport_only(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "RATE_LIMIT_MAX_RETRIES", 2)
+    monkeypatch.setattr(rate_limiter, "retry_delay", lambda response, attempt: 0.0)
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        return httpx.Response(429, json={"error": {"message": "Rate limit reached", "type": "requests"}})
+
+    limiter = RateLimiter(rpm=600000, tpm=10 ** 9, state_path=None)
+    transport = RateLimitedTransport(httpx.MockTransport(handler), limiter)
+    client = AsyncOpenAI(api_key="test", max_retries=3, http_client=httpx.AsyncClient(transport=transport))
+
+    async def scenario():
+        with pytest.raises(RateLimitError):
+            await client.chat.completions.create(model="gpt-4o", messages=[{"role": "user", "content": "hi"}])
+
+    asyncio.run(scenario())
+    assert len(attempts) == 3
+    assert limiter.counters["retries"] == 2
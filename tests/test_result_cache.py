@@ -0,0 +1,64 @@
+import asyncio
+import os
+
+import process
+from result_cache import ResultCache, result_key
+
+
+def test_result_key_depends_on_text_lookups_and_version():
+    key = result_key("resume text", "lookups-a", "version-a")
+
+    assert key == result_key("resume text", "lookups-a", "version-a")
+    assert key != result_key("resume text!", "lookups-a", "version-a")
+    assert key != result_key("resume text", "lookups-b", "version-a")
+    assert key != result_key("resume text", "lookups-a", "version-b")
+
+
+def test_pipeline_version_covers_result_settings(monkeypatch):
+    version = process.pipeline_version()
+    assert version == process.pipeline_version()
+
+    monkeypatch.setattr(process, "SHORTLIST_TOP_K", process.SHORTLIST_TOP_K + 1)
+    assert process.pipeline_version() != version
+
+
+def test_pipeline_version_covers_micro_batch_config(monkeypatch):
+    version = process.pipeline_version()
+    monkeypatch.setattr(process, "AGENT_BATCH_CONFIG", {"leadership_agent": (8, 0.05)})
+    assert process.pipeline_version() != version
+
+
+def test_pipeline_version_covers_result_modules(monkeypatch, tmp_path):
+    version = process.pipeline_version()
+    module = tmp_path / "edited_prompt_assembly.py"
+    module.write_text("# edited prompt layout\n")
+    real_import = process.importlib.import_module
+
+    def import_module(name):
+        if name == "prompt_assembly":
+            return type("Module", (), {"__file__": str(module)})
+        return real_import(name)
+
+    monkeypatch.setattr(process.importlib, "import_module", import_module)
+    assert process.pipeline_version() != version
+
+
+def test_result_cache_round_trip_and_lru_eviction(tmp_path):
+    cache = ResultCache(tmp_path / "results.sqlite3", max_bytes=10_000)
+    payload = {"processed_results": {"leadership": [1, 2]}, "padding": "x" * 2000}
+
+    async def scenario():
+        await cache.put("first", {**payload, "id": 1})
+        assert (await cache.get("first"))["id"] == 1
+        assert await cache.get("missing") is None
+        # Random padding does not compress, so a handful of entries exceeds the budget
+        for index in range(10):
+            await cache.put(f"key-{index}", {**payload, "padding": os.urandom(1500).hex()})
+        return await cache.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats["bytes"] <= 10_000
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert asyncio.run(cache.get("first")) is None
+    assert asyncio.run(cache.get("key-9")) is not None
@@ -0,0 +1,70 @@
+import pytest
+
+from scraper import resume_compactor
+from scraper.resume_compactor import compact_resume, compact_text
+
+HEADER = "Jane Doe - Senior Engineer - jane@example.com"
+
+
+@pytest.fixture(autouse=True)
+def estimated_tokens(monkeypatch):
+    # Count tokens with the offline estimate instead of downloading the tiktoken encoding
+    monkeypatch.setattr(resume_compactor, "_encoding", False)
+
+
+def test_identical_bullets_under_different_jobs_are_kept():
+    text = "\n".join([
+        "## Acme Corp",
+        "- Managed a team of 5 engineers",
+        "- Shipped the billing platform",
+        "## Globex",
+        "- Managed a team of 5 engineers",
+    ])
+    assert compact_text(text).count("Managed a team of 5 engineers") == 2
+
+
+def test_page_headers_and_footers_are_dropped_after_the_first_page():
+    pages = [
+        f"{HEADER}\nExperience at company {number} building payment systems.\nPage {number} of 3\nConfidential resume - do not distribute"
+        for number in range(1, 4)
+    ]
+    compacted = compact_text("\f".join(pages))
+
+    assert compacted.count(HEADER) == 1
+    assert compacted.count("Confidential resume - do not distribute") == 1
+    assert "Page 2 of 3" not in compacted
+    assert all(f"company {number}" in compacted for number in range(1, 4))
+
+
+def test_repeated_line_in_page_body_is_kept():
+    body = "\n".join(["Intro line one", "Intro line two", "Intro line three", HEADER, "Middle", "End one", "End two", "End three"])
+    compacted = compact_text(f"{HEADER}\nA\nB\n{body}\f{HEADER}\nC")
+    # Only the copies at the top of the pages are headers, not the one inside the body
+    assert compacted.count(HEADER) == 2
+
+
+def test_immediate_repeats_and_markdown_noise_are_removed():
+    text = "| Skill | Level |\n|---|---|\n| **Python** | Expert |\n\n\n- Built data pipelines for finance\n- Built data pipelines for finance\n---"
+    assert compact_text(text) == "Skill | Level\nPython | Expert\n\n- Built data pipelines for finance"
+
+
+def test_budget_truncates_at_a_line_boundary():
+    text = "\n".join(f"Line {number} with some descriptive words about the role" for number in range(200))
+    compacted, info = compact_resume(text, budget=100, record=False)
+
+    assert info["truncated"]
+    assert info["tokens_after"] <= 100
+    assert compacted.endswith("the role")
+
+
+def test_numeric_lines_are_kept_and_only_edge_page_numbers_dropped():
+    page = "\n".join(["Page 1", "Jane Doe", "5551234567", "Graduated", "2019", "Ratio", "3/4", "Acme Corp", "Led teams", "1 of 2"])
+    compacted = compact_text(f"{page}\fPage 2 of 2\nGlobex\nStill working")
+
+    assert all(line in compacted.splitlines() for line in ["5551234567", "2019", "3/4"])
+    assert not any(line in compacted.splitlines() for line in ["Page 1", "1 of 2", "Page 2 of 2"])
+
+
+def test_page_number_pattern_inside_page_body_is_kept():
+    body = "\n".join(["Header one", "Header two", "Header three", "Page 7", "Footer one", "Footer two", "Footer three"])
+    assert "Page 7" in compact_text(body).splitlines()
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from single_flight import SingleFlight, payload_key
+
+
+def test_payload_key_ignores_key_order():
+    assert payload_key({"a": 1, "b": [1, 2]}) == payload_key({"b": [1, 2], "a": 1})
+    assert payload_key({"a": 1}) != payload_key({"a": 2})
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test")
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(3)))
+
+    results = asyncio.run(scenario())
+
+    assert results == [("result", False), ("result", True), ("result", True)]
+    assert len(runs) == 1
+    assert flight.stats() == {"in_flight": 0, "executions": 1, "coalesced": 2, "coalesced_rate": 0.667}
+
+
+def test_exception_reaches_every_waiter_and_key_is_released():
+    flight = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("conversion failed")
+
+    async def scenario():
+        results = await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+        # A later call runs again instead of replaying the failure
+        return results, await flight.do("key", lambda: asyncio.sleep(0, "retried"))
+
+    results, retried = asyncio.run(scenario())
+
+    assert [str(error) for error in results] == ["conversion failed"] * 2
+    assert retried == ("retried", False)
+
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    flight = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.do("key", work))
+        second = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == ("done", True)
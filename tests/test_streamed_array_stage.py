@@ -0,0 +1,86 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import process
+from pipeline_scheduler import StageScheduler
+from scraper import resume_scraper_array_agent as array_agent
+
+FIELDS = [field for name, agent, source, tables, field in process.AGENT_STAGES if source == 'resume_array']
+STEP = {field: [] if field == 'technicalSkill' else f"{field} text" for field in array_agent.Step.model_fields}
+
+
+def completion(steps):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(refusal=None, parsed=SimpleNamespace(steps=steps)))],
+        usage=SimpleNamespace(total_tokens=42)
+    )
+
+
+def run_streamed_pipeline(monkeypatch, stream, fields=FIELDS):
+    """
+    Run the streamed array stage with one dependent stage per field, as process.main does.
+    """
+    async def pipeline():
+        scheduler = StageScheduler()
+        scheduler.add('resume_array', process.streamed_array_stage(scheduler, "resume text", fields))
+        for field in fields:
+            scheduler.expect(f'resume_array.{field}')
+            scheduler.add(field, lambda value: asyncio.sleep(0, value), deps=(f'resume_array.{field}',))
+        return await scheduler.run()
+
+    monkeypatch.setattr(process, "analyze_resume_array_stream", stream)
+    return asyncio.run(asyncio.wait_for(pipeline(), 2))
+
+
+def test_empty_steps_fail_the_field_stages_instead_of_hanging(monkeypatch):
+    async def stream(resume, on_field):
+        return array_agent.resume_data(steps=[]), 42
+
+    with pytest.raises(Exception, match="returned no"):
+        run_streamed_pipeline(monkeypatch, stream)
+
+
+def test_missing_field_fails_only_its_stage(monkeypatch):
+    async def stream(resume, on_field):
+        for field in FIELDS[1:]:
+            on_field(field, STEP[field])
+        return array_agent.resume_data(steps=[]), 42
+
+    with pytest.raises(Exception, match=f"no '{FIELDS[0]}' field"):
+        run_streamed_pipeline(monkeypatch, stream)
+
+
+def test_fields_of_reused_agents_are_not_failed(monkeypatch):
+    # The agents of the other fields were reused from a near-duplicate
+    streamed = FIELDS[:2]
+
+    async def stream(resume, on_field):
+        for field in streamed:
+            on_field(field, STEP[field])
+        return array_agent.resume_data(steps=[]), 42
+
+    results = run_streamed_pipeline(monkeypatch, stream, streamed)
+
+    assert {field: results[field] for field in streamed} == {field: STEP[field] for field in streamed}
+    assert not any(f'resume_array.{field}' in results for field in FIELDS[2:])
+
+
+def test_fields_are_emitted_as_soon_as_the_next_one_starts(monkeypatch):
+    names = list(array_agent.Step.model_fields)
+    emitted = []
+
+    async def stream_completion(call_site, messages, response_format, on_parsed, model="gpt-4o"):
+        for count in range(1, len(names) + 1):
+            on_parsed({"steps": [{name: STEP[name] for name in names[:count]}]})
+            # Every field but the one still being generated has been handed over
+            assert [name for name, _ in emitted] == names[:count - 1]
+        return completion([array_agent.Step(**STEP)])
+
+    monkeypatch.setattr(array_agent, "stream_completion", stream_completion)
+    result, tokens = asyncio.run(array_agent.analyze_resume_array_stream("resume", lambda *item: emitted.append(item)))
+
+    assert [name for name, _ in emitted] == names
+    assert result.steps[0].leadership == "leadership text"
+    assert tokens == 42
@@ -0,0 +1,59 @@
+from McpAgent import technicalskills_matcher
+from McpAgent.technicalskills_matcher import SkillIndex, match_skills, normalize_skill
+
+TABLE = {
+    1: "Python Programming",
+    2: "Machine Learning",
+    3: "AWS",
+    4: "Cloud Computing",
+    5: "Git, GitHub",
+    6: "HTML/CSS",
+    7: "C++ Programming",
+    8: "JavaScript",
+}
+
+
+def test_normalize_skill_keeps_meaningful_symbols():
+    assert normalize_skill("  C++ ") == "c++"
+    assert normalize_skill("C#!") == "c#"
+    assert normalize_skill(".NET   Core") == ".net core"
+
+
+def test_exact_parts_aliases_and_containment():
+    index = SkillIndex(TABLE)
+
+    assert index.match("python") == {1}
+    assert index.match("GitHub") == {5}
+    assert index.match("CSS") == {6}
+    assert index.match("TensorFlow") == {2}
+    assert index.match("AWS Lambda") == {3}
+    assert index.match("EC2") == {3, 4}
+    assert index.match("cpp") == {7}
+
+
+def test_typos_match_fuzzily_and_unknown_skills_are_left_for_the_llm():
+    index = SkillIndex(TABLE)
+
+    assert index.match("Javascrpt") == {8}
+    assert index.match("Quantum Chromodynamics") == set()
+
+
+def test_match_skills_splits_resolved_and_unresolved(monkeypatch):
+    matched, unresolved = match_skills(["Python", "React", "Underwater basket weaving"], TABLE)
+    assert matched == {1, 8}
+    assert unresolved == ["Underwater basket weaving"]
+
+    monkeypatch.setattr(technicalskills_matcher, "LOCAL_SKILL_MATCH", False)
+    assert match_skills(["Python"], TABLE) == (set(), ["Python"])
+
+
+def test_one_token_parts_of_names_only_match_exactly():
+    index = SkillIndex({10: "UI/UX", 11: "CI/CD", 3: "AWS"})
+
+    assert index.match("UI") == {10}
+    assert index.match("ci/cd") == {11}
+    assert index.match("UI Testing") == set()
+    assert index.match("CI Pipelines") == set()
+    assert index.match("CD Duplication") == set()
+    # Whole one-token names still match inside longer skills
+    assert index.match("AWS Lambda") == {3}
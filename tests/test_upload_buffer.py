@@ -0,0 +1,38 @@
+import asyncio
+import hashlib
+import io
+import os
+
+from starlette.datastructures import UploadFile
+
+import upload_buffer
+from scraper.conversion_cache import ConversionCache, file_hash
+from upload_buffer import read_upload
+
+
+def test_upload_is_written_once_to_a_file_read_by_path(monkeypatch):
+    monkeypatch.setattr(upload_buffer, "UPLOAD_CHUNK_BYTES", 1000)
+    content = os.urandom(5000)
+    upload_file = UploadFile(io.BytesIO(content), filename="resume.pdf")
+
+    upload = asyncio.run(read_upload(upload_file, ".pdf"))
+
+    # The request's copy is released once read
+    assert upload_file.file.closed
+    with open(upload.path, "rb") as file:
+        assert file.read() == content
+    assert upload.size == 5000 and upload.path.endswith(".pdf")
+    assert upload.content_hash == hashlib.sha256(content).hexdigest() == file_hash(upload.path, chunk_size=999)
+
+    upload.close()
+    upload.close()
+    assert not os.path.exists(upload.path)
+
+
+def test_conversion_cache_key_uses_content_hash_and_extension():
+    cache = ConversionCache(store=None)
+    digest = hashlib.sha256(b"resume").hexdigest()
+
+    assert cache.key(digest, ".pdf") == cache.key(digest, ".pdf")
+    assert cache.key(digest, ".pdf") != cache.key(digest, ".docx")
+    assert cache.key(digest, ".pdf") != cache.key(hashlib.sha256(b"other").hexdigest(), ".pdf")
@@ -0,0 +1,114 @@
+"""
+Upload Buffering
+
+This module reads uploaded resumes in fixed-size chunks into a temporary
+file in the uploads directory instead of loading the whole file into
+memory. The request's own spooled copy is released as soon as it has been
+read, and the conversion workers open the temporary file by its path, so
+an upload is held once. The file is removed as soon as the upload is closed
+(or the process exits). Uploads over the size limit are rejected from their
+Content-Length before the body is received, or while they are being read.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+# Largest accepted resume upload in bytes
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# Bytes read from the request per chunk
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(256 * 1024)))
+
+# Directory for the uploads being processed
+UPLOAD_DIR = Path("uploads")
+UPLOAD_DIR.mkdir(exist_ok=True)
+
+ALLOWED_EXTENSIONS = {'.pdf', '.doc', '.docx', '.txt'}
+
+# Multipart framing allowed on top of MAX_UPLOAD_BYTES when checking Content-Length
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds MAX_UPLOAD_BYTES."""
+
+
+class ResumeUpload:
+    """
+    A resume upload in a temporary file with its path, extension, size and SHA-256.
+    """
+
+    def __init__(self, extension):
+        self.extension = extension
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._file = tempfile.NamedTemporaryFile(dir=UPLOAD_DIR, prefix="resume_", suffix=extension)
+        self.path = self._file.name
+
+    @property
+    def content_hash(self):
+        return self._sha256.hexdigest()
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        if self.size > MAX_UPLOAD_BYTES:
+            raise UploadTooLarge(f"File is larger than the {MAX_UPLOAD_BYTES} byte upload limit")
+        self._sha256.update(chunk)
+        self._file.write(chunk)
+
+    def flush(self):
+        # Makes the whole upload visible to the processes opening it by path
+        self._file.flush()
+
+    def close(self):
+        # Closing removes the temporary file; safe to call more than once
+        if not self._file.closed:
+            self._file.close()
+
+
+async def read_upload(upload_file, extension):
+    """
+    Read an UploadFile into a ResumeUpload chunk by chunk.
+
+    The UploadFile is closed once read, releasing the request's spooled copy.
+
+    Raises:
+        UploadTooLarge: As soon as more than MAX_UPLOAD_BYTES have been read
+    """
+    upload = ResumeUpload(extension)
+    try:
+        while chunk := await upload_file.read(UPLOAD_CHUNK_BYTES):
+            upload.write(chunk)
+        upload.flush()
+    except BaseException:
+        upload.close()
+        raise
+    finally:
+        await upload_file.close()
+    return upload
+
+
+class UploadSizeLimitMiddleware:
+    """
+    ASGI middleware answering 413 to requests whose Content-Length is over
+    the upload limit, before the multipart body is received and parsed.
+    """
+
+    def __init__(self, app, max_bytes=MAX_UPLOAD_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            content_length = dict(scope["headers"]).get(b"content-length", b"")
+            if content_length.isdigit() and int(content_length) > self.max_bytes + FORM_OVERHEAD_BYTES:
+                body = json.dumps({"detail": f"Request body is larger than the {self.max_bytes} byte upload limit"}).encode()
+                await send({
+                    "type": "http.response.start",
+                    "status": 413,
+                    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+                })
+                await send({"type": "http.response.body", "body": body})
+                return
+        await self.app(scope, receive, send)